@@ -0,0 +1,53 @@
+"""Add venue daily statistics rollup
+
+Revision ID: 002_venue_daily_stats
+Revises: 001
+Create Date: 2026-10-17
+
+Creates the pre-aggregated tables read by the owner dashboard and analytics:
+- venue_daily_stats (one row per venue per day)
+- venue_daily_customers (distinct customers per venue per day)
+
+Populate existing history with rebuild_daily_stats.py after upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '002_venue_daily_stats'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'venue_daily_stats',
+        sa.Column('venue_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('revenue', sa.Numeric(12, 2), server_default='0', nullable=False),
+        sa.Column('transaction_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('points_issued', sa.Numeric(12, 2), server_default='0', nullable=False),
+        sa.Column('points_redeemed', sa.Numeric(12, 2), server_default='0', nullable=False),
+        sa.Column('referral_bonus_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('referral_bonus_points', sa.Numeric(12, 2), server_default='0', nullable=False),
+        sa.Column('unique_customers', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['venue_id'], ['venues.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('venue_id', 'date', name='pk_venue_daily_stats'),
+    )
+
+    op.create_table(
+        'venue_daily_customers',
+        sa.Column('venue_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['venue_id'], ['venues.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('venue_id', 'date', 'user_id', name='pk_venue_daily_customers'),
+    )
+
+
+def downgrade():
+    op.drop_table('venue_daily_customers')
+    op.drop_table('venue_daily_stats')
@@ -0,0 +1,50 @@
+"""Add venue counter delta log
+
+Revision ID: 003_venue_stat_deltas
+Revises: 002_venue_daily_stats
+Create Date: 2026-10-17
+
+Purchases append to venue_stat_deltas instead of updating the venue row;
+compact_venue_counters.py folds the deltas into venues.total_revenue and
+venues.total_points_issued, which are added here if missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '003_venue_stat_deltas'
+down_revision = '002_venue_daily_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE venues ADD COLUMN IF NOT EXISTS total_revenue NUMERIC(12, 2) NOT NULL DEFAULT 0")
+    op.execute("ALTER TABLE venues ADD COLUMN IF NOT EXISTS total_points_issued NUMERIC(12, 2) NOT NULL DEFAULT 0")
+
+    op.create_table(
+        'venue_stat_deltas',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('venue_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('revenue', sa.Numeric(12, 2), server_default='0', nullable=False),
+        sa.Column('points_issued', sa.Numeric(12, 2), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['venue_id'], ['venues.id'], ondelete='CASCADE'),
+    )
+    op.create_index('idx_venue_stat_delta_venue', 'venue_stat_deltas', ['venue_id'])
+
+
+def downgrade():
+    # Fold outstanding deltas in before dropping the log so no revenue is lost
+    op.execute("""
+        UPDATE venues SET
+            total_revenue = venues.total_revenue + d.revenue,
+            total_points_issued = venues.total_points_issued + d.points_issued
+        FROM (
+            SELECT venue_id, SUM(revenue) AS revenue, SUM(points_issued) AS points_issued
+            FROM venue_stat_deltas GROUP BY venue_id
+        ) AS d
+        WHERE venues.id = d.venue_id
+    """)
+    op.drop_index('idx_venue_stat_delta_venue', table_name='venue_stat_deltas')
+    op.drop_table('venue_stat_deltas')
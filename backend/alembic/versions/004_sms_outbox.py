@@ -0,0 +1,42 @@
+"""Add SMS outbox
+
+Revision ID: 004_sms_outbox
+Revises: 003_venue_stat_deltas
+Create Date: 2026-10-17
+
+Verification and welcome SMS are queued here in the request transaction and
+delivered by the outbox worker (app/services/sms_outbox.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004_sms_outbox'
+down_revision = '003_venue_stat_deltas'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sms_outbox',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('phone_number', sa.String(20), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(20), server_default='pending', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('provider_message_id', sa.String(64), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('idx_sms_outbox_due', 'sms_outbox', ['status', 'next_attempt_at'])
+    op.create_index('idx_sms_outbox_phone', 'sms_outbox', ['phone_number', 'kind'])
+
+
+def downgrade():
+    op.drop_index('idx_sms_outbox_phone', table_name='sms_outbox')
+    op.drop_index('idx_sms_outbox_due', table_name='sms_outbox')
+    op.drop_table('sms_outbox')
@@ -0,0 +1,38 @@
+"""Add idempotency keys
+
+Revision ID: 005_idempotency_keys
+Revises: 004_sms_outbox
+Create Date: 2026-10-17
+
+Idempotency-Key headers on transaction creation are claimed here in the
+request transaction, so every worker sees them (app/services/idempotency.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '005_idempotency_keys'
+down_revision = '004_sms_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('idempotency_key', sa.String(255), nullable=False),
+        sa.Column('request_fingerprint', sa.String(64), nullable=False),
+        sa.Column('response', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('user_id', 'idempotency_key', name='unique_user_idempotency_key'),
+    )
+    op.create_index('idx_idempotency_keys_expires', 'idempotency_keys', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('idx_idempotency_keys_expires', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -13,6 +13,7 @@ from sqlalchemy import select
 
 from app.db.session import get_db
 from app.core.security import decode_token
+from app.core.user_cache import user_cache
 from app.models.user import User
 from app.models.venue import Venue
 
@@ -29,7 +30,8 @@ async def get_current_user(
     Get current authenticated user from JWT token.
 
     This dependency extracts the JWT token from the Authorization header,
-    decodes it, and retrieves the corresponding user from the database.
+    decodes it, and retrieves the corresponding user from the user cache or
+    the database.
 
     Args:
         credentials: HTTP Bearer credentials containing the JWT token
@@ -81,18 +83,24 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+    # Get user from the cache, or from the database on a miss
+    issued_at = payload.get("iat")
+    user = await user_cache.get(db, user_id, issued_at)
+    if user is None:
+        generation = user_cache.generation()
+        result = await db.execute(
+            select(User).where(User.id == user_id)
         )
+        user = result.scalar_one_or_none()
+
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        user_cache.put(user, issued_at, generation)
 
     # Check if user account is active
     if not user.is_active:
@@ -3,8 +3,8 @@ Admin API routes for venue owners.
 Handles dashboard, analytics, product management, and customer insights.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional, List
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
@@ -12,7 +12,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, desc, asc
 from decimal import Decimal
 
-from app.db.session import get_db
+from app.core.venue_catalog import venue_catalog
+from app.db.pagination import after_key, decode_cursor, estimate_count, key_types, next_cursor, order_by_key
+from app.db.session import get_db, get_read_db, run_concurrently
 from app.api.dependencies import get_current_user, get_venue_owner
 from app.models.user import User
 from app.models.venue import Venue
@@ -22,7 +24,6 @@ from app.models.user_points import UserPoints
 from app.schemas.admin import (
     DashboardResponse,
     DashboardOverview,
-    DashboardStats,
     TopProduct,
     RecentTransaction,
     LowStockAlert,
@@ -35,126 +36,37 @@ from app.schemas.admin import (
     VenueCustomer,
     CustomerListResponse,
     ProductWithStats,
+    MarginSimulationRequest,
+    MarginSimulationResponse,
 )
 from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, BonusActivation
+from app.services.daily_stats import DailyStatsRollup
+from app.services.dashboard_stats import DashboardStatsService
+from app.services.points_recalculator import PointsRecalculator
+from app.services.tier_config_cache import TierConfigCache
 
 
 router = APIRouter()
 
 
-# Helper function for time-based stats
-async def _get_stats_for_period(
-    db: AsyncSession,
-    venue_id: UUID,
-    start_date: datetime,
-    end_date: Optional[datetime] = None
-) -> DashboardStats:
-    """
-    Calculate dashboard statistics for a specific time period.
+def _tier_name(tiers, points, visits) -> Optional[str]:
+    """Name of the tier a customer has reached, if any."""
+    resolved = tiers.resolve_tier(points, visits)
+    return resolved.tier.name if resolved else None
 
-    Args:
-        db: Database session
-        venue_id: Venue ID
-        start_date: Start of period
-        end_date: End of period (None = now)
 
-    Returns:
-        DashboardStats with aggregated metrics
-    """
-    if end_date is None:
-        end_date = datetime.utcnow()
-
-    # Query transactions in period
+async def _get_top_products(db: AsyncSession, venue_id: UUID) -> List[TopProduct]:
+    """Top 5 selling products for the dashboard."""
     result = await db.execute(
-        select(
-            func.count(Transaction.id).label('transaction_count'),
-            func.coalesce(func.sum(Transaction.amount_total), 0).label('total_revenue'),
-            func.count(func.distinct(Transaction.user_id)).label('unique_customers'),
-            func.coalesce(func.sum(Transaction.points_earned), 0).label('points_issued'),
-            func.coalesce(func.sum(Transaction.points_spent), 0).label('points_redeemed'),
-        ).where(
-            and_(
-                Transaction.venue_id == venue_id,
-                Transaction.status == TransactionStatus.COMPLETED,
-                Transaction.created_at >= start_date,
-                Transaction.created_at < end_date
-            )
-        )
-    )
-    stats = result.one()
-
-    # Calculate average transaction value
-    avg_value = Decimal("0.00")
-    if stats.transaction_count > 0:
-        avg_value = Decimal(str(stats.total_revenue)) / stats.transaction_count
-
-    return DashboardStats(
-        revenue=Decimal(str(stats.total_revenue)),
-        transactions=stats.transaction_count,
-        unique_customers=stats.unique_customers,
-        points_issued=Decimal(str(stats.points_issued)),
-        points_redeemed=Decimal(str(stats.points_redeemed)),
-        avg_transaction_value=avg_value.quantize(Decimal("0.01"))
-    )
-
-
-@router.get("/venues/{venue_id}/dashboard", response_model=DashboardResponse)
-async def get_venue_dashboard(
-    venue: Venue = Depends(get_venue_owner),
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    Get comprehensive dashboard for venue owner.
-
-    Returns metrics for:
-    - Today (since midnight)
-    - This week (last 7 days)
-    - This month (last 30 days)
-    - All time
-
-    Plus:
-    - Top 5 selling products this week
-    - Last 10 transactions
-    - Products with low stock
-
-    Args:
-        venue: Venue object (from dependency, validates ownership)
-        db: Database session
-
-    Returns:
-        Complete dashboard with all sections
-    """
-    now = datetime.utcnow()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_start = now - timedelta(days=7)
-    month_start = now - timedelta(days=30)
-
-    # Get stats for each period
-    today_stats = await _get_stats_for_period(db, venue.id, today_start, now)
-    week_stats = await _get_stats_for_period(db, venue.id, week_start, now)
-    month_stats = await _get_stats_for_period(db, venue.id, month_start, now)
-    all_time_stats = await _get_stats_for_period(
-        db, venue.id, datetime(2020, 1, 1), now
-    )
-
-    overview = DashboardOverview(
-        today=today_stats,
-        week=week_stats,
-        month=month_stats,
-        all_time=all_time_stats
-    )
-
-    # Get top 5 products this week
-    top_products_result = await db.execute(
         select(Product).where(
-            Product.venue_id == venue.id
+            Product.venue_id == venue_id
         ).order_by(
             desc(Product.total_sold)
         ).limit(5)
     )
-    products = top_products_result.scalars().all()
+    products = result.scalars().all()
 
-    top_products = [
+    return [
         TopProduct(
             product_id=p.id,
             name=p.name,
@@ -165,19 +77,21 @@ async def get_venue_dashboard(
         for p in products
     ]
 
-    # Get recent transactions (last 10)
-    recent_txns_result = await db.execute(
+
+async def _get_recent_transactions(db: AsyncSession, venue_id: UUID) -> List[RecentTransaction]:
+    """Last 10 transactions at the venue with customer names."""
+    result = await db.execute(
         select(Transaction, User).join(
             User, Transaction.user_id == User.id
         ).where(
-            Transaction.venue_id == venue.id
+            Transaction.venue_id == venue_id
         ).order_by(
             desc(Transaction.created_at)
         ).limit(10)
     )
-    txns_with_users = recent_txns_result.all()
+    txns_with_users = result.all()
 
-    recent_transactions = [
+    return [
         RecentTransaction(
             id=txn.id,
             user_name=f"{user.first_name or ''} {user.last_name or ''}".strip() or user.email,
@@ -189,11 +103,13 @@ async def get_venue_dashboard(
         for txn, user in txns_with_users
     ]
 
-    # Get low stock alerts
-    low_stock_result = await db.execute(
+
+async def _get_low_stock_alerts(db: AsyncSession, venue_id: UUID) -> List[LowStockAlert]:
+    """Available products at or below their low stock threshold."""
+    result = await db.execute(
         select(Product).where(
             and_(
-                Product.venue_id == venue.id,
+                Product.venue_id == venue_id,
                 Product.is_available == True,
                 Product.stock_quantity != None,
                 Product.low_stock_threshold != None,
@@ -203,9 +119,9 @@ async def get_venue_dashboard(
             asc(Product.stock_quantity)
         )
     )
-    low_stock_products = low_stock_result.scalars().all()
+    low_stock_products = result.scalars().all()
 
-    low_stock_alerts = [
+    return [
         LowStockAlert(
             product_id=p.id,
             name=p.name,
@@ -217,6 +133,59 @@ async def get_venue_dashboard(
         for p in low_stock_products
     ]
 
+
+@router.get("/venues/{venue_id}/dashboard", response_model=DashboardResponse)
+async def get_venue_dashboard(
+    venue: Venue = Depends(get_venue_owner),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get comprehensive dashboard for venue owner.
+
+    Returns metrics for:
+    - Today (since midnight)
+    - This week (last 7 days)
+    - This month (last 30 days)
+    - All time
+
+    Plus:
+    - Top 5 selling products this week
+    - Last 10 transactions
+    - Products with low stock
+
+    All four periods are aggregated in one pass over the venue's daily rollup,
+    and the four dashboard sections are queried concurrently.
+
+    Args:
+        venue: Venue object (from dependency, validates ownership)
+        db: Database session
+
+    Returns:
+        Complete dashboard with all sections
+    """
+    now = datetime.utcnow()
+    periods = {
+        "today": now.replace(hour=0, minute=0, second=0, microsecond=0),
+        "week": now - timedelta(days=7),
+        "month": now - timedelta(days=30),
+        "all_time": None,
+    }
+
+    stats, top_products, recent_transactions, low_stock_alerts = await run_concurrently(
+        db,
+        lambda session: DashboardStatsService.get_stats_for_periods(session, venue.id, periods, now),
+        lambda session: _get_top_products(session, venue.id),
+        lambda session: _get_recent_transactions(session, venue.id),
+        lambda session: _get_low_stock_alerts(session, venue.id),
+    )
+
+    overview = DashboardOverview(
+        today=stats["today"],
+        week=stats["week"],
+        month=stats["month"],
+        all_time=stats["all_time"]
+    )
+
     return DashboardResponse(
         overview=overview,
         top_products=top_products,
@@ -231,7 +200,7 @@ async def list_venue_products(
     category: Optional[str] = Query(None, description="Filter by category"),
     has_active_bonus: Optional[bool] = Query(None, description="Filter by active bonus"),
     in_stock_only: bool = Query(False, description="Only show items in stock"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List all products for venue management.
@@ -328,6 +297,7 @@ async def create_product(
 
     db.add(new_product)
     await db.commit()
+    venue_catalog.invalidate(venue.id)
     await db.refresh(new_product)
 
     return ProductResponse.model_validate(new_product)
@@ -388,6 +358,7 @@ async def update_product(
         product.margin_percent = ((product.price - product.cost) / product.price) * 100
 
     await db.commit()
+    venue_catalog.invalidate(venue.id)
     await db.refresh(product)
 
     return ProductResponse.model_validate(product)
@@ -435,6 +406,7 @@ async def delete_product(
     # Soft delete
     product.is_available = False
     await db.commit()
+    venue_catalog.invalidate(venue.id)
 
 
 @router.post("/venues/{venue_id}/products/{product_id}/bonus", response_model=ProductResponse)
@@ -502,6 +474,7 @@ async def activate_product_bonus(
     )
 
     await db.commit()
+    venue_catalog.invalidate(venue.id)
     await db.refresh(product)
 
     return ProductResponse.model_validate(product)
@@ -551,6 +524,7 @@ async def deactivate_product_bonus(
     product.deactivate_bonus()
 
     await db.commit()
+    venue_catalog.invalidate(venue.id)
     await db.refresh(product)
 
     return ProductResponse.model_validate(product)
@@ -561,11 +535,14 @@ async def get_venue_analytics(
     venue: Venue = Depends(get_venue_owner),
     start_date: Optional[datetime] = Query(None, description="Start date for analytics (default: 30 days ago)"),
     end_date: Optional[datetime] = Query(None, description="End date for analytics (default: now)"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed analytics with date range filtering.
 
+    Revenue, points and referral figures are read from the venue_daily_stats
+    rollup, so they cover whole days from start_date's day to end_date's day.
+
     Provides business intelligence including:
     - Revenue trends (daily)
     - Customer acquisition (new vs returning)
@@ -588,36 +565,19 @@ async def get_venue_analytics(
     if not start_date:
         start_date = end_date - timedelta(days=30)
 
-    # Revenue trend (daily grouping)
-    revenue_query = select(
-        func.date(Transaction.created_at).label('date'),
-        func.sum(Transaction.amount_total).label('revenue'),
-        func.count(Transaction.id).label('transactions'),
-        func.count(func.distinct(Transaction.user_id)).label('unique_customers')
-    ).where(
-        and_(
-            Transaction.venue_id == venue.id,
-            Transaction.status == TransactionStatus.COMPLETED,
-            Transaction.created_at >= start_date,
-            Transaction.created_at < end_date
-        )
-    ).group_by(
-        func.date(Transaction.created_at)
-    ).order_by(
-        func.date(Transaction.created_at)
+    # Revenue trend, points and referral totals all come from the daily rollup
+    daily_stats = await DailyStatsRollup.get_daily_stats(
+        db, venue.id, start_date.date(), end_date.date()
     )
 
-    revenue_result = await db.execute(revenue_query)
-    revenue_data = revenue_result.all()
-
     revenue_trend = [
         RevenueDataPoint(
             date=str(row.date),
             revenue=Decimal(str(row.revenue or 0)),
-            transactions=row.transactions,
+            transactions=row.transaction_count,
             unique_customers=row.unique_customers
         )
-        for row in revenue_data
+        for row in daily_stats
     ]
 
     # Customer acquisition (simplified - first visit vs repeat)
@@ -628,27 +588,12 @@ async def get_venue_analytics(
             new_customers=0,  # Would need UserPoints.first_visit tracking
             returning_customers=row.unique_customers
         )
-        for row in revenue_data
+        for row in daily_stats
     ]
 
     # Points analysis
-    points_query = select(
-        func.sum(Transaction.points_earned).label('issued'),
-        func.sum(Transaction.points_spent).label('redeemed')
-    ).where(
-        and_(
-            Transaction.venue_id == venue.id,
-            Transaction.status == TransactionStatus.COMPLETED,
-            Transaction.created_at >= start_date,
-            Transaction.created_at < end_date
-        )
-    )
-
-    points_result = await db.execute(points_query)
-    points_data = points_result.one()
-
-    total_issued = Decimal(str(points_data.issued or 0))
-    total_redeemed = Decimal(str(points_data.redeemed or 0))
+    total_issued = sum((Decimal(str(row.points_issued or 0)) for row in daily_stats), Decimal("0"))
+    total_redeemed = sum((Decimal(str(row.points_redeemed or 0)) for row in daily_stats), Decimal("0"))
     redemption_rate = 0.0
     if total_issued > 0:
         redemption_rate = float((total_redeemed / total_issued) * 100)
@@ -684,26 +629,13 @@ async def get_venue_analytics(
     ]
 
     # Referral impact
-    referral_query = select(
-        func.count(Transaction.id).label('count'),
-        func.sum(Transaction.points_earned).label('points')
-    ).where(
-        and_(
-            Transaction.venue_id == venue.id,
-            Transaction.transaction_type == TransactionType.REFERRAL_BONUS,
-            Transaction.created_at >= start_date,
-            Transaction.created_at < end_date
-        )
-    )
-
-    referral_result = await db.execute(referral_query)
-    referral_data = referral_result.one()
-
     referral_impact = ReferralImpact(
-        total_referrals=referral_data.count,
+        total_referrals=sum(row.referral_bonus_count for row in daily_stats),
         customers_from_referrals=0,  # Would need to track
         revenue_from_referrals=Decimal("0.00"),  # Would need to track
-        points_distributed=Decimal(str(referral_data.points or 0))
+        points_distributed=sum(
+            (Decimal(str(row.referral_bonus_points or 0)) for row in daily_stats), Decimal("0")
+        )
     )
 
     return AnalyticsResponse(
@@ -716,6 +648,59 @@ async def get_venue_analytics(
     )
 
 
+@router.post("/venues/{venue_id}/simulate-margins", response_model=MarginSimulationResponse)
+async def simulate_margin_change(
+    simulation: MarginSimulationRequest,
+    venue: Venue = Depends(get_venue_owner),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Simulate how a margin or multiplier change would affect points issued.
+
+    Replays every completed purchase in the period with the current and the
+    proposed configuration, using the same formula as live purchases (to the
+    cent). Nothing is saved. Product bonus promotions are not replayed.
+
+    Args:
+        simulation: Proposed margins/multiplier (omitted fields keep current values)
+        venue: Venue object (validates ownership)
+        db: Database session
+
+    Returns:
+        Points issued under both configurations and the difference
+
+    Example Request:
+        {
+            "beverage_margin_percent": 70.0,
+            "points_multiplier": 1.5,
+            "start_date": "2025-10-01T00:00:00"
+        }
+    """
+    end_date = simulation.end_date or datetime.utcnow()
+    start_date = simulation.start_date or end_date - timedelta(days=90)
+
+    if start_date >= end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be before end_date"
+        )
+
+    overrides = simulation.model_dump(
+        include=set(PointsRecalculator.CONFIG_FIELDS),
+        exclude_none=True
+    )
+
+    result = await PointsRecalculator.simulate(db, venue, overrides, start_date, end_date)
+
+    return MarginSimulationResponse(
+        date_range={
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat()
+        },
+        **result
+    )
+
+
 @router.get("/venues/{venue_id}/customers", response_model=CustomerListResponse)
 async def list_venue_customers(
     venue: Venue = Depends(get_venue_owner),
@@ -723,6 +708,8 @@ async def list_venue_customers(
     order: str = Query("desc", regex="^(asc|desc)$", description="Sort order"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces page)"),
+    include_estimate: bool = Query(False, description="Return an estimated instead of an exact total"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -734,12 +721,18 @@ async def list_venue_customers(
     - Last visit date
     - Lifetime spending
 
+    Large customer bases are cheaper to walk with cursors: pass next_cursor
+    as cursor to get the following page (same sort_by and order). Cursor
+    pages carry no total unless include_estimate is set.
+
     Args:
         venue: Venue object (validates ownership)
         sort_by: Sort field (points, spending, visits, last_visit)
         order: Sort order (asc, desc)
         page: Page number (1-indexed)
         page_size: Items per page (max 100)
+        cursor: next_cursor of the previous page
+        include_estimate: Return an estimated total (no full count)
         db: Database session
 
     Returns:
@@ -748,45 +741,52 @@ async def list_venue_customers(
     # Calculate offset
     offset = (page - 1) * page_size
 
-    # Base query: JOIN UserPoints with User
-    query = select(UserPoints, User).join(
-        User, UserPoints.user_id == User.id
-    ).where(
-        UserPoints.venue_id == venue.id
-    )
-
-    # Apply sorting
+    # Apply sorting (never-visited customers count as the oldest visit)
     if sort_by == "points":
         sort_column = UserPoints.points_available
     elif sort_by == "spending":
         sort_column = UserPoints.points_spent  # Proxy for spending
     elif sort_by == "visits":
-        sort_column = UserPoints.total_visits
+        sort_column = func.coalesce(UserPoints.total_visits, 0)
     elif sort_by == "last_visit":
-        sort_column = UserPoints.last_visit_date
+        sort_column = func.coalesce(UserPoints.last_visit_date, datetime(1970, 1, 1))
     else:
         sort_column = UserPoints.points_available
 
-    if order == "desc":
-        query = query.order_by(desc(sort_column))
-    else:
-        query = query.order_by(asc(sort_column))
+    # Ties broken by ID so cursor pages neither skip nor repeat customers
+    sort_key = ((sort_column, order == "desc"), (UserPoints.id, order == "desc"))
+    cursor_kind = f"customers:{sort_by}:{order}"
+
+    # Base query: JOIN UserPoints with User
+    query = select(UserPoints, User, sort_column.label("sort_value")).join(
+        User, UserPoints.user_id == User.id
+    ).where(
+        UserPoints.venue_id == venue.id
+    ).order_by(*order_by_key(sort_key))
 
     # Get total count
-    count_query = select(func.count()).select_from(
-        select(UserPoints).where(UserPoints.venue_id == venue.id).subquery()
-    )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    customers_query = select(UserPoints.id).where(UserPoints.venue_id == venue.id)
+    total = None
+    if include_estimate:
+        total = await estimate_count(db, customers_query)
+    elif not cursor:
+        count_query = select(func.count()).select_from(customers_query.subquery())
+        total_result = await db.execute(count_query)
+        total = total_result.scalar() or 0
 
     # Get paginated results
-    query = query.limit(page_size).offset(offset)
+    query = query.limit(page_size)
+    if cursor:
+        query = query.where(after_key(sort_key, decode_cursor(cursor, cursor_kind, key_types(sort_key))))
+    else:
+        query = query.offset(offset)
     result = await db.execute(query)
     customer_data = result.all()
 
     # Build customer list
+    tiers = TierConfigCache.get(venue)
     customers = []
-    for user_points, user in customer_data:
+    for user_points, user, _ in customer_data:
         full_name = f"{user.first_name or ''} {user.last_name or ''}".strip()
         if not full_name:
             full_name = user.email.split('@')[0]  # Use email prefix if no name
@@ -806,17 +806,24 @@ async def list_venue_customers(
                 current_streak=user_points.current_streak,
                 longest_streak=user_points.longest_streak,
                 last_visit_date=user_points.last_visit_date,
-                lifetime_spending=lifetime_spending
+                lifetime_spending=lifetime_spending,
+                tier=_tier_name(tiers, user_points.points_earned, user_points.total_visits),
             )
         )
 
     # Calculate total pages
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 0
+    total_pages = None
+    if total is not None:
+        total_pages = (total + page_size - 1) // page_size if total > 0 else 0
 
     return CustomerListResponse(
         customers=customers,
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor(
+            cursor_kind, customer_data, page_size,
+            lambda row: (row.sort_value, row.UserPoints.id),
+        ),
     )
@@ -14,8 +14,8 @@ from sqlalchemy import select, or_
 from app.db.session import get_db
 from app.core.config import settings
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -172,7 +172,7 @@ async def register(
     # Create new user
     new_user = User(
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hash_password_async(user_data.password),
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         referral_code=referral_code,
@@ -236,7 +236,7 @@ async def login(
         )
 
     # Verify password
-    if not user.password_hash or not verify_password(credentials.password, user.password_hash):
+    if not user.password_hash or not await verify_password_async(credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -549,7 +549,7 @@ async def reset_password(
         )
 
     # Hash and update password
-    user.password_hash = hash_password(data.new_password)
+    user.password_hash = await hash_password_async(data.new_password)
     await db.commit()
 
     return {
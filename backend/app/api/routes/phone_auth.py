@@ -20,6 +20,7 @@ from app.core.security import (
     generate_referral_code,
 )
 from app.core.sms import sms_service
+from app.services.sms_outbox import SmsOutboxService, sms_outbox_worker
 from app.models.user import User
 from app.models.verification_code import VerificationCode
 from app.models.referral import Referral, ReferralChain
@@ -180,7 +181,7 @@ async def send_verification_code(
     1. Invalidate any existing codes for this phone number
     2. Generate new 6-digit code
     3. Save to database with 5-minute expiration
-    4. Send via Twilio SMS
+    4. Queue the SMS in the outbox (delivered in the background)
 
     Args:
         request: Phone number to send code to
@@ -188,9 +189,6 @@ async def send_verification_code(
 
     Returns:
         Success message and expiration time
-
-    Raises:
-        HTTPException: If SMS sending fails
     """
     logger.info(f"Sending verification code to {request.phone_number}")
 
@@ -217,21 +215,19 @@ async def send_verification_code(
         expires_at=VerificationCode.create_expiration_time(),
     )
     db.add(verification)
-    await db.commit()
 
-    # Send SMS via Twilio
-    success = await sms_service.send_verification_code(
+    # Queue the SMS in the same transaction; the outbox worker sends it
+    await SmsOutboxService.enqueue(
+        db,
         phone_number=request.phone_number,
-        code=code
+        kind="verification",
+        body=sms_service.verification_message(code),
+        expires_at=verification.expires_at,
     )
+    await db.commit()
+    sms_outbox_worker.notify()
 
-    if not success:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to send verification code"
-        )
-
-    logger.info(f"Verification code sent successfully to {request.phone_number}")
+    logger.info(f"Verification code queued for {request.phone_number}")
 
     return SendCodeResponse(
         message="Verification code sent successfully",
@@ -459,11 +455,17 @@ async def register_user(
         await create_user_referral_chain(db, new_user, referrer)
         logger.info(f"User {new_user.id} referred by {referrer.id}")
 
+    # Queue welcome SMS with the new account
+    await SmsOutboxService.enqueue(
+        db,
+        phone_number=request.phone_number,
+        kind="welcome",
+        body=sms_service.welcome_message(new_user.referral_code),
+    )
+
     await db.commit()
     await db.refresh(new_user)
-
-    # Send welcome SMS
-    await sms_service.send_welcome_message(request.phone_number, new_user.referral_code)
+    sms_outbox_worker.notify()
 
     # Generate tokens
     access_token = create_access_token({"sub": str(new_user.id)})
@@ -6,7 +6,7 @@ Handles transaction creation, listing, and details.
 from typing import Optional, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -18,16 +18,58 @@ from app.schemas.transaction import (
     TransactionCreate,
     TransactionResponse,
     TransactionListResponse,
+    BulkTransactionCreate,
+    BulkTransactionResponse,
+    BulkTransactionResult,
 )
 from app.services.transaction_processor import TransactionProcessor
+from app.services.idempotency import IdempotencyStore, transaction_idempotency
 
 
 router = APIRouter()
 
 
+async def _run_idempotent(
+    operation,
+    route: str,
+    idempotency_key: Optional[str],
+    request_body: str,
+    current_user: User,
+    response: Response,
+    db: AsyncSession
+):
+    """
+    Run a route handler once per Idempotency-Key (per user).
+
+    Without a key the handler simply runs. The key is claimed in db's
+    transaction, so it is shared by all workers and commits with the purchase.
+    Replayed responses carry an Idempotent-Replayed: true header.
+    """
+    if not idempotency_key:
+        return await operation()
+
+    result, replayed = await transaction_idempotency.run(
+        db,
+        current_user.id,
+        idempotency_key,
+        IdempotencyStore.fingerprint(route, request_body),
+        operation
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
 @router.post("", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
     transaction_data: TransactionCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-generated key; retries with the same key return the original result"
+    ),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -48,8 +90,14 @@ async def create_transaction(
     - Each referrer in the chain gets 25% of points earned
     - Visit streaks award bonuses at 7, 14, and 30 days
 
+    Retries: send an Idempotency-Key header (e.g. a UUID per purchase). A retry
+    with the same key returns the original response without reprocessing, on
+    any worker; while the first attempt is still running it gets a 409.
+
     Args:
         transaction_data: Transaction creation data
+        response: Outgoing response (for the Idempotent-Replayed header)
+        idempotency_key: Optional Idempotency-Key header
         current_user: Authenticated user
         db: Database session
 
@@ -59,6 +107,8 @@ async def create_transaction(
     Raises:
         HTTPException: 400 if validation fails (invalid amounts, insufficient points)
         HTTPException: 404 if venue not found
+        HTTPException: 409 if a request with this Idempotency-Key is still running
+        HTTPException: 422 if the Idempotency-Key was used with a different body
         HTTPException: 500 if processing fails
 
     Example Request:
@@ -79,28 +129,141 @@ async def create_transaction(
             "payment_method": "card"
         }
     """
-    try:
-        # Process transaction with all business logic
-        transaction = await TransactionProcessor.create_transaction(
-            db,
-            current_user,
-            transaction_data
-        )
+    async def process() -> TransactionResponse:
+        try:
+            # Process transaction with all business logic
+            transaction = await TransactionProcessor.create_transaction(
+                db,
+                current_user,
+                transaction_data
+            )
+
+            return TransactionResponse.model_validate(transaction)
+
+        except HTTPException:
+            # Re-raise HTTP exceptions (validation errors, etc.)
+            raise
+
+        except Exception as e:
+            # Log error and return generic message
+            print(f"Transaction processing error: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to process transaction. Please try again."
+            )
+
+    return await _run_idempotent(
+        process,
+        "create_transaction",
+        idempotency_key,
+        transaction_data.model_dump_json(),
+        current_user,
+        response,
+        db
+    )
 
-        return TransactionResponse.model_validate(transaction)
 
-    except HTTPException:
-        # Re-raise HTTP exceptions (validation errors, etc.)
-        raise
+@router.post("/bulk", response_model=BulkTransactionResponse)
+async def create_transactions_bulk(
+    bulk_data: BulkTransactionCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-generated key; retries with the same key return the original result"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Record a batch of purchases from a venue's POS (e.g. end-of-night tab sync).
 
-    except Exception as e:
-        # Log error and return generic message
-        print(f"Transaction processing error: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to process transaction. Please try again."
+    Each item follows the same rules as POST /transactions, processed in the
+    order submitted, but the whole batch is loaded, calculated and written in a
+    fixed number of database round trips. Items are credited to the customer in
+    user_id; the caller must own every venue referenced.
+
+    Invalid items (unknown venue or customer, amount mismatch, insufficient
+    points) are reported individually and do not block the rest of the batch.
+
+    Send an Idempotency-Key header so a retried sync returns the original
+    results instead of recording the batch twice.
+
+    Args:
+        bulk_data: Up to 500 purchases, each with the customer's user_id
+        response: Outgoing response (for the Idempotent-Replayed header)
+        idempotency_key: Optional Idempotency-Key header
+        current_user: Authenticated venue owner
+        db: Database session
+
+    Returns:
+        Per-item results in submission order, plus success/failure counts
+
+    Raises:
+        HTTPException: 409 if a request with this Idempotency-Key is still running
+        HTTPException: 422 if the Idempotency-Key was used with a different body
+        HTTPException: 500 if the batch could not be written (nothing is saved)
+
+    Example Response:
+        {
+            "results": [
+                {"index": 0, "client_reference": "tab-17", "success": true,
+                 "status_code": 201, "transaction": {...}, "error": null},
+                {"index": 1, "client_reference": "tab-18", "success": false,
+                 "status_code": 400, "transaction": null,
+                 "error": "Insufficient points at this venue. ..."}
+            ],
+            "succeeded": 1,
+            "failed": 1
+        }
+    """
+    async def process() -> BulkTransactionResponse:
+        try:
+            outcomes = await TransactionProcessor.create_transactions_bulk(
+                db,
+                current_user,
+                bulk_data.transactions
+            )
+
+        except Exception as e:
+            # Log error and return generic message
+            print(f"Bulk transaction processing error: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to process transaction batch. Please try again."
+            )
+
+        results = [
+            BulkTransactionResult(
+                **{
+                    **outcome,
+                    "transaction": (
+                        TransactionResponse.model_validate(outcome["transaction"])
+                        if outcome["transaction"] else None
+                    ),
+                }
+            )
+            for outcome in outcomes
+        ]
+        succeeded = sum(1 for r in results if r.success)
+
+        return BulkTransactionResponse(
+            results=results,
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
         )
 
+    return await _run_idempotent(
+        process,
+        "create_transactions_bulk",
+        idempotency_key,
+        bulk_data.model_dump_json(),
+        current_user,
+        response,
+        db
+    )
+
 
 @router.get("", response_model=TransactionListResponse)
 async def list_transactions(
@@ -108,6 +271,8 @@ async def list_transactions(
     transaction_type: Optional[TransactionType] = Query(None, description="Filter by transaction type"),
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page (max 100)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces page)"),
+    include_estimate: bool = Query(False, description="Return an estimated instead of an exact total"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -120,11 +285,17 @@ async def list_transactions(
 
     Transactions are returned in reverse chronological order (newest first).
 
+    Deep history is cheaper to walk with cursors: pass next_cursor as cursor
+    to get the following page. Cursor pages carry no total unless
+    include_estimate is set.
+
     Args:
         venue_id: Optional venue filter
         transaction_type: Optional transaction type filter
         page: Page number (1-indexed)
         per_page: Number of items per page (max 100)
+        cursor: next_cursor of the previous page
+        include_estimate: Return an estimated total (no full count)
         current_user: Authenticated user
         db: Database session
 
@@ -136,8 +307,9 @@ async def list_transactions(
             "transactions": [...],
             "total": 150,
             "page": 1,
-            "per_page": 20,
-            "total_pages": 8
+            "page_size": 20,
+            "has_more": true,
+            "next_cursor": "eyJrIjoidHJhbnNhY3Rpb25zIi..."
         }
     """
     # Calculate offset
@@ -150,18 +322,19 @@ async def list_transactions(
         venue_id=venue_id,
         transaction_type=transaction_type,
         limit=per_page,
-        offset=offset
+        offset=offset,
+        cursor=cursor,
+        estimate_total=include_estimate
     )
-
-    # Calculate total pages
-    total_pages = (total + per_page - 1) // per_page if total > 0 else 0
+    next_cursor = TransactionProcessor.next_transactions_cursor(transactions, per_page)
 
     return TransactionListResponse(
         transactions=[TransactionResponse.model_validate(t) for t in transactions],
         total=total,
         page=page,
-        per_page=per_page,
-        total_pages=total_pages,
+        page_size=per_page,
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor,
     )
 
 
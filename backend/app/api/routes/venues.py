@@ -12,7 +12,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.api.dependencies import get_current_user, get_optional_current_user
 from app.models.user import User
 from app.models.venue import Venue
@@ -20,6 +20,7 @@ from app.models.user_points import UserPoints
 from app.models.product import Product
 from app.schemas.venue import VenueListItem, VenueResponse, VenueWithUserPoints
 from app.schemas.product import ProductResponse
+from app.services.venue_index import coordinate_arrays, haversine_km_batch
 
 
 router = APIRouter()
@@ -61,7 +62,7 @@ async def list_venues(
     latitude: Optional[float] = Query(None, description="User's latitude for distance calculation"),
     longitude: Optional[float] = Query(None, description="User's longitude for distance calculation"),
     max_distance_km: Optional[float] = Query(None, description="Maximum distance in kilometers"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     List all venues with optional filtering.
@@ -83,7 +84,8 @@ async def list_venues(
         List of VenueListItem matching filters
 
     Note:
-        Distance calculation uses Haversine formula for accuracy.
+        Distance calculation uses Haversine formula for accuracy, batched
+        over all venues (matches calculate_distance within 1e-9 km).
         Venues are returned sorted by distance if location provided, otherwise by name.
     """
     # Build query with filters
@@ -99,19 +101,26 @@ async def list_venues(
     result = await db.execute(query)
     venues = result.scalars().all()
 
+    # Distances for every located venue in one batch
+    distances = {}
+    if latitude is not None and longitude is not None:
+        located = [venue for venue in venues if venue.latitude and venue.longitude]
+        if located:
+            batch = haversine_km_batch(
+                latitude,
+                longitude,
+                *coordinate_arrays((float(venue.latitude), float(venue.longitude)) for venue in located),
+            )
+            distances = {venue.id: distance for venue, distance in zip(located, batch.tolist())}
+
     # Build response with distance calculation
     venue_items = []
     for venue in venues:
-        # Calculate distance if location provided
-        distance_km = None
-        if latitude is not None and longitude is not None and venue.latitude and venue.longitude:
-            distance_km = calculate_distance(
-                latitude, longitude, float(venue.latitude), float(venue.longitude)
-            )
+        distance_km = distances.get(venue.id)
 
-            # Skip if beyond max distance
-            if max_distance_km is not None and distance_km > max_distance_km:
-                continue
+        # Skip if beyond max distance
+        if distance_km is not None and max_distance_km is not None and distance_km > max_distance_km:
+            continue
 
         venue_items.append(
             VenueListItem(
@@ -148,7 +157,7 @@ async def list_venues(
 async def get_venue_details(
     venue_id: UUID,
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get detailed information about a specific venue.
@@ -214,7 +223,7 @@ async def get_venue_products(
     venue_id: UUID,
     category: Optional[str] = Query(None, description="Filter by product category"),
     in_stock_only: bool = Query(False, description="Show only products in stock"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all products for a specific venue.
@@ -273,7 +282,7 @@ async def get_venue_products(
 @router.get("/{venue_id}/promotions", response_model=List[ProductResponse])
 async def get_venue_promotions(
     venue_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all products with active bonus point promotions for a venue.
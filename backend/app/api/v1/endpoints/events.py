@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 
-from app.core.deps import get_db, get_current_user
+from app.core.deps import get_db, get_read_db, get_current_user
 from app.models.user import User
 from app.schemas.event import (
     EventList,
@@ -32,13 +32,16 @@ async def list_events(
     is_featured: Optional[bool] = Query(None, description="Filter by featured status"),
     limit: int = Query(default=20, le=100, description="Maximum number of results"),
     offset: int = Query(default=0, description="Offset for pagination"),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces offset)"),
+    include_estimate: bool = Query(False, description="Include an estimated total of matching events"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     List all events with optional filters.
 
     Public endpoint - no authentication required.
-    Returns paginated list of events with venue info.
+    Returns paginated list of events with venue info. Page with offset, or
+    follow next_cursor, which stays fast however deep the list goes.
     """
     event_service = EventService(db)
 
@@ -51,8 +54,20 @@ async def list_events(
         is_featured=is_featured,
         limit=limit,
         offset=offset,
+        cursor=cursor,
     )
 
+    estimated_total = None
+    if include_estimate:
+        estimated_total = await event_service.estimate_events(
+            venue_id=venue_id,
+            event_type=event_type,
+            status=status,
+            start_after=start_after,
+            start_before=start_before,
+            is_featured=is_featured,
+        )
+
     # Convert to response model with venue name
     event_responses = []
     for event in events:
@@ -66,13 +81,15 @@ async def list_events(
         total=len(event_responses),
         limit=limit,
         offset=offset,
+        next_cursor=EventService.next_list_cursor(events, limit),
+        estimated_total=estimated_total,
     )
 
 
 @router.get("/today", response_model=EventList)
 async def get_today_events(
     limit: int = Query(default=10, le=50),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get events happening today.
@@ -101,7 +118,7 @@ async def get_today_events(
 async def get_upcoming_events(
     days: int = Query(default=7, ge=1, le=30, description="Number of days to look ahead"),
     limit: int = Query(default=20, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get upcoming events within specified days.
@@ -129,7 +146,7 @@ async def get_upcoming_events(
 @router.get("/featured", response_model=EventList)
 async def get_featured_events(
     limit: int = Query(default=5, le=20),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get featured upcoming events.
@@ -191,7 +208,7 @@ async def get_my_events(
 @router.get("/{event_id}", response_model=EventResponse)
 async def get_event(
     event_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get a single event by ID.
@@ -217,7 +234,7 @@ async def get_venue_events(
     include_past: bool = Query(default=False, description="Include past events"),
     limit: int = Query(default=20, le=100),
     offset: int = Query(default=0),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get events for a specific venue.
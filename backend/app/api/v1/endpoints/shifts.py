@@ -6,17 +6,23 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, desc
 import bcrypt
 
-from app.core.deps import get_db, get_current_user
+from app.core.deps import get_db, get_read_db, get_current_user
+from app.core.hashing import hashing_executor
+from app.core.pin_cache import pin_cache
+from app.db.pagination import decode_cursor, estimate_count, next_cursor
 from app.models.user import User
 
 router = APIRouter()
 
+SHIFT_HISTORY_CURSOR = "shifts"
+SHIFT_HISTORY_CURSOR_TYPES = (datetime, (UUID, str))  # (started_at, id); id is a str on SQLite
+
 
 # ============== Pydantic Schemas ==============
 
@@ -98,16 +104,24 @@ class ActiveShiftWithTimer(BaseModel):
 
 # ============== Helper Functions ==============
 
-def hash_pin(pin: str) -> str:
-    """Hash a 4-digit PIN using bcrypt"""
+def _hash_pin_sync(pin: str) -> str:
     return bcrypt.hashpw(pin.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 
-def verify_pin(pin: str, hashed: str) -> bool:
-    """Verify a PIN against its hash"""
+def _verify_pin_sync(pin: str, hashed: str) -> bool:
     return bcrypt.checkpw(pin.encode('utf-8'), hashed.encode('utf-8'))
 
 
+async def hash_pin(pin: str) -> str:
+    """Hash a 4-digit PIN using bcrypt (in the hashing pool)"""
+    return await hashing_executor.run(_hash_pin_sync, pin)
+
+
+async def verify_pin(pin: str, hashed: str) -> bool:
+    """Verify a PIN against its hash (in the hashing pool)"""
+    return await hashing_executor.run(_verify_pin_sync, pin, hashed)
+
+
 # ============== PIN Management Endpoints ==============
 
 @router.post("/venues/{venue_id}/pins", response_model=EmployeePinResponse)
@@ -122,7 +136,7 @@ async def create_employee_pin(
     Only owners/managers can create PINs.
     """
     # Hash the PIN
-    pin_hash = hash_pin(pin_data.pin)
+    pin_hash = await hash_pin(pin_data.pin)
 
     # Check if employee already has a PIN at this venue
     result = await db.execute(
@@ -156,6 +170,11 @@ async def create_employee_pin(
     )
     row = result.fetchone()
 
+    # The old PIN must stop working immediately: commit first, so a clock-in
+    # racing this request cannot re-cache the old PIN from the old row
+    await db.commit()
+    pin_cache.invalidate(venue_id, pin_data.employee_id)
+
     return EmployeePinResponse(
         id=str(row.id),
         venue_id=str(row.venue_id),
@@ -215,7 +234,8 @@ async def clock_in(
     """
     from sqlalchemy import text
 
-    # Verify PIN
+    # Verify PIN (a recent success against the same stored hash skips bcrypt)
+    generation = pin_cache.generation()
     result = await db.execute(
         text("""
             SELECT id, employee_id, employee_name, employee_role, pin_hash
@@ -229,8 +249,18 @@ async def clock_in(
     if not pin_record:
         raise HTTPException(status_code=404, detail="Employee not found or no PIN set")
 
-    if not verify_pin(clock_in_data.pin, pin_record.pin_hash):
-        raise HTTPException(status_code=401, detail="Invalid PIN")
+    employee = pin_cache.get(venue_id, clock_in_data.employee_id, clock_in_data.pin, pin_record.pin_hash)
+    if employee is None:
+        if not await verify_pin(clock_in_data.pin, pin_record.pin_hash):
+            raise HTTPException(status_code=401, detail="Invalid PIN")
+
+        employee = {
+            "employee_name": pin_record.employee_name,
+            "employee_role": pin_record.employee_role,
+        }
+        pin_cache.put(
+            venue_id, clock_in_data.employee_id, clock_in_data.pin, pin_record.pin_hash, employee, generation
+        )
 
     # Check if employee already has an active shift
     active_check = await db.execute(
@@ -254,8 +284,8 @@ async def clock_in(
         {
             "venue_id": str(venue_id),
             "employee_id": clock_in_data.employee_id,
-            "employee_name": pin_record.employee_name,
-            "employee_role": pin_record.employee_role,
+            "employee_name": employee["employee_name"],
+            "employee_role": employee["employee_role"],
             "expected_hours": clock_in_data.expected_hours,
         }
     )
@@ -525,20 +555,28 @@ async def get_shift_summary(
 @router.get("/venues/{venue_id}/shifts/history", response_model=List[ShiftResponse])
 async def get_shift_history(
     venue_id: UUID,
+    response: Response,
     employee_id: Optional[str] = Query(None),
     start_date: Optional[str] = Query(None, description="YYYY-MM-DD"),
     end_date: Optional[str] = Query(None, description="YYYY-MM-DD"),
     status: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page (replaces offset)"),
+    include_estimate: bool = Query(False, description="Send an estimated total in X-Estimated-Total"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get shift history with filters"""
+    """
+    Get shift history with filters, newest first.
+
+    The body stays a plain list; the cursor for the next page is sent in the
+    X-Next-Cursor header (absent on the last page).
+    """
     from sqlalchemy import text
 
     # Build dynamic query
     conditions = ["venue_id = :venue_id"]
-    params = {"venue_id": str(venue_id), "limit": limit, "offset": offset}
+    params = {"venue_id": str(venue_id)}
 
     if employee_id:
         conditions.append("employee_id = :employee_id")
@@ -556,6 +594,26 @@ async def get_shift_history(
         conditions.append("status = :status")
         params["status"] = status
 
+    if include_estimate:
+        estimate = await estimate_count(
+            db, text(f"SELECT id FROM shifts WHERE {' AND '.join(conditions)}"), params
+        )
+        response.headers["X-Estimated-Total"] = str(estimate)
+
+    if cursor:
+        # Keyset: strictly after the last shift of the previous page
+        params["cursor_started_at"], params["cursor_id"] = decode_cursor(
+            cursor, SHIFT_HISTORY_CURSOR, SHIFT_HISTORY_CURSOR_TYPES
+        )
+        conditions.append(
+            "(started_at < :cursor_started_at OR (started_at = :cursor_started_at AND id < :cursor_id))"
+        )
+        page_clause = "LIMIT :limit"
+    else:
+        params["offset"] = offset
+        page_clause = "LIMIT :limit OFFSET :offset"
+    params["limit"] = limit
+
     where_clause = " AND ".join(conditions)
 
     result = await db.execute(
@@ -564,13 +622,17 @@ async def get_shift_history(
                    expected_hours, actual_hours, overtime_minutes, status, total_break_minutes, notes, created_at
             FROM shifts
             WHERE {where_clause}
-            ORDER BY started_at DESC
-            LIMIT :limit OFFSET :offset
+            ORDER BY started_at DESC, id DESC
+            {page_clause}
         """),
         params
     )
     shifts = result.fetchall()
 
+    shifts_cursor = next_cursor(SHIFT_HISTORY_CURSOR, shifts, limit, lambda s: (s.started_at, s.id))
+    if shifts_cursor:
+        response.headers["X-Next-Cursor"] = shifts_cursor
+
     # Get breaks for all shifts
     shift_ids = [str(s.id) for s in shifts]
     breaks_by_shift = {}
@@ -1,18 +1,19 @@
 """
 Venue endpoints (11-14)
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from geopy.distance import geodesic
 
-from app.core.deps import get_db, get_current_user
+from app.core.deps import get_db, get_read_db, get_current_user
+from app.core.venue_catalog import ALL_VENUES, venue_catalog
 from app.models.user import User
 from app.schemas.venue import (
     VenueList,
     VenueDetail,
     VenueResponse,
     ProductList,
+    ProductResponse,
     TierConfig,
 )
 from app.services.venue_service import VenueService
@@ -22,49 +23,69 @@ router = APIRouter()
 
 @router.get("", response_model=VenueList)
 async def list_venues(
+    request: Request,
     type: Optional[str] = Query(None, description="Filter by venue type (bar, club, restaurant)"),
     has_events: Optional[bool] = Query(None, description="Filter venues with events"),
     lat: Optional[float] = Query(None, description="User latitude for distance calculation"),
     lng: Optional[float] = Query(None, description="User longitude for distance calculation"),
+    max_distance_km: Optional[float] = Query(None, gt=0, description="Only venues within this distance (requires lat/lng)"),
     limit: int = Query(default=20, le=100, description="Maximum number of results"),
     offset: int = Query(default=0, description="Offset for pagination"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Endpoint #11: List venues with filters
 
     Retrieves a list of active venues with optional filtering by type and events.
-    If latitude and longitude are provided, calculates distance from user location.
+    If latitude and longitude are provided, venues are returned nearest first
+    with their distance from the user location.
 
     Query Parameters:
     - type: Filter by venue type (e.g., "bar", "club", "restaurant")
     - has_events: Filter venues that have events (true/false)
     - lat, lng: User location for distance calculation
+    - max_distance_km: Maximum distance from the user location
     - limit: Maximum number of results (default 20, max 100)
     - offset: Pagination offset (default 0)
+
+    Without a location the page is served from the catalog snapshot, with
+    an ETag (If-None-Match → 304).
     """
     venue_service = VenueService(db)
 
-    venues = await venue_service.list_venues(
+    if lat is None or lng is None:
+        key = ("list", ALL_VENUES, type, has_events, limit, offset)
+        entry = venue_catalog.get(key)
+        if entry is None:
+            version = venue_catalog.version()
+            venues = await venue_service.list_venues(
+                venue_type=type,
+                has_events=has_events,
+                limit=limit,
+                offset=offset,
+            )
+            venue_list = VenueList(
+                venues=[VenueResponse.model_validate(venue) for venue in venues],
+                total=len(venues),
+                limit=limit,
+                offset=offset,
+            )
+            entry = venue_catalog.put(key, venue_list.model_dump_json().encode(), version)
+        return venue_catalog.respond(request, entry)
+
+    nearby = await venue_service.list_nearby_venues(
+        lat,
+        lng,
         venue_type=type,
         has_events=has_events,
-        user_location=(lat, lng) if lat and lng else None,
+        max_distance_km=max_distance_km,
         limit=limit,
         offset=offset,
     )
-
-    # Convert to VenueResponse and calculate distance if location provided
     venue_responses = []
-    for venue in venues:
+    for venue, distance_km in nearby:
         venue_data = VenueResponse.model_validate(venue)
-
-        # Calculate distance if user location provided
-        if lat is not None and lng is not None:
-            venue_location = (venue.latitude, venue.longitude)
-            user_location = (lat, lng)
-            distance_km = geodesic(user_location, venue_location).km
-            venue_data.distance = round(distance_km, 2)
-
+        venue_data.distance = round(distance_km, 2)
         venue_responses.append(venue_data)
 
     return VenueList(
@@ -78,70 +99,91 @@ async def list_venues(
 @router.get("/{venue_id}", response_model=VenueDetail)
 async def get_venue_details(
     venue_id: str,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Endpoint #12: Get venue details
 
     Retrieves detailed information about a specific venue.
     This endpoint is public and doesn't require authentication.
+    Served from the catalog snapshot, with an ETag (If-None-Match → 304).
     """
-    venue_service = VenueService(db)
-    venue = await venue_service.get_venue_by_id(venue_id)
+    key = ("detail", venue_id)
+    entry = venue_catalog.get(key)
+    if entry is None:
+        version = venue_catalog.version()
+        venue_service = VenueService(db)
+        venue = await venue_service.get_venue_by_id(venue_id)
+
+        if not venue:
+            raise HTTPException(status_code=404, detail="Venue not found")
 
-    if not venue:
-        raise HTTPException(status_code=404, detail="Venue not found")
+        body = VenueDetail.model_validate(venue).model_dump_json().encode()
+        entry = venue_catalog.put(key, body, version)
 
-    return venue
+    return venue_catalog.respond(request, entry)
 
 
 @router.get("/{venue_id}/products", response_model=ProductList)
 async def get_venue_products(
     venue_id: str,
+    request: Request,
     has_bonus: Optional[bool] = Query(None, description="Filter products with bonuses"),
     category: Optional[str] = Query(None, description="Filter by product category"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Endpoint #13: Get venue products
 
     Retrieves all available products for a specific venue,
     with optional filtering by bonus availability and category.
+    Served from the catalog snapshot, with an ETag (If-None-Match → 304).
 
     Query Parameters:
     - has_bonus: Filter products that have bonus points (true/false)
     - category: Filter by product category (e.g., "drink", "food")
     """
-    venue_service = VenueService(db)
-
-    # First check if venue exists
-    venue = await venue_service.get_venue_by_id(venue_id)
-    if not venue:
-        raise HTTPException(status_code=404, detail="Venue not found")
+    key = ("products", venue_id, has_bonus, category)
+    entry = venue_catalog.get(key)
+    if entry is None:
+        version = venue_catalog.version()
+        venue_service = VenueService(db)
+
+        # First check if venue exists
+        venue = await venue_service.get_venue_by_id(venue_id)
+        if not venue:
+            raise HTTPException(status_code=404, detail="Venue not found")
+
+        products = await venue_service.get_products(
+            venue_id,
+            has_bonus=has_bonus,
+            category=category,
+        )
 
-    products = await venue_service.get_products(
-        venue_id,
-        has_bonus=has_bonus,
-        category=category,
-    )
+        product_list = ProductList(
+            products=[ProductResponse.model_validate(product) for product in products],
+            total=len(products),
+        )
+        entry = venue_catalog.put(key, product_list.model_dump_json().encode(), version)
 
-    return ProductList(
-        products=products,
-        total=len(products),
-    )
+    return venue_catalog.respond(request, entry)
 
 
 @router.get("/{venue_id}/tier-config", response_model=TierConfig)
 async def get_tier_config(
     venue_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Endpoint #14: Get tier configuration (owner only)
 
     Retrieves the tier/loyalty program configuration for a venue.
     This endpoint is restricted to venue owners only.
+    Served from the catalog snapshot, with an ETag (If-None-Match → 304);
+    the snapshot remembers the owner, so cached checks need no query.
 
     Returns tier levels with:
     - Point thresholds
@@ -149,16 +191,29 @@ async def get_tier_config(
     - Discount percentages
     - Bonus multipliers
     """
-    venue_service = VenueService(db)
-
-    # Check if user is venue owner
-    is_owner = await venue_service.is_owner(current_user.id, venue_id)
-    if not is_owner:
-        raise HTTPException(
-            status_code=403,
-            detail="Access denied. Only venue owners can view tier configuration.",
+    key = ("tier-config", venue_id)
+    entry = venue_catalog.get(key)
+    if entry is None:
+        version = venue_catalog.version()
+        venue_service = VenueService(db)
+
+        # Check if user is venue owner
+        is_owner = await venue_service.is_owner(current_user.id, venue_id)
+        if not is_owner:
+            raise _not_venue_owner()
+
+        tier_config = await venue_service.get_tier_config(venue_id)
+        entry = venue_catalog.put(
+            key, tier_config.model_dump_json().encode(), version, owner_id=current_user.id
         )
+    elif entry.owner_id != current_user.id:
+        raise _not_venue_owner()
 
-    tier_config = await venue_service.get_tier_config(venue_id)
+    return venue_catalog.respond(request, entry)
 
-    return tier_config
+
+def _not_venue_owner() -> HTTPException:
+    return HTTPException(
+        status_code=403,
+        detail="Access denied. Only venue owners can view tier configuration.",
+    )
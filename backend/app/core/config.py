@@ -4,7 +4,7 @@ Configuration settings for WiesbadenAfterDark API
 import os
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -14,15 +14,72 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "WiesbadenAfterDark API"
     VERSION: str = "1.0.0"
+    # Pre-generated schema served on /openapi.json (see generate_openapi.py)
+    OPENAPI_SCHEMA_PATH: Optional[str] = None
 
     # Database Settings (Supabase PostgreSQL)
     DATABASE_URL: str
+    DEBUG: bool = False  # Also logs every SQL statement
+
+    # Connection pool (per worker process: workers × (size + overflow) must
+    # stay below the Supabase connection limit)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_COMMAND_TIMEOUT: Optional[float] = None  # asyncpg per-statement timeout
+
+    # asyncpg statement caches; set both to 0 behind the Supabase transaction
+    # pooler (port 6543), which cannot keep prepared statements across queries
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
+    # Optional read replica for read-only endpoints (same pool settings)
+    DATABASE_READ_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 10.0  # Client reads go to primary after its writes
+    READ_REPLICA_RETRY_SECONDS: float = 30.0  # Primary-only period after a replica failure
 
     # Supabase Settings (Optional - not critical for basic operation)
     SUPABASE_URL: Optional[str] = None
     SUPABASE_KEY: Optional[str] = None
     SUPABASE_JWT_SECRET: Optional[str] = None
 
+    # Twilio SMS (Optional - without credentials codes are only logged)
+    TWILIO_ACCOUNT_SID: Optional[str] = None
+    TWILIO_AUTH_TOKEN: Optional[str] = None
+    TWILIO_PHONE_NUMBER: Optional[str] = None
+
+    # SMS outbox delivery (see app/services/sms_outbox.py)
+    SMS_TRANSPORT: str = "auto"  # auto (Twilio if configured, else log), twilio, log, fake
+    SMS_OUTBOX_WORKER: bool = True  # Run the delivery worker in each API process
+    SMS_SEND_CONCURRENCY: int = 4  # Messages in flight to the provider per worker
+    SMS_OUTBOX_BATCH_SIZE: int = 20
+    SMS_OUTBOX_POLL_SECONDS: float = 2.0
+    SMS_MAX_ATTEMPTS: int = 5
+    SMS_RETRY_BASE_SECONDS: float = 2.0  # Doubles per attempt
+    SMS_RETRY_MAX_SECONDS: float = 300.0
+
+    # LangFuse request tracing (disabled without keys)
+    LANGFUSE_PUBLIC_KEY: Optional[str] = None
+    LANGFUSE_SECRET_KEY: Optional[str] = None
+    LANGFUSE_HOST: str = "http://localhost:3100"
+    LANGFUSE_SAMPLE_RATE: float = 0.1  # Share of ordinary requests traced
+    # Per path prefix, longest match wins, e.g. {"/api/v1/transactions": 1.0}
+    LANGFUSE_ROUTE_SAMPLE_RATES: Dict[str, float] = {"/health": 0.0}
+    LANGFUSE_SLOW_REQUEST_MS: float = 1000.0  # Slower requests are always traced (as are 5xx)
+    LANGFUSE_BATCH_SIZE: int = 100
+    LANGFUSE_FLUSH_INTERVAL_SECONDS: float = 5.0
+    LANGFUSE_MAX_BUFFER: int = 10_000  # Oldest events are dropped beyond this
+
+    # Prometheus metrics on /metrics (summed over workers via snapshot files)
+    METRICS_ENABLED: bool = True
+    METRICS_DIR: Optional[str] = None  # Default: a temp dir per server (parent PID)
+    METRICS_SNAPSHOT_SECONDS: float = 5.0  # How stale other workers' values may be
+
+    # Per-request SQL profiling (app/core/query_profiler.py); adds report headers in DEBUG
+    SQL_PROFILING: bool = False
+    SQL_PROFILING_REPEAT_THRESHOLD: int = 3  # Same statement shape this often = possible N+1
+
     # JWT Settings
     SECRET_KEY: str = Field(
         default_factory=lambda: os.getenv("SECRET_KEY")
@@ -32,6 +89,36 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
 
+    # Threads for bcrypt password/PIN hashing (per worker; each uses one core)
+    HASHING_MAX_WORKERS: int = 4
+
+    # Successful employee PIN checks (per worker; only skips bcrypt, the PIN row
+    # is still read on every clock-in)
+    PIN_CACHE_TTL_SECONDS: float = 2 * 60
+    PIN_CACHE_MAX_ENTRIES: int = 5_000
+
+    # Authenticated-user cache (per worker); TTL bounds staleness across workers
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Nearby-venue spatial index (per worker); venue changes made by other
+    # workers show up once the index is this old
+    VENUE_INDEX_TTL_SECONDS: float = 60.0
+
+    # Public venue catalog responses (per worker); TTL bounds how long other
+    # workers serve a venue or product after it changed
+    VENUE_CATALOG_TTL_SECONDS: float = 60.0
+    VENUE_CATALOG_MAX_ENTRIES: int = 2_000
+
+    # Venue revenue/points delta compaction (app/services/venue_counters.py);
+    # safe to run in every worker, concurrent compactors skip each other's rows
+    VENUE_COUNTER_COMPACTOR: bool = True
+    VENUE_COUNTER_COMPACT_SECONDS: float = 60.0
+
+    # Idempotency-Key purge (app/services/idempotency.py); keys are kept a day
+    IDEMPOTENCY_KEY_PURGER: bool = True
+    IDEMPOTENCY_PURGE_SECONDS: float = 60 * 60
+
     # Points Expiration
     POINTS_EXPIRATION_DAYS: int = 180
 
@@ -1,41 +1,15 @@
 """
 Database configuration and session management
+
+The engine, session factory and get_db dependency live in app.db.session so
+the process holds a single connection pool; they are re-exported here for
+modules that import them from app.core.
 """
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from app.core.config import settings
-
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-    future=True,
-    pool_pre_ping=True,
-)
-
-# Create async session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
-
-# Base class for models
-Base = declarative_base()
 
+from app.db.session import Base as SessionBase
+from app.db.session import engine, AsyncSessionLocal, get_db  # noqa: F401
 
-async def get_db() -> AsyncSession:
-    """
-    Dependency for getting async database sessions
-    """
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+# Base class for models. It shares app.db.session.Base's metadata, so init_db
+# creates every table and foreign keys between the two resolve.
+Base = declarative_base(metadata=SessionBase.metadata)
@@ -1,7 +1,6 @@
 """
 Dependencies for API endpoints
 """
-from typing import AsyncGenerator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
@@ -9,27 +8,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.config import settings
-from app.core.database import AsyncSessionLocal
+from app.core.user_cache import user_cache
+from app.db.session import get_db, get_read_db  # noqa: F401
 from app.models.user import User
 
 security = HTTPBearer()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """
-    Dependency for getting async database sessions
-    """
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
-
-
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -56,7 +41,13 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    # Get user from database
+    # Recently seen users skip the database read
+    issued_at = payload.get("iat")
+    user = await user_cache.get(db, user_id, issued_at)
+    if user is not None:
+        return user
+
+    generation = user_cache.generation()
     result = await db.execute(
         select(User).where(User.id == user_id)
     )
@@ -65,6 +56,8 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
 
+    user_cache.put(user, issued_at, generation)
+
     return user
 
 
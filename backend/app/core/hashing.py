@@ -0,0 +1,112 @@
+"""
+Dedicated executor for password and PIN hashing.
+bcrypt is deliberately slow (tens of milliseconds per call); running it in
+this pool keeps the event loop free for other requests, and the pool size
+caps how many CPU cores hashing may occupy at once.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+class HashingExecutor:
+    """
+    Bounded thread pool for bcrypt calls, with queue metrics.
+
+    Calls beyond max_workers wait in the pool's queue. A non-zero queue depth
+    during shift changes means hashing is saturated: clock-ins are waiting
+    for a thread, not for the database. (bcrypt releases the GIL, so the
+    threads hash in parallel.)
+    """
+
+    def __init__(self, max_workers: int = settings.HASHING_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0  # Submitted and not finished (queued + running)
+        self.running = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zero the cumulative counters."""
+        with self._lock:
+            self.max_queue_depth = 0
+            self.completed = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="hashing",
+            )
+        return self._executor
+
+    def _run_job(self, submitted: float, fn: Callable[..., Any], args: tuple) -> Any:
+        """Runs in a pool thread: record the queue wait, then call fn."""
+        waited = time.perf_counter() - submitted
+        with self._lock:
+            self.running += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking hashing function in the pool.
+
+        Args:
+            fn: Function to call (e.g. bcrypt.checkpw)
+            *args: Positional arguments for fn
+
+        Returns:
+            fn's return value
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.in_flight += 1
+            queued = self.in_flight - min(self.in_flight, self.max_workers)
+            if queued > self.max_queue_depth:
+                self.max_queue_depth = queued
+        try:
+            return await loop.run_in_executor(
+                self._get_executor(), self._run_job, time.perf_counter(), fn, args
+            )
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage for this process."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "queue_depth": max(self.in_flight - self.running, 0),
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "avg_wait_ms": round(self.wait_total / self.completed * 1000, 3) if self.completed else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        """Stop the pool threads (a new pool is started on next use)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Shared by password and PIN hashing
+hashing_executor = HashingExecutor()
@@ -0,0 +1,377 @@
+"""
+In-process metrics in the Prometheus text format.
+Records request latency per route template, database queries per request,
+connection pool saturation and business counters, and serves the sum over
+all worker processes on GET /metrics.
+
+Example alert on p99 latency per route:
+    histogram_quantile(0.99, sum by (le, route) (rate(http_request_duration_seconds_bucket[5m]))) > 1
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import tempfile
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.session import get_pool_status
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+QUERY_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# Gauges of a worker whose snapshot is older than this many intervals are
+# left out of the sum (the worker has probably exited)
+STALE_SNAPSHOT_INTERVALS = 3
+
+
+def labels(**values: Any) -> str:
+    """Render label pairs in Prometheus syntax (also the series key)."""
+    return ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in values.items()
+    )
+
+
+class Histogram:
+    """Fixed-bucket histogram (per-bucket counts; cumulated when rendered)."""
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms for one worker process.
+
+    Updates are plain dict and list operations without a lock: they happen
+    on the event loop thread only (request middleware and SQLAlchemy event
+    hooks), and never span an await.
+
+    Every snapshot_seconds, and on each scrape, the registry writes its
+    values as JSON to `directory` (one file per process, replaced
+    atomically). A scrape reads all files in the directory and adds them
+    up, so whichever uvicorn/gunicorn worker answers GET /metrics reports
+    the whole server. Counters and histograms of exited workers keep
+    counting towards the total; their gauges are dropped once stale.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        snapshot_seconds: float = settings.METRICS_SNAPSHOT_SECONDS,
+        pid: Optional[int] = None,
+    ):
+        self.directory = directory
+        self.snapshot_seconds = snapshot_seconds
+        self.pid = pid or os.getpid()
+        self._families: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {}  # name -> (type, help, buckets)
+        self._series: Dict[str, Dict[str, Any]] = {}  # name -> {labels: value or Histogram}
+        self._collectors: List[Callable[[], Dict[str, Dict[str, float]]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def _register(self, name: str, kind: str, help_text: str, buckets: Tuple[float, ...] = ()) -> None:
+        self._families[name] = (kind, help_text, tuple(buckets))
+        self._series.setdefault(name, {})
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._register(name, "counter", help_text)
+
+    def gauge(self, name: str, help_text: str) -> None:
+        """Declare a gauge; its values come from collectors (see add_collector)."""
+        self._register(name, "gauge", help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._register(name, "histogram", help_text, buckets)
+
+    def inc(self, name: str, label_values: str = "", amount: float = 1) -> None:
+        """Add to a counter series."""
+        series = self._series[name]
+        series[label_values] = series.get(label_values, 0) + amount
+
+    def observe(self, name: str, value: float, label_values: str = "") -> None:
+        """Record one observation in a histogram series."""
+        series = self._series[name]
+        histogram = series.get(label_values)
+        buckets = self._families[name][2]
+        if histogram is None:
+            histogram = series[label_values] = Histogram(len(buckets))
+        histogram.counts[bisect_left(buckets, value)] += 1
+        histogram.sum += value
+
+    def add_collector(self, collector: Callable[[], Dict[str, Dict[str, float]]]) -> None:
+        """
+        Register a callable returning values read at snapshot time
+        ({name: {labels: value}}), for gauges and for counters kept elsewhere.
+        """
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """This process's values, JSON-serializable."""
+        values: Dict[str, Dict[str, Any]] = {}
+        for name, series in self._series.items():
+            if self._families[name][0] == "histogram":
+                values[name] = {key: [h.counts, h.sum] for key, h in series.items()}
+            else:
+                values[name] = dict(series)
+        for collector in self._collectors:
+            for name, series in collector().items():
+                values.setdefault(name, {}).update(series)
+        return {"pid": self.pid, "time": time.time(), "values": values}
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"worker-{pid}.json")
+
+    def write_snapshot(self, snapshot: Optional[Dict[str, Any]] = None) -> None:
+        """Publish this process's snapshot for the other workers' scrapes."""
+        if not self.directory:
+            return
+        snapshot = snapshot or self.snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._snapshot_path(self.pid)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(temporary, path)
+
+    def _read_snapshots(self) -> List[Dict[str, Any]]:
+        """Published snapshots of the other processes."""
+        snapshots = []
+        if not self.directory or not os.path.isdir(self.directory):
+            return snapshots
+        own = os.path.basename(self._snapshot_path(self.pid))
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json") or filename == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Removed or being replaced; next scrape reads it
+        return snapshots
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Values summed over all worker processes.
+
+        Returns:
+            {name: {labels: value}}, histograms as [bucket counts, sum]
+        """
+        own = self.snapshot()
+        try:
+            self.write_snapshot(own)
+        except OSError as e:
+            print(f"⚠️  Metrics snapshot failed: {e}")
+
+        stale_before = time.time() - self.snapshot_seconds * STALE_SNAPSHOT_INTERVALS
+        merged: Dict[str, Dict[str, Any]] = {}
+        for snapshot in [own, *self._read_snapshots()]:
+            for name, series in snapshot["values"].items():
+                family = self._families.get(name)
+                if family is None:
+                    continue
+                if family[0] == "gauge" and snapshot["time"] < stale_before:
+                    continue
+                target = merged.setdefault(name, {})
+                for key, value in series.items():
+                    if family[0] != "histogram":
+                        target[key] = target.get(key, 0) + value
+                    elif key in target:
+                        counts, total = target[key]
+                        target[key] = [[a + b for a, b in zip(counts, value[0])], total + value[1]]
+                    else:
+                        target[key] = [list(value[0]), value[1]]
+        return merged
+
+    def render(self) -> str:
+        """All workers' metrics in the Prometheus text exposition format."""
+        merged = self.collect()
+        lines: List[str] = []
+        for name, (kind, help_text, buckets) in self._families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(merged.get(name, {}).items()):
+                if kind != "histogram":
+                    lines.append(f"{name}{{{key}}} {_number(value)}" if key else f"{name} {_number(value)}")
+                    continue
+                counts, total = value
+                prefix = f"{key}," if key else ""
+                cumulative = 0
+                for bound, count in zip((*buckets, "+Inf"), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{prefix}le="{_number(bound)}"}} {cumulative}')
+                suffix = f"{{{key}}}" if key else ""
+                lines.append(f"{name}_sum{suffix} {_number(total)}")
+                lines.append(f"{name}_count{suffix} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.snapshot_seconds)
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                print(f"⚠️  Metrics snapshot failed: {e}")
+
+    def start(self) -> None:
+        """Publish snapshots periodically from the running event loop."""
+        if self.directory and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop publishing, after a final snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            self.write_snapshot()
+        except OSError:
+            pass
+
+
+def _number(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def default_metrics_directory() -> str:
+    """
+    Snapshot directory shared by the workers of one server.
+
+    uvicorn --workers and gunicorn fork all workers from one master, so the
+    parent PID separates servers (and deploys) on the same host.
+    """
+    return settings.METRICS_DIR or os.path.join(
+        tempfile.gettempdir(), f"wiesbaden-metrics-{os.getppid()}"
+    )
+
+
+registry = MetricsRegistry(default_metrics_directory())
+
+registry.counter("http_requests_total", "HTTP requests by route template and status code")
+registry.histogram("http_request_duration_seconds", "HTTP request latency by route template")
+registry.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", QUERY_COUNT_BUCKETS
+)
+registry.histogram("http_request_db_seconds", "Time spent in SQL statements per HTTP request")
+registry.histogram(
+    "db_query_duration_seconds", "SQL statement latency by engine", QUERY_LATENCY_BUCKETS
+)
+registry.gauge("db_pool_checked_out", "Connections currently checked out of the pool")
+registry.gauge("db_pool_max_connections", "Pool size plus max overflow")
+registry.counter("db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for a connection")
+registry.counter("db_pool_checkout_wait_seconds_total", "Time spent checking out connections")
+
+
+# (queries, seconds) of the current request; None outside requests
+_request_db_stats: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def instrument_engine(db_engine: AsyncEngine, name: str, metrics: MetricsRegistry = registry) -> None:
+    """
+    Time an engine's SQL statements and report its pool usage.
+
+    Args:
+        db_engine: Engine to instrument
+        name: Value of the engine label ("primary", "replica")
+        metrics: Registry to record into
+    """
+    engine_labels = labels(engine=name)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        metrics.observe("db_query_duration_seconds", elapsed, engine_labels)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(db_engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    def pool_values() -> Dict[str, Dict[str, float]]:
+        status = get_pool_status(db_engine)
+        if "checked_out" not in status:
+            return {}
+        values = {
+            "db_pool_checked_out": {engine_labels: status["checked_out"]},
+            "db_pool_max_connections": {engine_labels: status["max_connections"]},
+        }
+        if "checkouts" in status:
+            pool = db_engine.pool
+            values["db_pool_checkout_timeouts_total"] = {engine_labels: pool.checkout_timeouts}
+            values["db_pool_checkout_wait_seconds_total"] = {engine_labels: pool.checkout_wait_total}
+        return values
+
+    metrics.add_collector(pool_values)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and SQL usage per route.
+
+    Routes are labelled by their template ("/api/v1/venues/{venue_id}"), read
+    from the matched route after the request, so the number of series stays
+    bounded; requests that match no route are labelled "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp, metrics: MetricsRegistry = registry):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        db_stats = [0, 0.0]
+        token = _request_db_stats.set(db_stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            _request_db_stats.reset(token)
+
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            route_labels = labels(method=scope["method"], route=route)
+            self.metrics.inc(
+                "http_requests_total", labels(method=scope["method"], route=route, status=status_code)
+            )
+            self.metrics.observe("http_request_duration_seconds", duration, route_labels)
+            self.metrics.observe("http_request_db_queries", db_stats[0], route_labels)
+            self.metrics.observe("http_request_db_seconds", db_stats[1], route_labels)
@@ -7,20 +7,39 @@ It tracks all API requests, database operations, and business logic execution.
 import os
 import functools
 import asyncio
+import random
+import time
+from collections import deque
 from datetime import datetime
-from typing import Optional, Any, Dict, Callable
+from typing import TYPE_CHECKING, Optional, Any, Deque, Dict, Callable, List
 from contextlib import asynccontextmanager
 
-from langfuse import Langfuse
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from langfuse import Langfuse
 
 
 class LangfuseClient:
     """Singleton wrapper for LangFuse client"""
 
-    _instance: Optional[Langfuse] = None
+    _instance: Optional["Langfuse"] = None
     _enabled: bool = False
+    _credentials: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def configure(cls, public_key: str, secret_key: str, host: str) -> None:
+        """
+        Enable LangFuse without connecting yet.
+
+        The langfuse package (slow to import) and the client are loaded by
+        the first get_client() call, which the trace exporter makes off the
+        request path, so startup does not pay for them.
+        """
+        cls._credentials = {"public_key": public_key, "secret_key": secret_key, "host": host}
+        cls._enabled = True
 
     @classmethod
     def initialize(cls, public_key: str = None, secret_key: str = None, host: str = None) -> None:
@@ -32,6 +51,8 @@ class LangfuseClient:
 
         if public_key and secret_key:
             try:
+                from langfuse import Langfuse
+
                 cls._instance = Langfuse(
                     public_key=public_key,
                     secret_key=secret_key,
@@ -48,10 +69,10 @@ class LangfuseClient:
             cls._enabled = False
 
     @classmethod
-    def get_client(cls) -> Optional[Langfuse]:
+    def get_client(cls) -> Optional["Langfuse"]:
         """Get the LangFuse client instance"""
         if cls._instance is None:
-            cls.initialize()
+            cls.initialize(**(cls._credentials or {}))
         return cls._instance
 
     @classmethod
@@ -70,88 +91,240 @@ class LangfuseClient:
                 print(f"⚠️  LangFuse flush failed: {e}")
 
 
-class LangfuseMiddleware(BaseHTTPMiddleware):
+class TraceExporter:
     """
-    FastAPI middleware to automatically trace all HTTP requests
+    In-memory buffer that sends request events to LangFuse in batches.
 
-    Creates a trace for each incoming request with:
-    - Request metadata (method, path, headers, query params)
-    - Response metadata (status code, headers)
-    - Execution time
-    - User context (if authenticated)
+    The middleware only appends to a bounded deque. A background task sends
+    each batch_size batch as soon as it fills, and whatever is left every
+    flush_interval, calling the LangFuse client in a worker thread so no
+    request waits for event creation or I/O. When the buffer is full the
+    oldest events are dropped (and counted).
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request and create LangFuse event"""
-
-        if not LangfuseClient.is_enabled():
-            return await call_next(request)
+    def __init__(
+        self,
+        sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        batch_size: int = settings.LANGFUSE_BATCH_SIZE,
+        flush_interval: float = settings.LANGFUSE_FLUSH_INTERVAL_SECONDS,
+        max_buffer: int = settings.LANGFUSE_MAX_BUFFER,
+    ):
+        self.sink = sink or self._send_to_langfuse
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=max_buffer)
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.exported = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    @staticmethod
+    def _send_to_langfuse(events: List[Dict[str, Any]]) -> None:
+        client = LangfuseClient.get_client()
+        if client is None:
+            return
+        for event in events:
+            client.create_event(**event)
+
+    def add(self, event: Dict[str, Any]) -> None:
+        """Queue an event (never blocks; starts the flush task on first use)."""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(event)
+        if self._task is None:
+            self.start()
+        if self._wake is not None and len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        count = min(self.batch_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(count)]
+
+    async def flush(self, full_batches_only: bool = False) -> int:
+        """
+        Export buffered events now.
+
+        Args:
+            full_batches_only: Leave a partial last batch for the next round
+
+        Returns:
+            Number of events handed to the sink
+        """
+        sent = 0
+        minimum = self.batch_size if full_batches_only else 1
+        while len(self._buffer) >= minimum:
+            batch = self._take_batch()
+            try:
+                await asyncio.to_thread(self.sink, batch)
+                self.exported += len(batch)
+                sent += len(batch)
+            except Exception as e:
+                self.failed_batches += 1
+                print(f"⚠️  LangFuse batch export failed ({len(batch)} events): {e}")
+        return sent
 
-        # Extract request metadata
-        event_name = f"{request.method} {request.url.path}"
-        metadata = {
-            "method": request.method,
-            "path": request.url.path,
-            "query_params": dict(request.query_params),
-            "client_host": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                woken = True
+            except asyncio.TimeoutError:
+                woken = False
+            self._wake.clear()
+            await self.flush(full_batches_only=woken)
+
+    def start(self) -> None:
+        """Start the flush task on the running event loop (no-op without one)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and export what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
         }
 
-        # Extract user context from auth header if present
-        user_id = None
-        auth_header = request.headers.get("authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            user_id = "authenticated_user"
 
-        # Execute request and measure time
-        start_time = datetime.utcnow()
-        status_code = None
-        error_message = None
+class LangfuseMiddleware:
+    """
+    ASGI middleware that traces sampled HTTP requests to LangFuse.
 
-        try:
-            response = await call_next(request)
-            status_code = response.status_code
+    Pure ASGI: the response passes through untouched and only the status
+    code is read from the response start message, so there is no per-request
+    body wrapping or extra task (unlike BaseHTTPMiddleware).
 
-            # Add response metadata
-            metadata["duration_ms"] = (datetime.utcnow() - start_time).total_seconds() * 1000
-            metadata["status_code"] = status_code
-            if user_id:
-                metadata["user_id"] = user_id
+    Sampling is decided when the request arrives, from the longest matching
+    path prefix in route_sample_rates (else sample_rate). Requests that fail
+    (5xx or an exception) or take at least slow_request_ms are always kept.
+    Kept events go to the TraceExporter, which sends them in batches.
 
-            # Create LangFuse event after successful response
-            client = LangfuseClient.get_client()
-            if client:
-                try:
-                    client.create_event(
-                        name=event_name,
-                        metadata=metadata,
-                        level="DEFAULT" if status_code < 400 else "WARNING",
-                    )
-                except Exception as e:
-                    print(f"⚠️  LangFuse event creation failed: {e}")
+    Each event records method, path, query string, client host, user agent,
+    status code, duration and why it was kept.
+    """
 
-            return response
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = settings.LANGFUSE_SAMPLE_RATE,
+        route_sample_rates: Optional[Dict[str, float]] = None,
+        slow_request_ms: float = settings.LANGFUSE_SLOW_REQUEST_MS,
+        exporter: Optional[TraceExporter] = None,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        rates = settings.LANGFUSE_ROUTE_SAMPLE_RATES if route_sample_rates is None else route_sample_rates
+        # Longest prefix first so "/api/v1/venues/" beats "/api/v1/"
+        self.route_sample_rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self.slow_request_ms = slow_request_ms
+        self.exporter = exporter or trace_exporter
+        self.sampled_out = 0
+
+    def sample_rate_for(self, path: str) -> float:
+        """Sampling rate for a request path."""
+        for prefix, rate in self.route_sample_rates:
+            if path.startswith(prefix):
+                return rate
+        return self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not LangfuseClient.is_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        rate = self.sample_rate_for(path)
+        sampled = rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+        status_code = 500
+        error_message = None
 
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             error_message = str(e)
-            metadata["duration_ms"] = (datetime.utcnow() - start_time).total_seconds() * 1000
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if error_message is not None or status_code >= 500:
+                reason = "error"
+            elif duration_ms >= self.slow_request_ms:
+                reason = "slow"
+            elif sampled:
+                reason = "sampled"
+            else:
+                reason = None
+
+            if reason is None:
+                self.sampled_out += 1
+            else:
+                self.exporter.add(
+                    self._build_event(scope, path, status_code, duration_ms, reason, rate, error_message)
+                )
+
+    @staticmethod
+    def _build_event(
+        scope: Scope,
+        path: str,
+        status_code: int,
+        duration_ms: float,
+        reason: str,
+        rate: float,
+        error_message: Optional[str],
+    ) -> Dict[str, Any]:
+        headers = dict(scope.get("headers") or [])
+        client = scope.get("client")
+        metadata = {
+            "method": scope["method"],
+            "path": path,
+            "query_string": scope.get("query_string", b"").decode("latin-1"),
+            "client_host": client[0] if client else None,
+            "user_agent": headers.get(b"user-agent", b"").decode("latin-1") or None,
+            "status_code": status_code,
+            "duration_ms": duration_ms,
+            "kept": reason,
+            "sample_rate": rate,
+        }
+        if headers.get(b"authorization", b"").startswith(b"Bearer "):
+            metadata["user_id"] = "authenticated_user"
+        if error_message is not None:
             metadata["error"] = error_message
-            if user_id:
-                metadata["user_id"] = user_id
 
-            # Create LangFuse event for error
-            client = LangfuseClient.get_client()
-            if client:
-                try:
-                    client.create_event(
-                        name=event_name,
-                        metadata=metadata,
-                        level="ERROR",
-                    )
-                except Exception as log_error:
-                    print(f"⚠️  LangFuse error event creation failed: {log_error}")
+        if error_message is not None or status_code >= 500:
+            level = "ERROR"
+        elif status_code >= 400:
+            level = "WARNING"
+        else:
+            level = "DEFAULT"
+        return {"name": f"{scope['method']} {path}", "metadata": metadata, "level": level}
 
-            raise
+
+# Shared by the middleware; flushed on shutdown
+trace_exporter = TraceExporter()
 
 
 def observe_operation(
@@ -334,6 +507,8 @@ def observe_db(name: Optional[str] = None):
 __all__ = [
     "LangfuseClient",
     "LangfuseMiddleware",
+    "TraceExporter",
+    "trace_exporter",
     "observe_operation",
     "observe_api",
     "observe_service",
@@ -0,0 +1,152 @@
+"""
+Employee PIN verification cache.
+Remembers recent successful PIN checks on the shared bar tablet so repeat
+clock-ins skip the bcrypt run.
+"""
+
+import hashlib
+import hmac
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class PinVerificationCache:
+    """
+    Short-lived cache of successful (venue, employee, PIN) verifications.
+
+    PINs are never stored: each entry holds an HMAC-SHA256 of the triple and
+    the stored PIN hash it was verified against, under a random key generated
+    per process and never written anywhere, compared in constant time.
+
+    Only successes are cached, and a PIN that does not match the cached entry
+    drops the entry and goes through the full database + bcrypt check. Wrong
+    guesses therefore always cost a bcrypt run, exactly as without the cache.
+
+    Callers still load the employee's active PIN row on every check and pass
+    its hash, so a deactivated employee is rejected and a PIN changed by any
+    worker stops matching at once. create_employee_pin also drops the entry
+    in this process after its commit; the short TTL bounds the rest.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.PIN_CACHE_TTL_SECONDS,
+        max_entries: int = settings.PIN_CACHE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._key = secrets.token_bytes(32)
+        # (venue_id, employee_id) -> {"digest", "expires_at", "employee"}
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._generation = 0  # Bumped on every invalidation
+        self.hits = 0
+        self.misses = 0
+
+    def _digest(self, venue_id, employee_id: str, pin: str, pin_hash: str) -> bytes:
+        message = "\x1f".join((str(venue_id), employee_id, pin, pin_hash)).encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def get(self, venue_id, employee_id: str, pin: str, pin_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Employee details for a PIN verified recently.
+
+        Args:
+            venue_id: Venue ID
+            employee_id: Employee ID
+            pin: PIN entered on the tablet
+            pin_hash: The employee's current stored PIN hash
+
+        Returns:
+            Cached employee details (employee_name, employee_role), or None if
+            the PIN must be checked against the database
+        """
+        key = (str(venue_id), employee_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry["expires_at"] <= time.monotonic() or not hmac.compare_digest(
+            entry["digest"], self._digest(venue_id, employee_id, pin, pin_hash)
+        ):
+            # Expired, a different PIN, or the stored PIN changed: back to the full check
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry["employee"]
+
+    def generation(self) -> int:
+        """Invalidation counter; read it before the database check, pass it to put()."""
+        return self._generation
+
+    def put(
+        self,
+        venue_id,
+        employee_id: str,
+        pin: str,
+        pin_hash: str,
+        employee: Dict[str, Any],
+        generation: Optional[int] = None
+    ) -> None:
+        """
+        Remember a successful verification.
+
+        Args:
+            venue_id: Venue ID
+            employee_id: Employee ID
+            pin: PIN that was verified against the stored bcrypt hash
+            pin_hash: That stored bcrypt hash
+            employee: Details to return on hits (employee_name, employee_role)
+            generation: generation() read before the PIN hash was loaded; the
+                result is not cached if a PIN changed since
+        """
+        if generation is not None and generation != self._generation:
+            return
+
+        key = (str(venue_id), employee_id)
+        self._entries.pop(key, None)
+        self._entries[key] = {
+            "digest": self._digest(venue_id, employee_id, pin, pin_hash),
+            "expires_at": time.monotonic() + self.ttl_seconds,
+            "employee": dict(employee),
+        }
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, venue_id=None, employee_id: Optional[str] = None) -> None:
+        """
+        Forget cached verifications.
+
+        Args:
+            venue_id: Venue to forget (None = everything)
+            employee_id: Single employee at that venue (None = whole venue)
+        """
+        self._generation += 1
+        if venue_id is None:
+            self._entries.clear()
+        elif employee_id is not None:
+            self._entries.pop((str(venue_id), employee_id), None)
+        else:
+            for key in [key for key in self._entries if key[0] == str(venue_id)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Used by the clock-in endpoint
+pin_cache = PinVerificationCache()
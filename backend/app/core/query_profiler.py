@@ -0,0 +1,200 @@
+"""
+Opt-in SQL profiler.
+Records every statement executed while a request (or a test) runs, with its
+timing, and flags statement shapes that repeat: the signature of an N+1
+loop (one query per referral level, per shift break, per RSVP).
+
+Enable with SQL_PROFILING=true. With DEBUG also on, each response carries
+X-Query-Count, X-Query-Time-Ms and X-Query-Repeated headers. Tests can put
+a budget on endpoints with the query_budget marker (tests/query_budget.py).
+"""
+
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+_STRING_LITERALS = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERALS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL statement so queries differing only in values compare equal.
+
+    Literals and bind placeholders of every paramstyle become "?", and
+    expanded IN lists collapse to "(?)".
+    """
+    shape = _STRING_LITERALS.sub("?", statement)
+    shape = _PLACEHOLDERS.sub("?", shape)
+    shape = _NUMBER_LITERALS.sub("?", shape)
+    shape = _VALUE_LISTS.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryProfile:
+    """Statements executed within one request or test, in order."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.statements: List[Tuple[str, float]] = []  # (SQL, seconds)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements.append((statement, seconds))
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(seconds for _, seconds in self.statements) * 1000
+
+    def repeated(self, threshold: int = settings.SQL_PROFILING_REPEAT_THRESHOLD) -> List[Tuple[str, int]]:
+        """
+        Statement shapes executed at least threshold times (likely N+1 loops).
+
+        Returns:
+            (shape, count) pairs, most repeated first
+        """
+        shapes = Counter(statement_shape(statement) for statement, _ in self.statements)
+        return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+    def report(self, threshold: int = settings.SQL_PROFILING_REPEAT_THRESHOLD) -> str:
+        """Readable listing: totals, repeated shapes, then every statement."""
+        lines = [f"{self.label or 'profile'}: {self.count} queries in {self.total_ms:.1f} ms"]
+        for shape, count in self.repeated(threshold):
+            lines.append(f"  repeated {count}x: {shape}")
+        for index, (statement, seconds) in enumerate(self.statements, 1):
+            lines.append(f"  {index:>3}. {seconds * 1000:7.2f} ms  {_WHITESPACE.sub(' ', statement).strip()}")
+        return "\n".join(lines)
+
+
+# Profiles recording the current task's statements (a request's and, in
+# tests, the enclosing test's)
+_active_profiles: contextvars.ContextVar[Tuple[QueryProfile, ...]] = contextvars.ContextVar(
+    "active_query_profiles", default=()
+)
+
+
+class QueryProfiler:
+    """
+    Statement recorder attached to engines with SQLAlchemy cursor events.
+
+    Nothing is attached until enable() or instrument() is called. Statements
+    are only recorded inside profile() blocks, which QueryProfilerMiddleware
+    opens around each request once enabled.
+
+    Request hooks receive every finished request profile (the pytest
+    query budget uses this).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.request_hooks: List[Callable[[QueryProfile], None]] = []
+        self._engines: Set[int] = set()
+
+    def instrument(self, db_engine: AsyncEngine) -> None:
+        """Attach the statement hooks to an engine (once)."""
+        sync_engine = db_engine.sync_engine
+        if id(sync_engine) in self._engines:
+            return
+        self._engines.add(id(sync_engine))
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._profiler_started = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            profiles = _active_profiles.get()
+            if profiles:
+                elapsed = time.perf_counter() - context._profiler_started
+                for profile in profiles:
+                    profile.record(statement, elapsed)
+
+        event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    def enable(self, *engines: Optional[AsyncEngine]) -> None:
+        """Instrument the given engines and start profiling requests."""
+        for db_engine in engines:
+            if db_engine is not None:
+                self.instrument(db_engine)
+        self.enabled = True
+
+    @contextmanager
+    def profile(self, label: str = "") -> Iterator[QueryProfile]:
+        """Record the statements the current task executes inside the block."""
+        profile = QueryProfile(label)
+        token = _active_profiles.set((*_active_profiles.get(), profile))
+        try:
+            yield profile
+        finally:
+            _active_profiles.reset(token)
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware profiling each request's SQL while the profiler is enabled.
+
+    Repeated statement shapes are logged as a warning with the full report.
+    In DEBUG mode the response gets the report headers (statements run after
+    the response starts, such as the session commit, are not included).
+    """
+
+    def __init__(self, app: ASGIApp, profiler: Optional[QueryProfiler] = None):
+        self.app = app
+        self.profiler = profiler or query_profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with self.profiler.profile(f"{scope['method']} {scope['path']}") as profile:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    message["headers"] = [*message.get("headers", []), *_report_headers(profile)]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    profile.label = f"{scope['method']} {route}"
+                if profile.repeated():
+                    logger.warning(f"Repeated SQL (possible N+1)\n{profile.report()}")
+                for hook in self.profiler.request_hooks:
+                    hook(profile)
+
+
+def _report_headers(profile: QueryProfile) -> List[Tuple[bytes, bytes]]:
+    headers = [
+        (b"x-query-count", str(profile.count).encode()),
+        (b"x-query-time-ms", f"{profile.total_ms:.1f}".encode()),
+    ]
+    repeated = profile.repeated()
+    if repeated:
+        value = " | ".join(f"{count}x {shape[:150]}" for shape, count in repeated)
+        headers.append((b"x-query-repeated", value.encode("latin-1", "replace")))
+    return headers
+
+
+# Shared by the middleware and the pytest query budget
+query_profiler = QueryProfiler()
@@ -1,123 +1,140 @@
 """
 SMS service using Twilio for sending verification codes.
+
+Messages are not sent from request handlers: they are queued in the SMS
+outbox (app/services/sms_outbox.py) and delivered by its worker through one
+of the transports below.
 """
 
+import asyncio
 import logging
+import random
 import secrets
-from datetime import datetime, timedelta
-from typing import Optional
-
-from twilio.rest import Client
-from twilio.base.exceptions import TwilioRestException
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class SMSService:
-    """Service for sending SMS messages via Twilio."""
-
-    def __init__(self):
-        """Initialize Twilio client."""
-        self.client: Optional[Client] = None
-        if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
-            try:
-                self.client = Client(
-                    settings.TWILIO_ACCOUNT_SID,
-                    settings.TWILIO_AUTH_TOKEN
-                )
-                logger.info("Twilio SMS service initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize Twilio client: {e}")
-        else:
-            logger.warning("Twilio credentials not configured - SMS will not be sent")
+class SMSTransportError(Exception):
+    """Delivery attempt failed; the outbox retries it later."""
 
-    def generate_verification_code(self) -> str:
-        """
-        Generate a 6-digit verification code.
 
-        Returns:
-            str: 6-digit verification code
-        """
-        # Generate cryptographically secure random 6-digit code
-        return str(secrets.randbelow(1000000)).zfill(6)
+class TwilioSMSTransport:
+    """
+    Sends through the Twilio REST API.
 
-    async def send_verification_code(
-        self,
-        phone_number: str,
-        code: str
-    ) -> bool:
-        """
-        Send verification code via SMS.
+    The Twilio client is synchronous, so each request runs in a small
+    dedicated thread pool sized to the outbox send concurrency. The twilio
+    package is imported here, when the outbox worker first sends, rather
+    than at app startup.
+    """
 
-        Args:
-            phone_number: Phone number in E.164 format (e.g., +4917012345678)
-            code: 6-digit verification code
+    def __init__(self, max_workers: int = settings.SMS_SEND_CONCURRENCY):
+        from twilio.rest import Client
 
-        Returns:
-            bool: True if sent successfully, False otherwise
+        self.client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="twilio")
+
+    def _create_message(self, phone_number: str, body: str) -> str:
+        message = self.client.messages.create(
+            body=body,
+            from_=settings.TWILIO_PHONE_NUMBER,
+            to=phone_number
+        )
+        return message.sid
+
+    async def send(self, phone_number: str, body: str) -> str:
         """
-        if not self.client:
-            logger.warning(f"SMS not sent to {phone_number} - Twilio not configured")
-            # In development, just log the code
-            logger.info(f"🔐 VERIFICATION CODE for {phone_number}: {code}")
-            return True
+        Send one SMS.
+
+        Returns:
+            Twilio message SID
 
+        Raises:
+            SMSTransportError: if Twilio rejected the request or was unreachable
+        """
+        loop = asyncio.get_running_loop()
         try:
-            message = self.client.messages.create(
-                body=f"Wiesbaden After Dark\n\nYour verification code is: {code}\n\nValid for 5 minutes.",
-                from_=settings.TWILIO_PHONE_NUMBER,
-                to=phone_number
-            )
-
-            logger.info(f"SMS sent successfully to {phone_number} - SID: {message.sid}")
-            return True
-
-        except TwilioRestException as e:
-            logger.error(f"Twilio error sending SMS to {phone_number}: {e}")
-            return False
+            return await loop.run_in_executor(self._executor, self._create_message, phone_number, body)
         except Exception as e:
-            logger.error(f"Unexpected error sending SMS to {phone_number}: {e}")
-            return False
-
-    async def send_welcome_message(
-        self,
-        phone_number: str,
-        referral_code: str,
-        name: Optional[str] = None
-    ) -> bool:
-        """
-        Send welcome message to new user.
+            raise SMSTransportError(str(e)) from e
+
+
+class LogSMSTransport:
+    """Development transport: writes messages (and their codes) to the log."""
+
+    async def send(self, phone_number: str, body: str) -> str:
+        logger.warning(f"SMS not sent to {phone_number} - Twilio not configured")
+        logger.info(f"🔐 SMS for {phone_number}: {body}")
+        return "logged"
+
+
+class FakeSMSTransport:
+    """
+    Offline transport for tests and benchmarks.
+
+    Simulates provider latency and a random failure rate, and records every
+    message it accepted.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.sent: List[Tuple[str, str]] = []
+        self.failures = 0
+        self._random = random.Random(seed)
+
+    async def send(self, phone_number: str, body: str) -> str:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self._random.random() < self.failure_rate:
+            self.failures += 1
+            raise SMSTransportError("Simulated provider failure")
+        self.sent.append((phone_number, body))
+        return f"fake-{len(self.sent)}"
+
+
+def build_transport():
+    """Transport selected by SMS_TRANSPORT (auto = Twilio when configured, else log)."""
+    if settings.SMS_TRANSPORT == "fake":
+        return FakeSMSTransport()
+    if settings.SMS_TRANSPORT == "log":
+        return LogSMSTransport()
+    if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
+        try:
+            transport = TwilioSMSTransport()
+            logger.info("Twilio SMS service initialized successfully")
+            return transport
+        except Exception as e:
+            logger.error(f"Failed to initialize Twilio client: {e}")
+    elif settings.SMS_TRANSPORT == "twilio":
+        logger.error("SMS_TRANSPORT=twilio but Twilio credentials are not configured")
+    return LogSMSTransport()
 
-        Args:
-            phone_number: Phone number in E.164 format
-            referral_code: User's unique referral code
-            name: Optional user name
+
+class SMSService:
+    """Verification codes and message texts."""
+
+    def generate_verification_code(self) -> str:
+        """
+        Generate a 6-digit verification code.
 
         Returns:
-            bool: True if sent successfully, False otherwise
+            str: 6-digit verification code
         """
-        if not self.client:
-            logger.warning(f"Welcome SMS not sent to {phone_number} - Twilio not configured")
-            return True
+        # Generate cryptographically secure random 6-digit code
+        return str(secrets.randbelow(1000000)).zfill(6)
 
-        try:
-            message = self.client.messages.create(
-                body=f"Welcome to Wiesbaden After Dark! 🎉\n\nYour referral code: {referral_code}\n\nShare with friends to earn points!",
-                from_=settings.TWILIO_PHONE_NUMBER,
-                to=phone_number
-            )
-
-            logger.info(f"Welcome SMS sent to {phone_number} - SID: {message.sid}")
-            return True
-
-        except TwilioRestException as e:
-            logger.error(f"Twilio error sending welcome SMS to {phone_number}: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"Unexpected error sending welcome SMS to {phone_number}: {e}")
-            return False
+    def verification_message(self, code: str) -> str:
+        """Text of the verification code SMS."""
+        return f"Wiesbaden After Dark\n\nYour verification code is: {code}\n\nValid for 5 minutes."
+
+    def welcome_message(self, referral_code: str, name: Optional[str] = None) -> str:
+        """Text of the welcome SMS for a new user."""
+        return f"Welcome to Wiesbaden After Dark! 🎉\n\nYour referral code: {referral_code}\n\nShare with friends to earn points!"
 
 
 # Global SMS service instance
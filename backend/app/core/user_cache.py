@@ -0,0 +1,187 @@
+"""
+Authenticated-user cache.
+Keeps a short-lived snapshot of each signed-in user so get_current_user can
+skip the SELECT on repeated requests from the same app session.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class UserCache:
+    """
+    Bounded TTL/LRU cache of user column snapshots, keyed by (user ID, token iat).
+
+    A hit rebuilds the user from the snapshot and merges it into the request's
+    session without a query, so routes can read and modify current_user as if
+    it had just been loaded. Snapshots never leave the cache themselves.
+
+    ORM updates and deletes of a user (profile edits, deactivation, deletion)
+    drop all of that user's entries in this process when they are flushed, and
+    again once their transaction commits, so a lookup that read the old row in
+    between does not keep it.
+    Changes made by other workers, raw SQL or the maintenance scripts are seen
+    once the entry expires, so the TTL bounds how long a deactivated user can
+    keep using a token here.
+
+    All bookkeeping happens between awaits, so no lock is needed; a generation
+    counter stops a lookup that raced with an invalidation from storing the
+    stale row it read.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.USER_CACHE_TTL_SECONDS,
+        max_entries: int = settings.USER_CACHE_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # (user_id, iat) -> (expires_at, column values); order == recency
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self._generation = 0  # Bumped on every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _snapshot(user: User) -> Dict[str, Any]:
+        """Loaded column values of a user."""
+        loaded = inspect(user).dict
+        return {
+            column.key: loaded[column.key]
+            for column in User.__mapper__.column_attrs
+            if column.key in loaded
+        }
+
+    def _remove(self, key: Tuple[str, Hashable]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def generation(self) -> int:
+        """Invalidation counter; read it before loading a user, pass it to put()."""
+        return self._generation
+
+    async def get(self, db: AsyncSession, user_id: str, issued_at: Hashable = None) -> Optional[User]:
+        """
+        Cached user, attached to the given session.
+
+        Args:
+            db: Request database session
+            user_id: User ID from the token
+            issued_at: Token iat claim (None if absent)
+
+        Returns:
+            User bound to db, or None on a miss
+        """
+        key = (str(user_id), issued_at)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        user = User.__mapper__.class_manager.new_instance()
+        for name, value in entry[1].items():
+            attributes.set_committed_value(user, name, value)
+        make_transient_to_detached(user)
+        # load=False: trust the snapshot; returns the session's own copy
+        return await db.merge(user, load=False)
+
+    def put(self, user: User, issued_at: Hashable = None, generation: Optional[int] = None) -> None:
+        """
+        Remember a freshly loaded user.
+
+        Args:
+            user: User loaded from the database
+            issued_at: Token iat claim (None if absent)
+            generation: generation() read before the user was loaded; the
+                snapshot is discarded if anything was invalidated since
+        """
+        if generation is not None and generation != self._generation:
+            return
+
+        user_id = str(user.id)
+        key = (user_id, issued_at)
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, self._snapshot(user))
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """
+        Drop every cached entry for one user, or the whole cache.
+
+        Args:
+            user_id: User to drop (None = clear everything)
+        """
+        self.invalidations += 1
+        self._generation += 1
+        if user_id is None:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            return
+
+        for key in list(self._keys_by_user.get(str(user_id), ())):
+            self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+# Shared by both get_current_user dependencies
+user_cache = UserCache()
+
+
+# Session.info key of the user IDs changed in the current transaction
+_CHANGED_USERS = "user_cache_changed_users"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    """Forget a user's cached snapshots whenever the user row changes."""
+    user_cache.invalidate(target.id)
+    # Flush runs before commit: other requests can still read and cache the old row
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(str(target.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    """Forget the changed users' snapshots again once the change is visible."""
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session: Session) -> None:
+    """Rolled back changes never become visible; nothing to invalidate."""
+    session.info.pop(_CHANGED_USERS, None)
@@ -0,0 +1,177 @@
+"""
+Venue catalog snapshot cache.
+Keeps the serialized public venue responses (list pages, details, products,
+tier configs) in memory with a strong ETag each, so the app-open burst of
+catalog requests is served without the database, and clients that already
+hold the current version get a bodyless 304.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.product import Product
+from app.models.venue import Venue
+
+
+# Marks keys of entries spanning many venues (list pages)
+ALL_VENUES = "*"
+
+
+class CatalogEntry(NamedTuple):
+    body: bytes
+    etag: str
+    expires_at: float
+    owner_id: Optional[str]  # Set on owner-only entries (tier config)
+
+
+class VenueCatalogCache:
+    """
+    Bounded TTL/LRU cache of serialized catalog responses.
+
+    Keys are tuples whose second item is the venue ID (ALL_VENUES for list
+    pages). Writes to a venue or its products drop that venue's entries and
+    every list page and bump the catalog version: on every ORM flush in this
+    process, and again after the admin routes commit, so a request that
+    reloaded between the flush and the commit cannot leave the old data
+    cached. A load that raced with the write is not stored (pass version()
+    from before the load to put()). Other workers pick changes up once
+    their entries expire.
+
+    ETags are the hash of the body, so every worker serving the same catalog
+    hands out the same ETag and revalidation works across workers.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.VENUE_CATALOG_TTL_SECONDS,
+        max_entries: int = settings.VENUE_CATALOG_MAX_ENTRIES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, ...], CatalogEntry]" = OrderedDict()
+        self._version = 0  # Bumped on every invalidation
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def etag(body: bytes) -> str:
+        """Strong ETag for a response body."""
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def version(self) -> int:
+        """Catalog version; read it before loading from the database, pass it to put()."""
+        return self._version
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[CatalogEntry]:
+        """Current entry for a key, or None if it must be loaded."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        key: Tuple[Hashable, ...],
+        body: bytes,
+        version: Optional[int] = None,
+        owner_id: Optional[str] = None
+    ) -> CatalogEntry:
+        """
+        Store a serialized response.
+
+        Args:
+            key: (kind, venue_id or ALL_VENUES, *parameters)
+            body: Serialized JSON response
+            version: version() read before the data was loaded; the entry is
+                not stored if the catalog changed since
+            owner_id: Venue owner allowed to read an owner-only entry
+
+        Returns:
+            The entry (returned even when it was not stored)
+        """
+        entry = CatalogEntry(body, self.etag(body), time.monotonic() + self.ttl_seconds, owner_id)
+        if version is not None and version != self._version:
+            return entry
+
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, request: Request, entry: CatalogEntry) -> Response:
+        """The entry as a JSON response, or 304 if the client already has it."""
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def invalidate(self, venue_id=None) -> None:
+        """
+        Drop cached responses after a catalog write.
+
+        Args:
+            venue_id: Venue whose entries to drop, with every list page
+                (None = everything)
+        """
+        self._version += 1
+        if venue_id is None:
+            self._entries.clear()
+            return
+        stale = (str(venue_id), ALL_VENUES)
+        for key in [key for key in self._entries if key[1] in stale]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "not_modified": self.not_modified,
+        }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, as RFC 9110 requires for it)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+# Shared by the venue endpoints
+venue_catalog = VenueCatalogCache()
+
+
+@event.listens_for(Venue, "after_insert")
+@event.listens_for(Venue, "after_update")
+@event.listens_for(Venue, "after_delete")
+def _invalidate_cached_venue(mapper, connection, target: Venue) -> None:
+    """Forget a venue's cached responses whenever the venue row changes."""
+    venue_catalog.invalidate(target.id)
+
+
+@event.listens_for(Product, "after_insert")
+@event.listens_for(Product, "after_update")
+@event.listens_for(Product, "after_delete")
+def _invalidate_cached_products(mapper, connection, target: Product) -> None:
+    """Forget a venue's cached responses whenever one of its products changes."""
+    venue_catalog.invalidate(target.venue_id)
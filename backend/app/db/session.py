@@ -1,25 +1,117 @@
 """
 Database session management using async SQLAlchemy.
-Provides database engine, session factory, and dependency injection.
+Provides the application's database engine (plus an optional read replica),
+session factories, dependency injection and connection pool metrics.
 """
 
-from typing import AsyncGenerator
+import asyncio
+import hashlib
+import time
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from fastapi import Request
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
-    future=True,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_size=10,  # Connection pool size
-    max_overflow=20,  # Allow up to 20 connections beyond pool_size
-)
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long checkouts take.
+
+    Checkout time covers waiting for a free connection, opening a new one when
+    the pool may still overflow, and the pre-ping. A rising average or any
+    timeouts mean the workers need more connections than the pool allows.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset_checkout_stats()
+
+    def reset_checkout_stats(self) -> None:
+        """Zero the checkout counters."""
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # engine.dispose() swaps in a fresh pool; keep the counters across it
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.checkout_timeouts = self.checkout_timeouts
+        pool.checkout_wait_total = self.checkout_wait_total
+        pool.checkout_wait_max = self.checkout_wait_max
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.checkout_wait_total += waited
+            if waited > self.checkout_wait_max:
+                self.checkout_wait_max = waited
+
+
+def build_engine_options(database_url: str, **overrides) -> Dict[str, Any]:
+    """
+    Engine keyword arguments for a database URL, from settings.
+
+    In-memory SQLite keeps SQLAlchemy's single-connection pool. asyncpg URLs
+    also get the statement cache sizes and the optional command timeout.
+
+    Args:
+        database_url: SQLAlchemy database URL
+        **overrides: Options replacing the settings-derived values
+
+    Returns:
+        Keyword arguments for create_async_engine
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {
+        "echo": settings.DEBUG,  # Log SQL queries in debug mode
+        "future": True,
+        "pool_pre_ping": True,  # Verify connections before using
+    }
+
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        options.update(overrides)
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
+    if url.get_driver_name() == "asyncpg":
+        connect_args = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+        if settings.DB_COMMAND_TIMEOUT is not None:
+            connect_args["command_timeout"] = settings.DB_COMMAND_TIMEOUT
+        options["connect_args"] = connect_args
+
+    options.update(overrides)
+    return options
+
+
+# Create async engine (the only one in the process; app.core.database re-exports it)
+engine = create_async_engine(settings.DATABASE_URL, **build_engine_options(settings.DATABASE_URL))
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -30,18 +122,203 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Optional read-only engine for safe GET endpoints (see get_read_db)
+read_engine = (
+    create_async_engine(settings.DATABASE_READ_URL, **build_engine_options(settings.DATABASE_READ_URL))
+    if settings.DATABASE_READ_URL
+    else None
+)
+
+ReadSessionLocal = (
+    async_sessionmaker(
+        read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+    if read_engine is not None
+    else None
+)
+
 # Base class for all models
 Base = declarative_base()
 
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadReplicaRouter:
+    """
+    Chooses the engine for read-only sessions.
+
+    Reads go to the replica unless:
+    - no replica is configured;
+    - the client wrote within the last read_your_writes_seconds, so it sees its
+      own changes despite replication lag;
+    - the replica recently failed to connect (primary is used for
+      retry_seconds before it is tried again).
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    Recent writers are remembered in this process only; a read served by
+    another worker right after a write may still hit the replica.
+    """
+
+    MAX_TRACKED_WRITERS = 10_000
+
+    def __init__(
+        self,
+        primary_factory: async_sessionmaker,
+        replica_factory: Optional[async_sessionmaker] = None,
+        read_your_writes_seconds: float = settings.READ_YOUR_WRITES_SECONDS,
+        retry_seconds: float = settings.READ_REPLICA_RETRY_SECONDS,
+    ):
+        self.primary_factory = primary_factory
+        self.replica_factory = replica_factory
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.retry_seconds = retry_seconds
+        self._recent_writes: Dict[str, float] = {}  # client key -> primary-until
+        self._replica_down_until = 0.0
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    def record_write(self, client_key: Optional[str]) -> None:
+        """Send this client's reads to primary for the read-your-writes window."""
+        if client_key is None or self.replica_factory is None:
+            return
+        now = time.monotonic()
+        if len(self._recent_writes) >= self.MAX_TRACKED_WRITERS:
+            self._recent_writes = {
+                key: until for key, until in self._recent_writes.items() if until > now
+            }
+            if len(self._recent_writes) >= self.MAX_TRACKED_WRITERS:
+                self._recent_writes.pop(next(iter(self._recent_writes)))
+        self._recent_writes[client_key] = now + self.read_your_writes_seconds
+
+    def wrote_recently(self, client_key: Optional[str]) -> bool:
+        """Whether a client is inside its read-your-writes window."""
+        if client_key is None:
+            return False
+        until = self._recent_writes.get(client_key)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._recent_writes.pop(client_key, None)
+            return False
+        return True
+
+    async def open_session(self, client_key: Optional[str] = None) -> AsyncSession:
+        """
+        Open a session for read-only work.
+
+        Args:
+            client_key: Requesting client (see client_key()), for read-your-writes
+
+        Returns:
+            Session on the replica, or on the primary when the replica must not
+            or cannot be used
+        """
+        now = time.monotonic()
+        if (
+            self.replica_factory is not None
+            and now >= self._replica_down_until
+            and not self.wrote_recently(client_key)
+        ):
+            session = self.replica_factory()
+            try:
+                # Connect now so an unreachable replica falls back before any query
+                await session.connection()
+            except (exc.DBAPIError, exc.TimeoutError, OSError):
+                await session.close()
+                self._replica_down_until = now + self.retry_seconds
+                self.fallbacks += 1
+            else:
+                self.replica_reads += 1
+                return session
+
+        self.primary_reads += 1
+        return self.primary_factory()
+
+    def stats(self) -> Dict[str, Any]:
+        """Routing counters for this process."""
+        return {
+            "replica_configured": self.replica_factory is not None,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallbacks": self.fallbacks,
+            "replica_available": time.monotonic() >= self._replica_down_until,
+        }
+
+
+read_router = ReadReplicaRouter(AsyncSessionLocal, ReadSessionLocal)
+
+
+def client_key(request: Optional[Request]) -> Optional[str]:
+    """
+    Identify the client behind a request for read-your-writes routing.
+
+    Uses a digest of the bearer token (one per signed-in user and device),
+    falling back to the client address for anonymous requests.
+    """
+    if request is None:
+        return None
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+    if request.client:
+        return request.client.host
+    return None
+
+
+def get_pool_status(db_engine: Optional[AsyncEngine] = None) -> Dict[str, Any]:
+    """
+    Snapshot of an engine's connection pool.
+
+    Args:
+        db_engine: Engine to inspect (default: the application engine)
+
+    Returns:
+        Dict with size, checked_out, checked_in, overflow, max_connections and,
+        for instrumented pools, checkouts, checkout_timeouts,
+        avg_checkout_ms and max_checkout_ms
+    """
+    pool = (db_engine or engine).pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"pool": type(pool).__name__}
+
+    status = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_connections": pool.size() + max(pool._max_overflow, 0),
+    }
+
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(
+            checkouts=pool.checkouts,
+            checkout_timeouts=pool.checkout_timeouts,
+            avg_checkout_ms=round(pool.checkout_wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            max_checkout_ms=round(pool.checkout_wait_max * 1000, 3),
+        )
+
+    return status
+
+
+async def get_db(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency that provides a database session.
     Automatically handles session cleanup.
 
+    Unsafe requests (POST, PUT, ...) also open the client's read-your-writes
+    window, before any write happens, so its next reads see the change.
+
     Yields:
         AsyncSession: Database session
     """
+    if request is not None and request.method not in SAFE_METHODS:
+        read_router.record_write(client_key(request))
+
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -53,6 +330,54 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides a session for read-only endpoints.
+
+    Routed to the read replica when one is configured (see ReadReplicaRouter);
+    nothing is committed.
+
+    Yields:
+        AsyncSession: Database session
+    """
+    session = await read_router.open_session(client_key(request))
+    async with session:
+        yield session
+
+
+async def run_concurrently(
+    db: AsyncSession,
+    *operations: Callable[[AsyncSession], Awaitable[Any]]
+) -> List[Any]:
+    """
+    Run independent read-only operations concurrently.
+
+    An AsyncSession can only execute one statement at a time, so each
+    operation receives its own short-lived session bound to the same
+    engine as ``db`` (this keeps test overrides of get_db working).
+
+    Args:
+        db: Request session whose engine should be used
+        *operations: Async callables taking a session and returning a result
+
+    Returns:
+        List of results in the same order as ``operations``
+    """
+    session_factory = async_sessionmaker(
+        db.bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+    async def _run(operation: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        async with session_factory() as session:
+            return await operation(session)
+
+    return list(await asyncio.gather(*(_run(op) for op in operations)))
+
+
 async def init_db() -> None:
     """
     Initialize database by creating all tables.
@@ -67,7 +392,11 @@ async def init_db() -> None:
             user_points,
             referral,
             product,
-            verification_code
+            verification_code,
+            venue_daily_stats,
+            venue_stat_delta,
+            sms_outbox,
+            idempotency_key
         )
 
         # Create all tables
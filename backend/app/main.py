@@ -1,13 +1,25 @@
 """
 WiesbadenAfterDark API - Main Application
 """
+import json
 from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core import metrics
+from app.core.hashing import hashing_executor
+from app.core.observability import LangfuseClient, LangfuseMiddleware, trace_exporter
+from app.core.query_profiler import QueryProfilerMiddleware, query_profiler
+from app.core.pin_cache import pin_cache
+from app.core.user_cache import user_cache
+from app.core.venue_catalog import venue_catalog
+from app.db.session import engine, get_pool_status, read_engine, read_router
+from app.services.sms_outbox import sms_outbox_worker
+from app.services.venue_counters import venue_counter_compactor
+from app.services.idempotency import idempotency_key_purger
 
 
 # Create FastAPI application
@@ -20,6 +32,22 @@ app = FastAPI(
     openapi_url="/openapi.json",
 )
 
+# Serve a pre-generated OpenAPI schema instead of building it on first hit
+if settings.OPENAPI_SCHEMA_PATH:
+    generate_openapi = app.openapi
+
+    def precomputed_openapi():
+        if app.openapi_schema is None:
+            try:
+                with open(settings.OPENAPI_SCHEMA_PATH) as f:
+                    app.openapi_schema = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Precomputed OpenAPI schema unavailable ({e}) - generating it")
+                return generate_openapi()
+        return app.openapi_schema
+
+    app.openapi = precomputed_openapi
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -27,8 +55,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Estimated-Total"],  # Shift history pagination
 )
 
+# Sampled request tracing (a pass-through until LangFuse is initialized)
+app.add_middleware(LangfuseMiddleware)
+
+# Opt-in per-request SQL profiling (a pass-through unless enabled)
+app.add_middleware(QueryProfilerMiddleware)
+if settings.SQL_PROFILING:
+    query_profiler.enable(engine, read_engine)
+
+# Per-route latency, SQL usage and pool metrics for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument_engine(engine, "primary")
+    if read_engine is not None:
+        metrics.instrument_engine(read_engine, "replica")
+
 
 # Health check endpoint
 @app.get("/health", tags=["health"])
@@ -50,6 +94,47 @@ async def health_check():
     )
 
 
+# Connection pool metrics
+@app.get("/health/db", tags=["health"])
+async def database_pool_status():
+    """Connection pool usage for this worker (size workers against the Supabase limit)"""
+    content = get_pool_status()
+    if read_engine is not None:
+        content["replica"] = get_pool_status(read_engine)
+    content["read_routing"] = read_router.stats()
+    return JSONResponse(content=content)
+
+
+# Cache hit rates
+@app.get("/health/cache", tags=["health"])
+async def cache_status():
+    """Hit rates of this worker's in-process caches"""
+    return JSONResponse(
+        content={"users": user_cache.stats(), "pins": pin_cache.stats(), "venues": venue_catalog.stats()}
+    )
+
+
+# Hashing pool saturation
+@app.get("/health/hashing", tags=["health"])
+async def hashing_status():
+    """Password/PIN hashing pool usage for this worker"""
+    return JSONResponse(content=hashing_executor.stats())
+
+
+# Request tracing export
+@app.get("/health/tracing", tags=["health"])
+async def tracing_status():
+    """LangFuse event buffer for this worker (dropped > 0 means export can't keep up)"""
+    return JSONResponse(content={"enabled": LangfuseClient.is_enabled(), **trace_exporter.stats()})
+
+
+# Prometheus scrape target
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Metrics of all workers of this server, in the Prometheus text format"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # Root endpoint
 @app.get("/", tags=["root"])
 async def root():
@@ -74,6 +159,20 @@ async def startup_event():
     """Execute on application startup"""
     print(f"🚀 {settings.PROJECT_NAME} v{settings.VERSION} starting up...")
     print(f"📚 API Documentation: http://localhost:8000/docs")
+    if settings.SMS_OUTBOX_WORKER:
+        sms_outbox_worker.start()
+    if settings.VENUE_COUNTER_COMPACTOR:
+        venue_counter_compactor.start()
+    if settings.IDEMPOTENCY_KEY_PURGER:
+        idempotency_key_purger.start()
+    if settings.LANGFUSE_PUBLIC_KEY and settings.LANGFUSE_SECRET_KEY:
+        # The client is created on the first export, not here
+        LangfuseClient.configure(
+            settings.LANGFUSE_PUBLIC_KEY, settings.LANGFUSE_SECRET_KEY, settings.LANGFUSE_HOST
+        )
+        trace_exporter.start()
+    if settings.METRICS_ENABLED:
+        metrics.registry.start()
 
 
 # Shutdown event
@@ -81,6 +180,13 @@ async def startup_event():
 async def shutdown_event():
     """Execute on application shutdown"""
     print(f"👋 {settings.PROJECT_NAME} shutting down...")
+    await sms_outbox_worker.stop()
+    await venue_counter_compactor.stop()
+    await idempotency_key_purger.stop()
+    await trace_exporter.stop()
+    await metrics.registry.stop()
+    LangfuseClient.shutdown()
+    hashing_executor.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+"""
+Idempotency key model.
+One row per Idempotency-Key a user has sent, committed together with the
+request it protects, so retries landing on any worker replay its response.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, ForeignKey, String, Integer, BigInteger, DateTime, JSON, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.session import Base
+
+
+class IdempotencyKey(Base):
+    """A claimed Idempotency-Key and, once the request finished, its response."""
+
+    __tablename__ = "idempotency_keys"
+
+    # BIGSERIAL on PostgreSQL; SQLite only autoincrements INTEGER keys
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    idempotency_key = Column(String(255), nullable=False)
+    request_fingerprint = Column(String(64), nullable=False)  # Route and body digest
+
+    response = Column(JSON(none_as_null=True), nullable=True)  # None while the request is in flight
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'idempotency_key', name='unique_user_idempotency_key'),
+        Index('idx_idempotency_keys_expires', 'expires_at'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyKey user={self.user_id} key={self.idempotency_key}>"
@@ -0,0 +1,52 @@
+"""
+SMS outbox model.
+Messages are committed here together with the change that triggers them
+(a new verification code, a new account) and delivered by the outbox worker.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Text, Integer, BigInteger, DateTime, Index
+
+from app.db.session import Base
+
+
+class SmsOutboxStatus:
+    """Delivery states of an outbox message."""
+    PENDING = "pending"  # Waiting for its (next) attempt
+    SENDING = "sending"  # Claimed by a worker; reclaimed if the lease runs out
+    SENT = "sent"
+    FAILED = "failed"  # Gave up after SMS_MAX_ATTEMPTS
+    SUPERSEDED = "superseded"  # A newer message of the same kind replaced it
+    EXPIRED = "expired"  # Content no longer valid (e.g. verification code)
+
+
+class SmsOutboxMessage(Base):
+    """One SMS waiting for, or done with, delivery."""
+
+    __tablename__ = "sms_outbox"
+
+    # BIGSERIAL on PostgreSQL; SQLite only autoincrements INTEGER keys
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+
+    phone_number = Column(String(20), nullable=False)
+    kind = Column(String(20), nullable=False)  # verification, welcome
+    body = Column(Text, nullable=False)
+
+    status = Column(String(20), default=SmsOutboxStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=True)  # Not sent after this time
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(String(64), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_sms_outbox_due', 'status', 'next_attempt_at'),
+        Index('idx_sms_outbox_phone', 'phone_number', 'kind'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SmsOutboxMessage {self.id} {self.kind} {self.status}>"
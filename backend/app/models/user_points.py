@@ -9,7 +9,6 @@ from typing import Optional
 
 from sqlalchemy import Column, ForeignKey, DateTime, Numeric, Integer, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
 
 from app.db.session import Base
 
@@ -50,10 +49,6 @@ class UserPoints(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Relationships
-    user = relationship("User", back_populates="user_points")
-    venue = relationship("Venue", back_populates="user_points")
-
     # Ensure one record per user-venue combination
     __table_args__ = (
         UniqueConstraint('user_id', 'venue_id', name='unique_user_venue_points'),
@@ -91,11 +86,15 @@ class UserPoints(Base):
         self.updated_at = datetime.utcnow()
         return True
 
-    def update_streak(self) -> int:
+    def update_streak(self, award_bonus: bool = True) -> int:
         """
         Update visit streak based on last visit date.
         Returns bonus points if milestone reached.
 
+        Args:
+            award_bonus: Add the bonus to this object's balance. Pass False when
+                the caller credits it in the database (see PointsBalance.earn).
+
         Returns:
             Bonus points earned (0 if no milestone)
         """
@@ -141,7 +140,7 @@ class UserPoints(Base):
         self.updated_at = datetime.utcnow()
 
         # Add bonus points to balance if earned
-        if bonus_points > 0:
+        if bonus_points > 0 and award_bonus:
             self.add_points(bonus_points)
 
         return bonus_points
@@ -1,7 +1,7 @@
 """
 Venue model
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Float, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Boolean, Float, Integer, ForeignKey, Numeric, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -52,6 +52,10 @@ class Venue(Base):
     # Tier Configuration
     tier_config = Column(String, nullable=True)  # JSON configuration for tiers
 
+    # Totals (compacted from venue_stat_deltas; read with VenueCounters.get_totals)
+    total_revenue = Column(Numeric(12, 2), default=0, nullable=False)
+    total_points_issued = Column(Numeric(12, 2), default=0, nullable=False)
+
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -0,0 +1,65 @@
+"""
+Venue daily statistics rollup.
+Pre-aggregated per-venue, per-day transaction metrics for the owner dashboard and analytics.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, ForeignKey, Date, DateTime, Numeric, Integer, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.session import Base
+
+
+class VenueDailyStats(Base):
+    """
+    One row per venue per day, maintained incrementally by TransactionProcessor.
+    Can be rebuilt from the transactions table with rebuild_daily_stats.py.
+    """
+
+    __tablename__ = "venue_daily_stats"
+
+    venue_id = Column(UUID(as_uuid=True), ForeignKey("venues.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+
+    # Completed transactions (all types)
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    points_issued = Column(Numeric(12, 2), default=0, nullable=False)
+    points_redeemed = Column(Numeric(12, 2), default=0, nullable=False)
+
+    # Referral program
+    referral_bonus_count = Column(Integer, default=0, nullable=False)
+    referral_bonus_points = Column(Numeric(12, 2), default=0, nullable=False)
+
+    # Distinct users with a completed transaction that day (see VenueDailyCustomer)
+    unique_customers = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('venue_id', 'date', name='pk_venue_daily_stats'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<VenueDailyStats venue={self.venue_id} date={self.date} revenue={self.revenue}>"
+
+
+class VenueDailyCustomer(Base):
+    """
+    Membership set behind VenueDailyStats.unique_customers.
+    Distinct counts cannot be summed, so multi-day windows count distinct users here.
+    """
+
+    __tablename__ = "venue_daily_customers"
+
+    venue_id = Column(UUID(as_uuid=True), ForeignKey("venues.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('venue_id', 'date', 'user_id', name='pk_venue_daily_customers'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<VenueDailyCustomer venue={self.venue_id} date={self.date} user={self.user_id}>"
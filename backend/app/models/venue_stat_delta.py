@@ -0,0 +1,36 @@
+"""
+Venue counter deltas.
+Append-only log of revenue and points issued per purchase, folded into the
+venue totals by the compactor so purchases never contend on the venue row.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, ForeignKey, BigInteger, DateTime, Integer, Numeric, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base  # Same metadata as venues, which venue_id references
+
+
+class VenueStatDelta(Base):
+    """
+    One pending increment to venues.total_revenue / venues.total_points_issued.
+    Rows are deleted once compacted; see VenueCounters.compact.
+    """
+
+    __tablename__ = "venue_stat_deltas"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    venue_id = Column(UUID(as_uuid=True), ForeignKey("venues.id", ondelete="CASCADE"), nullable=False)
+
+    revenue = Column(Numeric(12, 2), default=0, nullable=False)
+    points_issued = Column(Numeric(12, 2), default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_venue_stat_delta_venue', 'venue_id'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<VenueStatDelta venue={self.venue_id} revenue={self.revenue} points={self.points_issued}>"
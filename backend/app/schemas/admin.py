@@ -134,6 +134,30 @@ class AnalyticsResponse(BaseModel):
     referral_impact: ReferralImpact
 
 
+# Points Simulation Schemas
+
+class MarginSimulationRequest(BaseModel):
+    """Proposed venue configuration to replay past purchases against."""
+
+    food_margin_percent: Optional[Decimal] = Field(None, ge=0, le=100)
+    beverage_margin_percent: Optional[Decimal] = Field(None, ge=0, le=100)
+    default_margin_percent: Optional[Decimal] = Field(None, ge=0, le=100)
+    points_multiplier: Optional[Decimal] = Field(None, gt=0)
+    start_date: Optional[datetime] = None  # Default: 90 days ago
+    end_date: Optional[datetime] = None  # Default: now
+
+
+class MarginSimulationResponse(BaseModel):
+    """Points issued under the current vs proposed configuration."""
+
+    date_range: dict  # {start_date, end_date}
+    transactions: int
+    current_points: Decimal
+    simulated_points: Decimal
+    difference: Decimal
+    percent_change: float
+
+
 # Customer Management Schemas
 
 class VenueCustomer(BaseModel):
@@ -150,16 +174,18 @@ class VenueCustomer(BaseModel):
     longest_streak: int
     last_visit_date: Optional[datetime]
     lifetime_spending: Decimal  # Total EUR spent at this venue
+    tier: Optional[str] = None  # Tier reached with points_earned and total_visits
 
 
 class CustomerListResponse(BaseModel):
     """Paginated customer list response."""
 
     customers: List[VenueCustomer]
-    total: int
+    total: Optional[int] = None  # None for cursor pages unless an estimate was asked for
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass as cursor for the next page; None on the last page
 
 
 # Product Management Schemas (some reused from product.py, some new)
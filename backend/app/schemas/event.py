@@ -77,6 +77,8 @@ class EventList(BaseModel):
     total: int
     limit: int
     offset: int
+    next_cursor: Optional[str] = None  # Pass as cursor for the next page; None on the last page
+    estimated_total: Optional[int] = None  # Only with include_estimate
 
 
 class EventRSVPBase(BaseModel):
@@ -57,7 +57,36 @@ class TransactionResponse(BaseModel):
 class TransactionListResponse(BaseModel):
     """Schema for paginated transaction list."""
     transactions: List[TransactionResponse]
-    total: int
+    total: Optional[int] = None  # None for cursor pages unless an estimate was asked for
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as cursor for the next page; None on the last page
+
+
+class BulkTransactionItem(TransactionCreate):
+    """Schema for one purchase in a bulk POS sync."""
+    user_id: UUID  # Customer who made the purchase
+    client_reference: Optional[str] = Field(None, max_length=100)  # POS tab/receipt ID, echoed back
+
+
+class BulkTransactionCreate(BaseModel):
+    """Schema for syncing many POS purchases in one request."""
+    transactions: List[BulkTransactionItem] = Field(..., min_length=1, max_length=500)
+
+
+class BulkTransactionResult(BaseModel):
+    """Outcome of a single item in a bulk sync."""
+    index: int  # Position in the submitted list
+    client_reference: Optional[str] = None
+    success: bool
+    status_code: int
+    transaction: Optional[TransactionResponse] = None
+    error: Optional[str] = None
+
+
+class BulkTransactionResponse(BaseModel):
+    """Schema for bulk sync results, one entry per submitted item."""
+    results: List[BulkTransactionResult]
+    succeeded: int
+    failed: int
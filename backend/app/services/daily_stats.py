@@ -0,0 +1,252 @@
+"""
+Venue daily statistics rollup service.
+Keeps venue_daily_stats in step with the transactions table so the dashboard
+and analytics read one row per day instead of scanning every transaction.
+"""
+
+from collections import Counter
+from decimal import Decimal
+from datetime import date, datetime, time, timedelta
+from typing import Optional, List, Dict, Tuple, Iterable
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, and_, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models.transaction import Transaction, TransactionType, TransactionStatus
+from app.models.venue_daily_stats import VenueDailyStats, VenueDailyCustomer
+
+
+class DailyStatsRollup:
+    """
+    Service for maintaining the per-venue daily statistics rollup.
+
+    Handles:
+    - Incremental updates inside the transaction that creates the rows
+    - Full or partial rebuilds from transaction history (backfill and repair)
+    """
+
+    @staticmethod
+    def summarize(transactions: Iterable[Transaction]) -> Dict[Tuple[UUID, date], Dict]:
+        """
+        Fold transactions into per-venue, per-day deltas.
+
+        Only completed transactions count, matching the dashboard and analytics queries.
+
+        Args:
+            transactions: Transaction objects (flushed or pending)
+
+        Returns:
+            Mapping of (venue_id, day) to a delta dict with the rollup columns
+            and the set of customer IDs seen that day
+        """
+        buckets: Dict[Tuple[UUID, date], Dict] = {}
+
+        for txn in transactions:
+            if txn.status != TransactionStatus.COMPLETED:
+                continue
+
+            # created_at is only populated once the row has been flushed
+            day = (txn.created_at or datetime.utcnow()).date()
+            bucket = buckets.setdefault((txn.venue_id, day), {
+                "revenue": Decimal("0"),
+                "transaction_count": 0,
+                "points_issued": Decimal("0"),
+                "points_redeemed": Decimal("0"),
+                "referral_bonus_count": 0,
+                "referral_bonus_points": Decimal("0"),
+                "customers": set(),
+            })
+
+            bucket["revenue"] += Decimal(str(txn.amount_total or 0))
+            bucket["transaction_count"] += 1
+            bucket["points_issued"] += Decimal(str(txn.points_earned or 0))
+            bucket["points_redeemed"] += Decimal(str(txn.points_spent or 0))
+            if txn.transaction_type == TransactionType.REFERRAL_BONUS:
+                bucket["referral_bonus_count"] += 1
+                bucket["referral_bonus_points"] += Decimal(str(txn.points_earned or 0))
+            bucket["customers"].add(txn.user_id)
+
+        return buckets
+
+    @staticmethod
+    async def record_transactions(
+        db: AsyncSession,
+        transactions: Iterable[Transaction]
+    ) -> None:
+        """
+        Add transactions to the rollup without committing.
+
+        Call this from the same database transaction that creates the rows, so the
+        rollup commits (or rolls back) together with them. Call it last before the
+        commit: the venue-day rows stay locked until then.
+
+        Two statements however many venues and days the transactions span: one
+        multi-row insert for the day's customers and one multi-row
+        INSERT ... ON CONFLICT (venue_id, date) DO UPDATE adding the deltas. Rows
+        are written in key order, so concurrent writers lock them in the same order.
+
+        Args:
+            db: Database session
+            transactions: Newly created Transaction objects
+        """
+        buckets = DailyStatsRollup.summarize(transactions)
+        if not buckets:
+            return
+        keys = sorted(buckets)
+
+        # Register the days' customers first; only first sightings raise the distinct counts
+        result = await db.execute(
+            pg_insert(VenueDailyCustomer)
+            .values([
+                {"venue_id": venue_id, "date": day, "user_id": user_id}
+                for venue_id, day in keys
+                for user_id in sorted(buckets[(venue_id, day)]["customers"])
+            ])
+            .on_conflict_do_nothing()
+            .returning(VenueDailyCustomer.venue_id, VenueDailyCustomer.date)
+        )
+        new_customers = Counter((venue_id, day) for venue_id, day in result.all())
+
+        now = datetime.utcnow()
+        rows = []
+        for venue_id, day in keys:
+            delta = buckets[(venue_id, day)]
+            rows.append({
+                "venue_id": venue_id,
+                "date": day,
+                "revenue": delta["revenue"],
+                "transaction_count": delta["transaction_count"],
+                "points_issued": delta["points_issued"],
+                "points_redeemed": delta["points_redeemed"],
+                "referral_bonus_count": delta["referral_bonus_count"],
+                "referral_bonus_points": delta["referral_bonus_points"],
+                "unique_customers": new_customers[(venue_id, day)],
+                "updated_at": now,
+            })
+
+        stmt = pg_insert(VenueDailyStats).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[VenueDailyStats.venue_id, VenueDailyStats.date],
+            set_={
+                "revenue": VenueDailyStats.revenue + stmt.excluded.revenue,
+                "transaction_count": VenueDailyStats.transaction_count + stmt.excluded.transaction_count,
+                "points_issued": VenueDailyStats.points_issued + stmt.excluded.points_issued,
+                "points_redeemed": VenueDailyStats.points_redeemed + stmt.excluded.points_redeemed,
+                "referral_bonus_count": VenueDailyStats.referral_bonus_count + stmt.excluded.referral_bonus_count,
+                "referral_bonus_points": VenueDailyStats.referral_bonus_points + stmt.excluded.referral_bonus_points,
+                "unique_customers": VenueDailyStats.unique_customers + stmt.excluded.unique_customers,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def rebuild(
+        db: AsyncSession,
+        venue_id: Optional[UUID] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> int:
+        """
+        Recompute the rollup from transaction history and commit.
+
+        Existing rollup rows in the selected range are replaced, so this is safe
+        to run repeatedly (e.g. after a backfill or a data fix).
+
+        Args:
+            db: Database session
+            venue_id: Optional venue to rebuild (None = all venues)
+            start_date: Optional first day to rebuild (inclusive)
+            end_date: Optional last day to rebuild (inclusive)
+
+        Returns:
+            Number of venue-day rows written
+        """
+        day = func.date(Transaction.created_at)
+
+        txn_conditions = [Transaction.status == TransactionStatus.COMPLETED]
+        stats_conditions = []
+        customer_conditions = []
+        if venue_id:
+            txn_conditions.append(Transaction.venue_id == venue_id)
+            stats_conditions.append(VenueDailyStats.venue_id == venue_id)
+            customer_conditions.append(VenueDailyCustomer.venue_id == venue_id)
+        if start_date:
+            # Range on created_at itself so the created_at index is used
+            txn_conditions.append(Transaction.created_at >= datetime.combine(start_date, time.min))
+            stats_conditions.append(VenueDailyStats.date >= start_date)
+            customer_conditions.append(VenueDailyCustomer.date >= start_date)
+        if end_date:
+            txn_conditions.append(Transaction.created_at < datetime.combine(end_date + timedelta(days=1), time.min))
+            stats_conditions.append(VenueDailyStats.date <= end_date)
+            customer_conditions.append(VenueDailyCustomer.date <= end_date)
+
+        await db.execute(delete(VenueDailyStats).where(*stats_conditions))
+        await db.execute(delete(VenueDailyCustomer).where(*customer_conditions))
+
+        await db.execute(
+            pg_insert(VenueDailyCustomer).from_select(
+                ["venue_id", "date", "user_id"],
+                select(Transaction.venue_id, day, Transaction.user_id)
+                .where(and_(*txn_conditions))
+                .distinct()
+            )
+        )
+
+        is_referral = Transaction.transaction_type == TransactionType.REFERRAL_BONUS
+        result = await db.execute(
+            pg_insert(VenueDailyStats).from_select(
+                [
+                    "venue_id",
+                    "date",
+                    "revenue",
+                    "transaction_count",
+                    "points_issued",
+                    "points_redeemed",
+                    "referral_bonus_count",
+                    "referral_bonus_points",
+                    "unique_customers",
+                    "updated_at",
+                ],
+                select(
+                    Transaction.venue_id,
+                    day,
+                    func.coalesce(func.sum(Transaction.amount_total), 0),
+                    func.count(Transaction.id),
+                    func.coalesce(func.sum(Transaction.points_earned), 0),
+                    func.coalesce(func.sum(Transaction.points_spent), 0),
+                    func.count(case((is_referral, Transaction.id))),
+                    func.coalesce(func.sum(case((is_referral, Transaction.points_earned))), 0),
+                    func.count(func.distinct(Transaction.user_id)),
+                    func.now(),
+                )
+                .where(and_(*txn_conditions))
+                .group_by(Transaction.venue_id, day)
+            )
+        )
+
+        await db.commit()
+        return result.rowcount or 0
+
+    @staticmethod
+    async def get_daily_stats(
+        db: AsyncSession,
+        venue_id: UUID,
+        start_date: date,
+        end_date: date
+    ) -> List[VenueDailyStats]:
+        """
+        Get rollup rows for a venue between two days (inclusive), oldest first.
+        """
+        result = await db.execute(
+            select(VenueDailyStats).where(
+                and_(
+                    VenueDailyStats.venue_id == venue_id,
+                    VenueDailyStats.date >= start_date,
+                    VenueDailyStats.date <= end_date
+                )
+            ).order_by(VenueDailyStats.date)
+        )
+        return list(result.scalars().all())
@@ -0,0 +1,130 @@
+"""
+Venue owner dashboard statistics.
+Aggregates the venue daily rollup into the dashboard's period totals (today,
+week, month, all time) in one pass instead of one query per period.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, case
+
+from app.models.venue_daily_stats import VenueDailyStats, VenueDailyCustomer
+from app.schemas.admin import DashboardStats
+
+
+def _in_period(column, date_column, start_date: Optional[date]):
+    """
+    Conditional aggregate input: the column for rows inside the period, NULL otherwise.
+
+    Unbounded periods (start_date None) take every row the WHERE clause lets through.
+    """
+    if start_date is None:
+        return column
+    return case((date_column >= start_date, column))
+
+
+class DashboardStatsService:
+    """
+    Service for the dashboard's per-period statistics.
+
+    Reads only venue_daily_stats and venue_daily_customers (see DailyStatsRollup).
+    """
+
+    @staticmethod
+    async def get_stats_for_periods(
+        db: AsyncSession,
+        venue_id: UUID,
+        periods: Dict[str, Optional[datetime]],
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, DashboardStats]:
+        """
+        Calculate dashboard statistics for several time periods from the daily rollup.
+
+        Periods are whole days: a period starting at any time on a given day includes
+        that entire day. Totals come from one conditional-aggregate pass over
+        venue_daily_stats and distinct customers from one pass over
+        venue_daily_customers, so the cost grows with days, not transactions.
+
+        Args:
+            db: Database session
+            venue_id: Venue ID
+            periods: Mapping of period name to start date (None = no lower bound)
+            end_date: End of all periods, inclusive of its day (None = now)
+
+        Returns:
+            Mapping of period name to DashboardStats
+        """
+        if end_date is None:
+            end_date = datetime.utcnow()
+
+        start_days = {
+            name: start.date() if start is not None else None
+            for name, start in periods.items()
+        }
+
+        totals_columns = []
+        customer_columns = []
+        for name, start in start_days.items():
+            totals_columns.extend([
+                func.coalesce(
+                    func.sum(_in_period(VenueDailyStats.transaction_count, VenueDailyStats.date, start)), 0
+                ).label(f"{name}_transaction_count"),
+                func.coalesce(
+                    func.sum(_in_period(VenueDailyStats.revenue, VenueDailyStats.date, start)), 0
+                ).label(f"{name}_total_revenue"),
+                func.coalesce(
+                    func.sum(_in_period(VenueDailyStats.points_issued, VenueDailyStats.date, start)), 0
+                ).label(f"{name}_points_issued"),
+                func.coalesce(
+                    func.sum(_in_period(VenueDailyStats.points_redeemed, VenueDailyStats.date, start)), 0
+                ).label(f"{name}_points_redeemed"),
+            ])
+            customer_columns.append(
+                func.count(
+                    func.distinct(_in_period(VenueDailyCustomer.user_id, VenueDailyCustomer.date, start))
+                ).label(f"{name}_unique_customers")
+            )
+
+        stats_conditions = [
+            VenueDailyStats.venue_id == venue_id,
+            VenueDailyStats.date <= end_date.date(),
+        ]
+        customer_conditions = [
+            VenueDailyCustomer.venue_id == venue_id,
+            VenueDailyCustomer.date <= end_date.date(),
+        ]
+        # Only read as far back as the widest bounded period
+        if start_days and all(start is not None for start in start_days.values()):
+            earliest = min(start_days.values())
+            stats_conditions.append(VenueDailyStats.date >= earliest)
+            customer_conditions.append(VenueDailyCustomer.date >= earliest)
+
+        totals_result = await db.execute(select(*totals_columns).where(and_(*stats_conditions)))
+        totals = totals_result.one()._mapping
+        customers_result = await db.execute(select(*customer_columns).where(and_(*customer_conditions)))
+        customers = customers_result.one()._mapping
+
+        stats_by_period = {}
+        for name in periods:
+            transaction_count = int(totals[f"{name}_transaction_count"])
+            total_revenue = Decimal(str(totals[f"{name}_total_revenue"]))
+
+            # Calculate average transaction value
+            avg_value = Decimal("0.00")
+            if transaction_count > 0:
+                avg_value = total_revenue / transaction_count
+
+            stats_by_period[name] = DashboardStats(
+                revenue=total_revenue,
+                transactions=transaction_count,
+                unique_customers=customers[f"{name}_unique_customers"],
+                points_issued=Decimal(str(totals[f"{name}_points_issued"])),
+                points_redeemed=Decimal(str(totals[f"{name}_points_redeemed"])),
+                avg_transaction_value=avg_value.quantize(Decimal("0.01"))
+            )
+
+        return stats_by_period
@@ -9,12 +9,18 @@ from typing import Optional, List
 from datetime import datetime, timedelta
 from uuid import UUID
 
+from app.db.pagination import after_key, decode_cursor, estimate_count, key_types, next_cursor, order_by_key
 from app.models.event import Event
 from app.models.event_rsvp import EventRSVP
 from app.models.venue import Venue
 from app.schemas.event import EventCreate, EventUpdate
 
 
+# Sort key of list_events (column, descending)
+EVENT_LIST_ORDER = ((Event.is_featured, True), (Event.start_time, False), (Event.id, False))
+EVENT_LIST_CURSOR = "events"
+
+
 class EventService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -29,11 +35,66 @@ class EventService:
         is_featured: Optional[bool] = None,
         limit: int = 20,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> List[Event]:
-        """List events with optional filters"""
+        """
+        List events with optional filters.
+
+        Pages either by offset or, when a cursor from next_list_cursor() is
+        given, by keyset (offset is then ignored).
+        """
         query = select(Event).options(selectinload(Event.venue))
 
-        # Apply filters
+        conditions = self._list_conditions(venue_id, event_type, status, start_after, start_before, is_featured)
+        if cursor:
+            values = decode_cursor(cursor, EVENT_LIST_CURSOR, key_types(EVENT_LIST_ORDER))
+            conditions.append(after_key(EVENT_LIST_ORDER, values))
+
+        if conditions:
+            query = query.where(and_(*conditions))
+
+        # Featured first, then by start time (ID keeps the order stable for cursors)
+        query = query.order_by(*order_by_key(EVENT_LIST_ORDER))
+        query = query.limit(limit)
+        if not cursor:
+            query = query.offset(offset)
+
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def estimate_events(
+        self,
+        venue_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        status: Optional[str] = None,
+        start_after: Optional[datetime] = None,
+        start_before: Optional[datetime] = None,
+        is_featured: Optional[bool] = None,
+    ) -> int:
+        """Estimated number of events matching the list_events filters."""
+        query = select(Event.id)
+        conditions = self._list_conditions(venue_id, event_type, status, start_after, start_before, is_featured)
+        if conditions:
+            query = query.where(and_(*conditions))
+        return await estimate_count(self.db, query)
+
+    @staticmethod
+    def next_list_cursor(events: List[Event], limit: int) -> Optional[str]:
+        """Cursor for the list_events page after events, or None on the last page."""
+        return next_cursor(
+            EVENT_LIST_CURSOR, events, limit,
+            lambda event: (event.is_featured, event.start_time, event.id),
+        )
+
+    @staticmethod
+    def _list_conditions(
+        venue_id: Optional[str],
+        event_type: Optional[str],
+        status: Optional[str],
+        start_after: Optional[datetime],
+        start_before: Optional[datetime],
+        is_featured: Optional[bool],
+    ) -> list:
         conditions = []
         if venue_id:
             conditions.append(Event.venue_id == UUID(venue_id))
@@ -47,16 +108,7 @@ class EventService:
             conditions.append(Event.start_time <= start_before)
         if is_featured is not None:
             conditions.append(Event.is_featured == is_featured)
-
-        if conditions:
-            query = query.where(and_(*conditions))
-
-        # Order by start time, then by featured status
-        query = query.order_by(Event.is_featured.desc(), Event.start_time.asc())
-        query = query.limit(limit).offset(offset)
-
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return conditions
 
     async def get_event_by_id(self, event_id: str) -> Optional[Event]:
         """Get a single event by ID"""
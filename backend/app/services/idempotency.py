@@ -0,0 +1,212 @@
+"""
+Idempotency key support.
+Remembers the response to a POST by its Idempotency-Key so client retries
+(flaky club Wi-Fi) return the original result instead of running the request again.
+"""
+
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, delete, null
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60  # Clients retry for minutes; keep a day of keys
+RETRY_AFTER_SECONDS = 1  # Suggested wait while the original request is in flight
+
+
+class IdempotencyStore:
+    """
+    Database-backed result store keyed by (user, Idempotency-Key), with expiry.
+
+    The first request for a key claims it with an INSERT into idempotency_keys
+    in the request's own transaction, so the claim commits together with the
+    purchase and is rolled back with it if the operation fails. A duplicate
+    arriving on any worker blocks on the unique key until the original commits
+    or rolls back, then either replays the stored response or claims the key
+    itself. A key reused with a different route or body is rejected.
+
+    Keys are only reclaimed or purged once expired, never while pending.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def fingerprint(route: str, body: str) -> str:
+        """Stable digest of a route and request body, to detect key reuse with other data."""
+        return hashlib.sha256(f"{route}\n{body}".encode("utf-8")).hexdigest()
+
+    async def run(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Run an operation at most once per user and key.
+
+        The operation must use db and commit it (as TransactionProcessor does);
+        the stored response is written and committed after it returns.
+
+        Args:
+            db: Request database session
+            user_id: User sending the key
+            key: Idempotency-Key header value
+            fingerprint: Digest of the route and request body (see fingerprint())
+            operation: Coroutine function producing the response
+
+        Returns:
+            Tuple of (result, replayed) - replayed results are the stored JSON
+
+        Raises:
+            HTTPException: 409 if the original request is still being processed
+            HTTPException: 422 if the key was used with a different request
+            Exception: whatever the operation raised (the key is released)
+        """
+        now = datetime.utcnow()
+        values = {
+            "user_id": user_id,
+            "idempotency_key": key,
+            "request_fingerprint": fingerprint,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl_seconds),
+        }
+
+        # Claim the key, or take over an expired one
+        claim = pg_insert(IdempotencyKey).values(**values, response=null())
+        claim = claim.on_conflict_do_update(
+            index_elements=[IdempotencyKey.user_id, IdempotencyKey.idempotency_key],
+            set_={
+                "request_fingerprint": claim.excluded.request_fingerprint,
+                "response": null(),
+                "created_at": claim.excluded.created_at,
+                "expires_at": claim.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at <= now,
+        ).returning(IdempotencyKey.id)
+
+        if (await db.execute(claim)).scalar_one_or_none() is None:
+            stored = (await db.execute(
+                select(IdempotencyKey.request_fingerprint, IdempotencyKey.response).where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.idempotency_key == key
+                )
+            )).one()
+            await db.rollback()  # Nothing to write; end the transaction
+
+            if stored.request_fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used with a different request"
+                )
+            if stored.response is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still being processed",
+                    headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+                )
+            return stored.response, True
+
+        try:
+            result = await operation()
+        except Exception:
+            await db.rollback()  # Release the key with the failed request
+            raise
+
+        # Store the response; re-insert the key if the operation rolled back its claim
+        record = pg_insert(IdempotencyKey).values(**values, response=jsonable_encoder(result))
+        record = record.on_conflict_do_update(
+            index_elements=[IdempotencyKey.user_id, IdempotencyKey.idempotency_key],
+            set_={"response": record.excluded.response},
+            where=IdempotencyKey.response.is_(None),
+        )
+        await db.execute(record)
+        await db.commit()
+
+        return result, False
+
+    @staticmethod
+    async def purge_expired(db: AsyncSession) -> int:
+        """
+        Delete expired keys.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of keys deleted
+        """
+        result = await db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow())
+        )
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def run_purger(
+        session_factory: async_sessionmaker,
+        interval_seconds: float = 60 * 60
+    ) -> None:
+        """
+        Purge expired keys forever, every interval_seconds. Errors are logged and retried next round.
+
+        Args:
+            session_factory: Factory for a fresh session per round
+            interval_seconds: Delay between rounds
+        """
+        while True:
+            try:
+                async with session_factory() as db:
+                    purged = await IdempotencyStore.purge_expired(db)
+                if purged:
+                    print(f"Purged {purged} expired idempotency key(s)")
+            except Exception as e:
+                print(f"Idempotency key purge error: {e}")
+
+            await asyncio.sleep(interval_seconds)
+
+
+class IdempotencyKeyPurger:
+    """Background purge of expired keys in an API process (see IdempotencyStore.run_purger)."""
+
+    def __init__(self, session_factory: async_sessionmaker, interval_seconds: float):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Run the purger in the background on the current event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                IdempotencyStore.run_purger(self.session_factory, self.interval_seconds)
+            )
+
+    async def stop(self) -> None:
+        """Stop the background purger."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Shared by the transaction routes
+transaction_idempotency = IdempotencyStore()
+
+# Started by the API on startup (IDEMPOTENCY_KEY_PURGER)
+idempotency_key_purger = IdempotencyKeyPurger(AsyncSessionLocal, settings.IDEMPOTENCY_PURGE_SECONDS)
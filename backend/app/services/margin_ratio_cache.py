@@ -0,0 +1,132 @@
+"""
+Per-venue margin ratio cache.
+Compiles a venue's margin configuration into an immutable category → ratio
+lookup shared by all requests in the process, so points calculation is a
+dictionary lookup instead of a max() and a Decimal division per line item.
+"""
+
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.models.venue import Venue
+
+
+# Categories a venue configures a margin for; every other category falls back
+# to the default margin, i.e. the "other" ratio
+DEFAULT_CATEGORIES = ("food", "beverages", "other")
+
+
+class MarginRatioCache:
+    """
+    Process-level cache of compiled margin ratio tables, keyed by venue ID.
+
+    Each entry remembers the margins it was compiled from and is recompiled as
+    soon as the venue presents different margins, so a change made by another
+    worker is picked up the next time that venue is loaded. Updates flushed by
+    this process also drop the entry eagerly (see the Venue after_update hook).
+
+    Tables are never mutated in place: recompiling swaps in a new read-only
+    mapping, which keeps concurrent readers consistent without locks. A table
+    holds only the configured categories, so arbitrary category strings from
+    order items cannot grow the cache.
+    """
+
+    _tables: Dict[object, Tuple[Tuple, Mapping[str, Decimal]]] = {}
+
+    @staticmethod
+    def _fingerprint(venue: Venue) -> Tuple:
+        """Margin settings the ratios depend on."""
+        return (
+            venue.food_margin_percent,
+            venue.beverage_margin_percent,
+            venue.default_margin_percent,
+        )
+
+    @staticmethod
+    def highest_margin(venue: Venue) -> Decimal:
+        """Highest category margin at a venue (the denominator of every ratio)."""
+        highest_margin = max(
+            venue.food_margin_percent or Decimal("0"),
+            venue.beverage_margin_percent or Decimal("0"),
+            venue.default_margin_percent or Decimal("50.0")
+        )
+
+        # Ensure we don't divide by zero
+        if highest_margin == 0:
+            highest_margin = Decimal("100.0")
+
+        return highest_margin
+
+    @staticmethod
+    def _ratio(venue: Venue, category: str, highest_margin: Decimal) -> Decimal:
+        """category_margin / highest_margin, exactly as calculate_base_points computes it."""
+        category_margin = venue.get_margin_for_category(category)
+        return Decimal(category_margin) / Decimal(highest_margin)
+
+    @staticmethod
+    def compile(venue: Venue, categories=DEFAULT_CATEGORIES) -> Mapping[str, Decimal]:
+        """
+        Build a read-only category → margin ratio table for a venue.
+
+        Args:
+            venue: Venue with margin configuration
+            categories: Categories to include
+
+        Returns:
+            Immutable mapping of category to ratio
+        """
+        highest_margin = MarginRatioCache.highest_margin(venue)
+        return MappingProxyType({
+            category: MarginRatioCache._ratio(venue, category, highest_margin)
+            for category in categories
+        })
+
+    @staticmethod
+    def get_ratio(venue: Venue, category: Optional[str]) -> Decimal:
+        """
+        Margin ratio for a category at a venue, compiling the table if needed.
+
+        Args:
+            venue: Venue object
+            category: Product category (None = "other")
+
+        Returns:
+            category_margin / highest_venue_margin
+        """
+        category = category or "other"
+        fingerprint = MarginRatioCache._fingerprint(venue)
+
+        entry = MarginRatioCache._tables.get(venue.id)
+        if entry is None or entry[0] != fingerprint:
+            entry = (fingerprint, MarginRatioCache.compile(venue))
+            MarginRatioCache._tables[venue.id] = entry
+
+        table = entry[1]
+        ratio = table.get(category)
+        if ratio is None:
+            # Unconfigured category: the venue's default margin applies
+            ratio = table["other"]
+
+        return ratio
+
+    @staticmethod
+    def invalidate(venue_id=None) -> None:
+        """
+        Drop the compiled table for one venue, or for all venues.
+
+        Args:
+            venue_id: Venue to drop (None = clear the whole cache)
+        """
+        if venue_id is None:
+            MarginRatioCache._tables.clear()
+        else:
+            MarginRatioCache._tables.pop(venue_id, None)
+
+
+@event.listens_for(Venue, "after_update")
+def _invalidate_margin_ratios(mapper, connection, target: Venue) -> None:
+    """Forget a venue's compiled ratios whenever the venue row is updated."""
+    MarginRatioCache.invalidate(target.id)
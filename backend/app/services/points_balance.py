@@ -0,0 +1,164 @@
+"""
+Atomic UserPoints balance mutations.
+Each change is a single guarded SQL statement, so concurrent purchases at the
+same venue cannot overwrite each other's balance updates.
+"""
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models.user_points import UserPoints
+
+
+class PointsBalance:
+    """
+    Service for changing venue point balances without read-modify-write.
+
+    The arithmetic happens in the database (points_available = points_available - :x),
+    so no row lock is held across the request and no SELECT is needed beforehand.
+    Returned UserPoints objects reflect the row as written, and any copy already
+    loaded in the session is refreshed in place.
+    """
+
+    @staticmethod
+    async def earn(
+        db: AsyncSession,
+        user_id: UUID,
+        venue_id: UUID,
+        amount: Decimal
+    ) -> UserPoints:
+        """
+        Credit points, creating the UserPoints row on first earn.
+
+        Issues one INSERT ... ON CONFLICT (user_id, venue_id) DO UPDATE.
+
+        Args:
+            db: Database session
+            user_id: User earning the points
+            venue_id: Venue where the points were earned
+            amount: Points to add
+
+        Returns:
+            Updated UserPoints
+        """
+        now = datetime.utcnow()
+        stmt = pg_insert(UserPoints).values(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            venue_id=venue_id,
+            points_earned=amount,
+            points_spent=Decimal("0"),
+            points_available=amount,
+            created_at=now,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserPoints.user_id, UserPoints.venue_id],
+            set_={
+                "points_earned": UserPoints.points_earned + stmt.excluded.points_earned,
+                "points_available": UserPoints.points_available + stmt.excluded.points_available,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(UserPoints)
+
+        result = await db.scalars(stmt, execution_options={"populate_existing": True})
+        return result.one()
+
+    @staticmethod
+    async def spend(
+        db: AsyncSession,
+        user_id: UUID,
+        venue_id: UUID,
+        amount: Decimal
+    ) -> Optional[UserPoints]:
+        """
+        Deduct points if, and only if, the balance covers them.
+
+        Issues one UPDATE ... WHERE points_available >= :amount RETURNING, so two
+        concurrent spends can never take the balance below zero.
+
+        Args:
+            db: Database session
+            user_id: User spending the points
+            venue_id: Venue where the points are spent (must be where they were earned)
+            amount: Points to deduct
+
+        Returns:
+            Updated UserPoints, or None if there is no balance or it is insufficient
+        """
+        stmt = (
+            update(UserPoints)
+            .where(
+                UserPoints.user_id == user_id,
+                UserPoints.venue_id == venue_id,
+                UserPoints.points_available >= amount
+            )
+            .values(
+                points_spent=UserPoints.points_spent + amount,
+                points_available=UserPoints.points_available - amount,
+                updated_at=datetime.utcnow(),
+            )
+            .returning(UserPoints)
+        )
+
+        result = await db.scalars(stmt, execution_options={"populate_existing": True})
+        return result.one_or_none()
+
+    @staticmethod
+    async def apply_many(
+        db: AsyncSession,
+        changes: Dict[Tuple[UUID, UUID], Tuple[Decimal, Decimal]]
+    ) -> Dict[Tuple[UUID, UUID], UserPoints]:
+        """
+        Apply net balance changes for many (user, venue) pairs in one statement.
+
+        Issues one multi-row INSERT ... ON CONFLICT (user_id, venue_id) DO UPDATE
+        that adds each pair's points earned and spent, creating missing rows. Rows
+        are written in key order, so concurrent batches lock them in the same order.
+        Spends are not guarded: the caller checks them against balances it holds
+        locked (see TransactionProcessor.create_transactions_bulk).
+
+        Args:
+            db: Database session
+            changes: (points earned, points spent) by (user_id, venue_id)
+
+        Returns:
+            Updated UserPoints by (user_id, venue_id)
+        """
+        if not changes:
+            return {}
+
+        now = datetime.utcnow()
+        stmt = pg_insert(UserPoints).values([
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "venue_id": venue_id,
+                "points_earned": earned,
+                "points_spent": spent,
+                "points_available": earned - spent,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for (user_id, venue_id), (earned, spent) in sorted(changes.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserPoints.user_id, UserPoints.venue_id],
+            set_={
+                "points_earned": UserPoints.points_earned + stmt.excluded.points_earned,
+                "points_spent": UserPoints.points_spent + stmt.excluded.points_spent,
+                "points_available": UserPoints.points_available + stmt.excluded.points_available,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(UserPoints)
+
+        # Refreshes any of these balances already loaded in the session
+        result = await db.scalars(stmt, execution_options={"populate_existing": True})
+        return {(points.user_id, points.venue_id): points for points in result.all()}
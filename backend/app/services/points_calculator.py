@@ -4,18 +4,25 @@ Handles all points calculations based on venue margins, product bonuses, and mul
 """
 
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Optional, List, Dict
+from typing import TYPE_CHECKING, Optional, List, Dict, Iterable, Tuple
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, bindparam, any_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+import numpy as np
 
 from app.models.venue import Venue
 from app.models.product import Product
 from app.models.user_points import UserPoints
-from app.models.referral import ReferralChain
-from app.models.transaction import Transaction, TransactionType
 from app.models.user import User
+from app.services.points_balance import PointsBalance
+from app.services.points_engine import PointsEngine
+from app.services.margin_ratio_cache import MarginRatioCache
+
+if TYPE_CHECKING:
+    from app.models.referral import ReferralChain
+    from app.models.transaction import Transaction
 
 
 class PointsCalculator:
@@ -63,26 +70,89 @@ class PointsCalculator:
         if amount <= 0:
             return Decimal("0.00")
 
-        # Get margin for the specified category
-        category_margin = venue.get_margin_for_category(category or "other")
-
-        # Find the highest margin at this venue
-        highest_margin = max(
-            venue.food_margin_percent or Decimal("0"),
-            venue.beverage_margin_percent or Decimal("0"),
-            venue.default_margin_percent or Decimal("50.0")
-        )
-
-        # Ensure we don't divide by zero
-        if highest_margin == 0:
-            highest_margin = Decimal("100.0")
+        # category_margin / highest_margin, from the venue's precompiled table
+        margin_ratio = MarginRatioCache.get_ratio(venue, category)
 
         # Calculate: amount × 10% × (category_margin / highest_margin)
-        margin_ratio = Decimal(category_margin) / Decimal(highest_margin)
         base_points = amount * PointsCalculator.BASE_POINTS_RATE * margin_ratio
 
         return base_points.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
+    @staticmethod
+    def calculate_base_points_bulk(
+        amount_cents: np.ndarray,
+        categories: np.ndarray,
+        venue_ids: np.ndarray,
+        venues: Dict[UUID, Venue]
+    ) -> np.ndarray:
+        """
+        Vectorized calculate_base_points for many line items at once.
+
+        Margins are resolved once per distinct (venue, category) pair, then the
+        whole batch is evaluated by PointsEngine. Results equal
+        calculate_base_points row for row, to the cent.
+
+        Args:
+            amount_cents: Amounts in integer cents
+            categories: Category per row (None = "other")
+            venue_ids: Venue ID per row (keys of ``venues``)
+            venues: Venue objects by ID (may be unsaved copies, e.g. for simulations)
+
+        Returns:
+            Base points per row, in integer cents
+        """
+        amount_cents = np.asarray(amount_cents, dtype=np.int64)
+        if amount_cents.size == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        # Resolve margins once per distinct (venue, category) pair
+        venue_strings = np.asarray(venue_ids, dtype=object).astype(str)
+        category_array = np.asarray(categories, dtype=object)
+        # Same fallback as calculate_base_points: `category or "other"`
+        missing = (category_array == None) | (category_array == "")  # noqa: E711
+        category_strings = np.where(missing, "other", category_array).astype(str)
+        venue_names, venue_codes = np.unique(venue_strings, return_inverse=True)
+        category_names, category_codes = np.unique(category_strings, return_inverse=True)
+        pairs, pair_index = np.unique(
+            venue_codes.astype(np.int64) * len(category_names) + category_codes,
+            return_inverse=True
+        )
+
+        venues_by_key = {str(venue_id): venue for venue_id, venue in venues.items()}
+        numerators = np.empty(len(pairs), dtype=np.int64)
+        denominators = np.empty(len(pairs), dtype=np.int64)
+        slow_pairs = np.zeros(len(pairs), dtype=bool)
+        pair_configs = []
+        for i, pair in enumerate(pairs):
+            venue = venues_by_key[venue_names[pair // len(category_names)]]
+            category = str(category_names[pair % len(category_names)])
+            pair_configs.append((venue, category))
+
+            ratio = (
+                PointsEngine.as_fraction(venue.get_margin_for_category(category))
+                / PointsEngine.as_fraction(MarginRatioCache.highest_margin(venue))
+            )
+            if PointsEngine.is_compact(ratio):
+                numerators[i], denominators[i] = ratio.numerator, ratio.denominator
+            else:
+                # Unusually precise margins (e.g. floats): evaluate those rows with Decimal
+                numerators[i], denominators[i] = 0, 1
+                slow_pairs[i] = True
+
+        points = PointsEngine.base_points_cents(
+            amount_cents,
+            numerators[pair_index],
+            denominators[pair_index],
+            PointsCalculator.BASE_POINTS_RATE
+        )
+
+        for row in np.flatnonzero(slow_pairs[pair_index]):
+            venue, category = pair_configs[pair_index[row]]
+            amount = Decimal(int(amount_cents[row])).scaleb(-2)
+            points[row] = int(PointsCalculator.calculate_base_points(amount, venue, category).scaleb(2))
+
+        return points
+
     @staticmethod
     def calculate_product_points(
         amount: Decimal,
@@ -115,25 +185,53 @@ class PointsCalculator:
 
         return base_points
 
+    @staticmethod
+    async def fetch_products(
+        db: AsyncSession,
+        product_ids: Iterable[Optional[UUID]]
+    ) -> Dict[UUID, Product]:
+        """
+        Load every product referenced by one or more orders in a single query.
+
+        Args:
+            db: Database session
+            product_ids: Product IDs from order items (None entries are ignored)
+
+        Returns:
+            Mapping of product ID to Product (unknown IDs are simply absent)
+        """
+        ids = list({product_id for product_id in product_ids if product_id})
+        if not ids:
+            return {}
+
+        result = await db.execute(
+            select(Product).where(
+                Product.id == any_(bindparam("product_ids", ids, type_=ARRAY(PG_UUID(as_uuid=True))))
+            )
+        )
+        return {product.id: product for product in result.scalars().all()}
+
     @staticmethod
     def calculate_order_points(
         amount_cash: Decimal,
         venue: Venue,
         order_items: Optional[List[Dict]] = None,
-        db: Optional[AsyncSession] = None
+        products: Optional[Dict[UUID, Product]] = None
     ) -> Decimal:
         """
         Calculate total points earned for an entire order.
 
-        If order_items are provided with product IDs, calculates points per product
-        with individual bonus multipliers. Otherwise, uses the cash amount and
+        If order_items are provided, calculates points per line item. Items whose
+        product_id is in ``products`` (and belongs to this venue) use
+        calculate_product_points, so active product bonuses apply; other items
+        use their category margin. Without order_items, uses the cash amount and
         default margin.
 
         Args:
             amount_cash: Cash portion of payment (points only earned on cash)
             venue: Venue object
             order_items: Optional list of order items with product_id, quantity, price
-            db: Optional database session (required if order_items have product_ids)
+            products: Prefetched products by ID (see fetch_products)
 
         Returns:
             Total points earned for the order
@@ -142,18 +240,17 @@ class PointsCalculator:
             # Simple calculation without product details
             return PointsCalculator.calculate_base_points(amount_cash, venue)
 
+        products = products or {}
         total_points = Decimal("0.00")
 
         # Calculate points for each item
         for item in order_items:
             item_total = Decimal(str(item.get("price", 0))) * Decimal(str(item.get("quantity", 1)))
 
-            # If product ID provided, get product-specific bonus
-            if item.get("product_id") and db:
-                # Note: This would require async, so for now use category-based calculation
-                # In real implementation, products should be fetched beforehand
-                category = item.get("category", "other")
-                item_points = PointsCalculator.calculate_base_points(item_total, venue, category)
+            product = products.get(item.get("product_id"))
+            if product is not None and product.venue_id == venue.id:
+                # Product-specific margin and bonus multiplier
+                item_points = PointsCalculator.calculate_product_points(item_total, product, venue)
             else:
                 # Use category from item
                 category = item.get("category", "other")
@@ -167,6 +264,62 @@ class PointsCalculator:
 
         return total_points.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
+    @staticmethod
+    def referral_rewards(
+        chain: "ReferralChain",
+        venue_id: UUID,
+        points_earned: Decimal,
+        transaction_id: Optional[UUID] = None
+    ) -> Tuple[Dict[UUID, Decimal], List[Dict]]:
+        """
+        Work out one purchase's referral rewards without touching the database.
+
+        Walks the chain up to its first empty level (at most 5, 25% each) and
+        records the earnings on the chain.
+
+        Args:
+            chain: Referral chain of the user who made the purchase
+            venue_id: Venue where purchase was made
+            points_earned: Base points earned from the purchase
+            transaction_id: Optional original transaction ID for reference
+
+        Returns:
+            Points to credit per referrer at the venue, and the column values of
+            one REFERRAL_BONUS transaction per level
+        """
+        from app.models.transaction import TransactionType
+
+        reward_amount = points_earned * PointsCalculator.REFERRAL_REWARD_PERCENTAGE
+        credits: Dict[UUID, Decimal] = {}
+        rows: List[Dict] = []
+
+        for level in range(1, 6):
+            referrer_id = getattr(chain, f"level_{level}_referrer_id")
+
+            if not referrer_id:
+                # No referrer at this level
+                break
+
+            chain.add_earnings(level, reward_amount)
+            # One credit per referrer, even if they appear at several levels
+            credits[referrer_id] = credits.get(referrer_id, Decimal("0")) + reward_amount
+            rows.append({
+                "user_id": referrer_id,
+                "venue_id": venue_id,
+                "transaction_type": TransactionType.REFERRAL_BONUS,
+                "status": "completed",
+                "amount_total": Decimal("0"),
+                "amount_cash": Decimal("0"),
+                "amount_points": Decimal("0"),
+                "points_earned": reward_amount,
+                "points_spent": Decimal("0"),
+                "referral_level": level,
+                "original_transaction_id": transaction_id,
+                "description": f"Referral bonus (Level {level}) - {reward_amount:.2f} points",
+            })
+
+        return credits, rows
+
     @staticmethod
     async def process_referral_rewards(
         db: AsyncSession,
@@ -174,13 +327,19 @@ class PointsCalculator:
         venue_id: UUID,
         points_earned: Decimal,
         transaction_id: Optional[UUID] = None
-    ) -> List[Transaction]:
+    ) -> List["Transaction"]:
         """
         Process referral rewards for the user's referral chain (5 levels × 25% each).
 
         Creates REFERRAL_BONUS transactions for each referrer in the chain and
         updates their UserPoints balances.
 
+        Set-based: after loading the chain, every referrer balance is credited in
+        one INSERT ... ON CONFLICT (user_id, venue_id) DO UPDATE and all bonus
+        transactions go in one multi-row INSERT, so the round trips stay constant
+        regardless of chain depth. Results match the per-level loop in
+        _process_referral_rewards_per_level.
+
         Args:
             db: Database session
             user_id: User who made the purchase
@@ -191,6 +350,56 @@ class PointsCalculator:
         Returns:
             List of REFERRAL_BONUS Transaction objects created
         """
+        # Only referral rewards write transactions and read the chain; importing the
+        # models here keeps the margin and product calculations importable without them
+        from app.models.referral import ReferralChain
+        from app.models.transaction import Transaction
+
+        # Get user's referral chain
+        result = await db.execute(
+            select(ReferralChain).where(ReferralChain.user_id == user_id)
+        )
+        chain = result.scalar_one_or_none()
+
+        if not chain:
+            # User has no referral chain (wasn't referred by anyone)
+            return []
+
+        credits, rows = PointsCalculator.referral_rewards(chain, venue_id, points_earned, transaction_id)
+        if not rows:
+            return []
+
+        await PointsBalance.apply_many(db, {
+            (referrer_id, venue_id): (amount, Decimal("0"))
+            for referrer_id, amount in credits.items()
+        })
+
+        # Create referral bonus transactions
+        result = await db.scalars(insert(Transaction).returning(Transaction), rows)
+        referral_transactions = list(result.all())
+
+        await db.flush()
+        return referral_transactions
+
+    @staticmethod
+    async def _process_referral_rewards_per_level(
+        db: AsyncSession,
+        user_id: UUID,
+        venue_id: UUID,
+        points_earned: Decimal,
+        transaction_id: Optional[UUID] = None
+    ) -> List["Transaction"]:
+        """
+        Reference implementation of process_referral_rewards: one level at a time.
+
+        Kept for benchmarks/bench_referrals.py, which checks both paths produce the
+        same balances and transactions. Not used by request handling.
+        """
+        # Only referral rewards write transactions and read the chain; importing the
+        # models here keeps the margin and product calculations importable without them
+        from app.models.referral import ReferralChain
+        from app.models.transaction import Transaction, TransactionType
+
         # Get user's referral chain
         result = await db.execute(
             select(ReferralChain).where(ReferralChain.user_id == user_id)
@@ -0,0 +1,153 @@
+"""
+Vectorized points engine.
+Evaluates PointsCalculator's base-points formula over whole arrays of amounts
+(millions of historical line items at once) with results identical to the cent.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+from typing import Tuple
+
+import numpy as np
+
+
+# Fractions with larger terms are evaluated with Decimal instead (see PointsEngine)
+MAX_FRACTION_TERM = 2 ** 20
+# Keep amount × numerator products comfortably inside int64
+MAX_AMOUNT_CENTS = 2 ** 62 // (MAX_FRACTION_TERM * MAX_FRACTION_TERM)
+
+CENT = Decimal("0.01")
+
+
+class PointsEngine:
+    """
+    Integer-exact batch evaluation of the points formula.
+
+    Amounts are integer cents and every factor is an exact fraction, so each
+    result is a single integer division rounded half up. This equals the Decimal
+    path in PointsCalculator.calculate_base_points except when the exact value
+    lies precisely on a half cent: Decimal rounds the margin ratio to 28 digits
+    before multiplying, which can move such a tie either way. The distance from
+    any other result to a half-cent boundary is at least 1 / (2 × denominator),
+    far larger than that 28-digit error, so only exact ties are recomputed with
+    Decimal. They are rare (a few per million rows in practice).
+    """
+
+    @staticmethod
+    def as_fraction(value) -> Fraction:
+        """Exact fraction for a Decimal, int, float or numeric string."""
+        return Fraction(Decimal(str(value)) if isinstance(value, str) else Decimal(value))
+
+    @staticmethod
+    def is_compact(fraction: Fraction) -> bool:
+        """Whether a fraction's terms are small enough for the integer kernel."""
+        return abs(fraction.numerator) <= MAX_FRACTION_TERM and fraction.denominator <= MAX_FRACTION_TERM
+
+    @staticmethod
+    def base_points_cents(
+        amount_cents: np.ndarray,
+        ratio_numerators: np.ndarray,
+        ratio_denominators: np.ndarray,
+        base_rate: Decimal
+    ) -> np.ndarray:
+        """
+        Compute quantize(amount × base_rate × ratio, 0.01, ROUND_HALF_UP) per row.
+
+        Args:
+            amount_cents: Purchase amounts in integer cents
+            ratio_numerators: Per-row category_margin / highest_margin numerator
+            ratio_denominators: Per-row ratio denominator (positive)
+            base_rate: PointsCalculator.BASE_POINTS_RATE
+
+        Returns:
+            Points in integer cents (0 for amounts <= 0)
+
+        Raises:
+            ValueError: if an amount or fraction term exceeds the exact range
+        """
+        amount = np.asarray(amount_cents, dtype=np.int64)
+        numer = np.asarray(ratio_numerators, dtype=np.int64)
+        denom = np.asarray(ratio_denominators, dtype=np.int64)
+
+        rate = PointsEngine.as_fraction(base_rate)
+        if not PointsEngine.is_compact(rate):
+            raise ValueError(f"Base rate {base_rate} is too precise for the points engine")
+        if amount.size and int(np.abs(amount).max()) > MAX_AMOUNT_CENTS // max(rate.numerator, 1):
+            raise ValueError("Amount exceeds the points engine's exact range")
+        if numer.size and (int(np.abs(numer).max()) > MAX_FRACTION_TERM or int(denom.max()) > MAX_FRACTION_TERM):
+            raise ValueError("Margin ratio is too precise for the points engine")
+
+        # points in cents = amount_cents × rate × ratio, exactly
+        total_numer = amount * rate.numerator * numer
+        total_denom = denom * rate.denominator
+
+        positive = amount > 0
+        total_numer = np.where(positive, total_numer, 0)
+
+        quotient, remainder = np.divmod(total_numer, total_denom)
+        twice = 2 * remainder
+        points = quotient + (twice > total_denom)
+
+        # Exact half cents: defer to Decimal so the 28-digit ratio rounding matches
+        for i in np.flatnonzero(positive & (twice == total_denom)):
+            points[i] = PointsEngine._decimal_base_points_cents(
+                int(amount[i]), int(numer[i]), int(denom[i]), base_rate
+            )
+
+        return points
+
+    @staticmethod
+    def _decimal_base_points_cents(amount_cents: int, numer: int, denom: int, base_rate: Decimal) -> int:
+        """The Decimal formula for one row, mirroring calculate_base_points."""
+        amount = Decimal(amount_cents).scaleb(-2)
+        margin_ratio = Decimal(numer) / Decimal(denom)
+        points = (amount * base_rate * margin_ratio).quantize(CENT, rounding=ROUND_HALF_UP)
+        return int(points.scaleb(2))
+
+    @staticmethod
+    def apply_multiplier_cents(points_cents: np.ndarray, multiplier) -> np.ndarray:
+        """
+        Compute quantize(points × multiplier, 0.01, ROUND_HALF_UP) per row.
+
+        With a compact multiplier (e.g. Numeric(3, 2)) the Decimal product is
+        exact, so integer rounding is identical with no tie handling.
+
+        Args:
+            points_cents: Points in integer cents
+            multiplier: Venue points multiplier
+
+        Returns:
+            Multiplied points in integer cents
+        """
+        points = np.asarray(points_cents, dtype=np.int64)
+        factor = PointsEngine.as_fraction(multiplier)
+
+        if not PointsEngine.is_compact(factor) or (
+            points.size and int(np.abs(points).max()) > MAX_AMOUNT_CENTS
+        ):
+            decimal_factor = Decimal(multiplier)
+            return np.array(
+                [
+                    int((Decimal(int(p)).scaleb(-2) * decimal_factor).quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+                    for p in points
+                ],
+                dtype=np.int64,
+            )
+
+        scaled = points * factor.numerator
+        sign = np.sign(scaled)
+        quotient, remainder = np.divmod(np.abs(scaled), factor.denominator)
+        # ROUND_HALF_UP rounds ties away from zero
+        return sign * (quotient + (2 * remainder >= factor.denominator))
+
+    @staticmethod
+    def to_cents(amount) -> Tuple[int, bool]:
+        """
+        Convert a monetary amount to integer cents.
+
+        Returns:
+            (cents, exact) - exact is False if the amount has sub-cent digits
+        """
+        value = Decimal(str(amount)) if isinstance(amount, float) else Decimal(amount)
+        cents = value.scaleb(2)
+        return int(cents), cents == cents.to_integral_value()
@@ -0,0 +1,313 @@
+"""
+Bulk points recalculation service.
+Replays PointsCalculator.calculate_order_points over historical purchases with
+the vectorized engine, for what-if margin simulations and for correcting
+points after a venue configuration fix.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, List, Dict, Iterable
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, bindparam
+
+from app.models.venue import Venue
+from app.models.transaction import Transaction, TransactionType, TransactionStatus
+from app.models.user_points import UserPoints
+from app.services.points_calculator import PointsCalculator
+from app.services.points_engine import PointsEngine
+from app.services.venue_counters import VenueCounters
+
+
+class PointsRecalculator:
+    """
+    Service for recomputing points earned on past purchases in bulk.
+
+    Handles:
+    - Loading purchases and flattening their order items into arrays
+    - Order points identical to calculate_order_points (to the cent)
+    - Margin/multiplier what-if simulations
+    - Applying corrected points to transactions and balances
+
+    Product bonus multipliers are time-limited promotions whose state at purchase
+    time is not recorded, so replays price every line at its category margin.
+    """
+
+    # Venue settings that affect points (and may be overridden in simulations)
+    CONFIG_FIELDS = (
+        "food_margin_percent",
+        "beverage_margin_percent",
+        "default_margin_percent",
+        "points_multiplier",
+    )
+
+    @staticmethod
+    async def load_purchases(
+        db: AsyncSession,
+        venue_ids: Optional[List[UUID]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List:
+        """
+        Load completed purchases with the columns needed for replay.
+
+        Args:
+            db: Database session
+            venue_ids: Optional venues to include (None = all venues)
+            start_date: Optional start (inclusive)
+            end_date: Optional end (exclusive)
+
+        Returns:
+            Rows with id, user_id, venue_id, amount_cash, order_items, points_earned
+        """
+        query = select(
+            Transaction.id,
+            Transaction.user_id,
+            Transaction.venue_id,
+            Transaction.amount_cash,
+            Transaction.order_items,
+            Transaction.points_earned,
+        ).where(
+            Transaction.transaction_type == TransactionType.PURCHASE,
+            Transaction.status == TransactionStatus.COMPLETED
+        )
+
+        if venue_ids:
+            query = query.where(Transaction.venue_id.in_(venue_ids))
+        if start_date:
+            query = query.where(Transaction.created_at >= start_date)
+        if end_date:
+            query = query.where(Transaction.created_at < end_date)
+
+        result = await db.execute(query.order_by(Transaction.created_at))
+        return list(result.all())
+
+    @staticmethod
+    def calculate_order_points_bulk(
+        purchases: Iterable,
+        venues: Dict[UUID, Venue]
+    ) -> np.ndarray:
+        """
+        Vectorized calculate_order_points for many purchases.
+
+        Mirrors both branches: without order items (or without cash) the cash
+        amount earns base points at the default margin; otherwise each line earns
+        base points at its category margin and the sum is multiplied by the
+        venue multiplier.
+
+        Args:
+            purchases: Rows with venue_id, amount_cash and order_items
+            venues: Venue objects by ID (may be unsaved copies with overrides)
+
+        Returns:
+            Points per purchase, in integer cents
+        """
+        purchases = list(purchases)
+        points = np.zeros(len(purchases), dtype=np.int64)
+
+        # Flatten into line arrays; rows without items become a single "cash" line
+        line_purchase: List[int] = []
+        line_cents: List[int] = []
+        line_category: List[Optional[str]] = []
+        line_venue: List[UUID] = []
+        itemized = np.zeros(len(purchases), dtype=bool)
+        inexact_lines = []  # (purchase index, amount, category): sub-cent amounts
+
+        for index, purchase in enumerate(purchases):
+            amount_cash = Decimal(str(purchase.amount_cash or 0))
+            if not purchase.order_items or amount_cash <= 0:
+                lines = [(amount_cash, None)]
+            else:
+                itemized[index] = True
+                lines = [
+                    (
+                        Decimal(str(item.get("price", 0))) * Decimal(str(item.get("quantity", 1))),
+                        item.get("category", "other"),
+                    )
+                    for item in purchase.order_items
+                ]
+
+            for amount, category in lines:
+                cents, exact = PointsEngine.to_cents(amount)
+                if not exact:
+                    inexact_lines.append((index, amount, category))
+                    continue
+                line_purchase.append(index)
+                line_cents.append(cents)
+                line_category.append(category)
+                line_venue.append(purchase.venue_id)
+
+        line_points = PointsCalculator.calculate_base_points_bulk(
+            np.array(line_cents, dtype=np.int64),
+            np.array(line_category, dtype=object),
+            np.array(line_venue, dtype=object),
+            venues
+        )
+        np.add.at(points, np.array(line_purchase, dtype=np.int64), line_points)
+
+        for index, amount, category in inexact_lines:
+            venue = venues[purchases[index].venue_id]
+            points[index] += int(PointsCalculator.calculate_base_points(amount, venue, category).scaleb(2))
+
+        # Venue-wide multiplier applies to itemized orders only
+        venue_of = np.array([purchase.venue_id for purchase in purchases], dtype=object)
+        for venue_id, venue in venues.items():
+            selected = itemized & (venue_of == venue_id)
+            if selected.any():
+                points[selected] = PointsEngine.apply_multiplier_cents(
+                    points[selected],
+                    venue.points_multiplier or Decimal("1.0")
+                )
+
+        return points
+
+    @staticmethod
+    async def simulate(
+        db: AsyncSession,
+        venue: Venue,
+        overrides: Dict,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict:
+        """
+        Compare points under the venue's current and proposed configuration.
+
+        Args:
+            db: Database session
+            venue: Venue with its current configuration
+            overrides: Proposed values for any of food_margin_percent,
+                beverage_margin_percent, default_margin_percent, points_multiplier
+            start_date: Start of the replayed period (inclusive)
+            end_date: End of the replayed period (exclusive)
+
+        Returns:
+            Dict with transactions, current_points, simulated_points,
+            difference and percent_change
+        """
+        purchases = await PointsRecalculator.load_purchases(db, [venue.id], start_date, end_date)
+
+        # Transient venue, so the proposed configuration never reaches the database
+        config = {field: getattr(venue, field) for field in PointsRecalculator.CONFIG_FIELDS}
+        config.update(overrides)
+        proposed = Venue(id=venue.id, **config)
+
+        current = PointsRecalculator.calculate_order_points_bulk(purchases, {venue.id: venue})
+        simulated = PointsRecalculator.calculate_order_points_bulk(purchases, {venue.id: proposed})
+
+        current_points = Decimal(int(current.sum())).scaleb(-2)
+        simulated_points = Decimal(int(simulated.sum())).scaleb(-2)
+
+        percent_change = 0.0
+        if current_points > 0:
+            percent_change = float((simulated_points - current_points) / current_points * 100)
+
+        return {
+            "transactions": len(purchases),
+            "current_points": current_points,
+            "simulated_points": simulated_points,
+            "difference": simulated_points - current_points,
+            "percent_change": round(percent_change, 2),
+        }
+
+    @staticmethod
+    async def recalculate(
+        db: AsyncSession,
+        venue_ids: Optional[List[UUID]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        apply: bool = False
+    ) -> List[Dict]:
+        """
+        Recompute points for past purchases with each venue's current configuration.
+
+        With apply=True, corrected points_earned are written back, each customer's
+        balance at the venue is adjusted by the net difference, and the venue
+        points-issued counter receives a matching delta, all in one commit.
+        Referral bonuses derived from the old amounts are left as they are.
+
+        Args:
+            db: Database session
+            venue_ids: Optional venues to recalculate (None = all venues)
+            start_date: Optional start (inclusive)
+            end_date: Optional end (exclusive)
+            apply: Write the corrections (default: dry run)
+
+        Returns:
+            One dict per changed purchase: transaction_id, user_id, venue_id,
+            old_points, new_points
+        """
+        purchases = await PointsRecalculator.load_purchases(db, venue_ids, start_date, end_date)
+        if not purchases:
+            return []
+
+        result = await db.execute(
+            select(Venue).where(Venue.id.in_({purchase.venue_id for purchase in purchases}))
+        )
+        venues = {venue.id: venue for venue in result.scalars().all()}
+
+        new_points = PointsRecalculator.calculate_order_points_bulk(purchases, venues)
+
+        changes = []
+        for purchase, cents in zip(purchases, new_points):
+            new_value = Decimal(int(cents)).scaleb(-2)
+            old_value = Decimal(str(purchase.points_earned or 0))
+            if new_value != old_value:
+                changes.append({
+                    "transaction_id": purchase.id,
+                    "user_id": purchase.user_id,
+                    "venue_id": purchase.venue_id,
+                    "old_points": old_value,
+                    "new_points": new_value,
+                })
+
+        if apply and changes:
+            await PointsRecalculator._apply_changes(db, changes)
+
+        return changes
+
+    @staticmethod
+    async def _apply_changes(db: AsyncSession, changes: List[Dict]) -> None:
+        """Write recalculated points, adjust balances and venue counters, commit."""
+        transactions = Transaction.__table__
+        await db.execute(
+            update(transactions)
+            .where(transactions.c.id == bindparam("b_id"))
+            .values(points_earned=bindparam("b_points")),
+            [{"b_id": change["transaction_id"], "b_points": change["new_points"]} for change in changes]
+        )
+
+        balance_deltas: Dict = {}
+        venue_deltas: Dict = {}
+        for change in changes:
+            delta = change["new_points"] - change["old_points"]
+            key = (change["user_id"], change["venue_id"])
+            balance_deltas[key] = balance_deltas.get(key, Decimal("0")) + delta
+            venue_deltas[change["venue_id"]] = venue_deltas.get(change["venue_id"], Decimal("0")) + delta
+
+        balances = UserPoints.__table__
+        await db.execute(
+            update(balances)
+            .where(
+                balances.c.user_id == bindparam("b_user_id"),
+                balances.c.venue_id == bindparam("b_venue_id")
+            )
+            .values(
+                points_earned=balances.c.points_earned + bindparam("b_delta"),
+                points_available=balances.c.points_available + bindparam("b_delta"),
+                updated_at=datetime.utcnow(),
+            ),
+            [
+                {"b_user_id": user_id, "b_venue_id": venue_id, "b_delta": delta}
+                for (user_id, venue_id), delta in balance_deltas.items()
+            ]
+        )
+
+        await VenueCounters.record_many(
+            db,
+            {venue_id: (Decimal("0"), delta) for venue_id, delta in venue_deltas.items()}
+        )
+
+        await db.commit()
@@ -0,0 +1,320 @@
+"""
+SMS outbox service.
+Request handlers queue messages in the same transaction as the change that
+triggers them; a background worker delivers them with bounded concurrency,
+retries with exponential backoff and skips messages that were superseded.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.sms import build_transport
+from app.db.session import AsyncSessionLocal
+from app.models.sms_outbox import SmsOutboxMessage, SmsOutboxStatus
+
+logger = logging.getLogger(__name__)
+
+
+# A claimed message whose worker died is retried after this long
+SEND_LEASE = timedelta(seconds=60)
+
+
+class SmsOutboxService:
+    """
+    Service for queueing and claiming outbox messages.
+
+    Handles:
+    - Queueing with per-number deduplication
+    - Claiming due messages (safe with several workers)
+    - Recording delivery results and scheduling retries
+    """
+
+    @staticmethod
+    async def enqueue(
+        db: AsyncSession,
+        phone_number: str,
+        kind: str,
+        body: str,
+        expires_at: Optional[datetime] = None
+    ) -> SmsOutboxMessage:
+        """
+        Queue an SMS; it is sent after the caller commits.
+
+        A message of the same kind still waiting for the same number is
+        superseded: only the newest verification code is worth sending.
+
+        Args:
+            db: Database session (not committed here)
+            phone_number: Recipient in E.164 format
+            kind: Message kind, e.g. "verification" or "welcome"
+            body: Message text
+            expires_at: Optional time after which the message is dropped
+
+        Returns:
+            The pending outbox message
+        """
+        await db.execute(
+            update(SmsOutboxMessage)
+            .where(
+                SmsOutboxMessage.phone_number == phone_number,
+                SmsOutboxMessage.kind == kind,
+                SmsOutboxMessage.status == SmsOutboxStatus.PENDING
+            )
+            .values(status=SmsOutboxStatus.SUPERSEDED)
+        )
+
+        message = SmsOutboxMessage(
+            phone_number=phone_number,
+            kind=kind,
+            body=body,
+            status=SmsOutboxStatus.PENDING,
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+            expires_at=expires_at,
+        )
+        db.add(message)
+        return message
+
+    @staticmethod
+    async def claim_batch(db: AsyncSession, batch_size: int) -> List[SmsOutboxMessage]:
+        """
+        Claim due messages for delivery and commit the claim.
+
+        Expired messages are closed first. Rows locked by another worker are
+        skipped (FOR UPDATE SKIP LOCKED), and each claimed row is leased for
+        SEND_LEASE so a crashed worker's messages are picked up again.
+
+        Args:
+            db: Database session
+            batch_size: Maximum messages to claim
+
+        Returns:
+            Claimed messages, oldest due first
+        """
+        now = datetime.utcnow()
+        active = (SmsOutboxStatus.PENDING, SmsOutboxStatus.SENDING)
+
+        await db.execute(
+            update(SmsOutboxMessage)
+            .where(
+                SmsOutboxMessage.status.in_(active),
+                SmsOutboxMessage.expires_at <= now
+            )
+            .values(status=SmsOutboxStatus.EXPIRED)
+        )
+
+        result = await db.execute(
+            select(SmsOutboxMessage.id)
+            .where(
+                SmsOutboxMessage.status.in_(active),
+                SmsOutboxMessage.next_attempt_at <= now
+            )
+            .order_by(SmsOutboxMessage.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        ids = list(result.scalars().all())
+
+        messages: List[SmsOutboxMessage] = []
+        if ids:
+            await db.execute(
+                update(SmsOutboxMessage)
+                .where(SmsOutboxMessage.id.in_(ids))
+                .values(
+                    status=SmsOutboxStatus.SENDING,
+                    attempts=SmsOutboxMessage.attempts + 1,
+                    next_attempt_at=now + SEND_LEASE,
+                )
+            )
+            result = await db.execute(
+                select(SmsOutboxMessage)
+                .where(SmsOutboxMessage.id.in_(ids))
+                .order_by(SmsOutboxMessage.id)
+                .execution_options(populate_existing=True)
+            )
+            messages = list(result.scalars().all())
+
+        await db.commit()
+        return messages
+
+    @staticmethod
+    def retry_delay(attempts: int) -> timedelta:
+        """Backoff before the next attempt: base × 2^(attempts-1), capped, with jitter."""
+        delay = min(
+            settings.SMS_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0),
+            settings.SMS_RETRY_MAX_SECONDS
+        )
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+    @staticmethod
+    async def record_result(
+        db: AsyncSession,
+        message: SmsOutboxMessage,
+        provider_message_id: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Store the outcome of a delivery attempt (not committed here).
+
+        Args:
+            db: Database session
+            message: Claimed message
+            provider_message_id: Provider ID when the send succeeded
+            error: Error text when it failed
+        """
+        now = datetime.utcnow()
+        if error is None:
+            values = {
+                "status": SmsOutboxStatus.SENT,
+                "sent_at": now,
+                "provider_message_id": provider_message_id,
+                "last_error": None,
+            }
+        elif message.attempts >= settings.SMS_MAX_ATTEMPTS:
+            values = {"status": SmsOutboxStatus.FAILED, "last_error": error}
+        else:
+            values = {
+                "status": SmsOutboxStatus.PENDING,
+                "next_attempt_at": now + SmsOutboxService.retry_delay(message.attempts),
+                "last_error": error,
+            }
+
+        # Only if still ours: a lease that ran out may have been reclaimed
+        await db.execute(
+            update(SmsOutboxMessage)
+            .where(
+                SmsOutboxMessage.id == message.id,
+                SmsOutboxMessage.status == SmsOutboxStatus.SENDING,
+                SmsOutboxMessage.attempts == message.attempts
+            )
+            .values(**values)
+        )
+
+
+class SmsOutboxWorker:
+    """
+    Background delivery loop for the SMS outbox.
+
+    Claims a batch, sends up to `concurrency` messages at a time through the
+    transport, records the results, and repeats. When the outbox is empty it
+    sleeps for poll_seconds or until notify() is called after a commit in
+    this process, so codes usually go out within milliseconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        transport=None,
+        concurrency: int = settings.SMS_SEND_CONCURRENCY,
+        batch_size: int = settings.SMS_OUTBOX_BATCH_SIZE,
+        poll_seconds: float = settings.SMS_OUTBOX_POLL_SECONDS
+    ):
+        self.session_factory = session_factory
+        self._transport = transport
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"sent": 0, "failed_attempts": 0}
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = build_transport()
+        return self._transport
+
+    def notify(self) -> None:
+        """Wake the worker: new messages were committed."""
+        self._wake.set()
+
+    async def _send(self, message: SmsOutboxMessage):
+        async with self._semaphore:
+            try:
+                provider_id = await self.transport.send(message.phone_number, message.body)
+                return message, provider_id, None
+            except Exception as e:
+                return message, None, str(e) or type(e).__name__
+
+    async def process_batch(self) -> int:
+        """
+        Claim and deliver one batch.
+
+        Returns:
+            Number of messages attempted
+        """
+        async with self.session_factory() as db:
+            messages = await SmsOutboxService.claim_batch(db, self.batch_size)
+        if not messages:
+            return 0
+
+        results = await asyncio.gather(*(self._send(message) for message in messages))
+
+        async with self.session_factory() as db:
+            for message, provider_id, error in results:
+                await SmsOutboxService.record_result(db, message, provider_id, error)
+                if error is None:
+                    self.stats["sent"] += 1
+                else:
+                    self.stats["failed_attempts"] += 1
+                    logger.warning(f"SMS {message.id} to {message.phone_number} failed (attempt {message.attempts}): {error}")
+            await db.commit()
+
+        return len(messages)
+
+    async def run(self) -> None:
+        """Deliver forever. Errors are logged and retried next round."""
+        while True:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"SMS outbox worker error: {e}")
+                processed = 0
+
+            if not processed:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    async def drain(self) -> int:
+        """
+        Deliver until nothing is due (for scripts, tests and benchmarks).
+
+        Returns:
+            Number of delivery attempts made
+        """
+        attempted = 0
+        while True:
+            processed = await self.process_batch()
+            if not processed:
+                return attempted
+            attempted += processed
+
+    def start(self) -> None:
+        """Run the worker in the background on the current event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the background worker."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Started by the API on startup (SMS_OUTBOX_WORKER); notified by request handlers
+sms_outbox_worker = SmsOutboxWorker(AsyncSessionLocal)
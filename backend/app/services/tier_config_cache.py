@@ -0,0 +1,234 @@
+"""
+Per-venue compiled tier configuration.
+Parses a venue's tier_config JSON once into read-only tier levels and
+sorted threshold arrays, so the tier-config endpoint skips json.loads and
+model building, and a member's tier is a binary search instead of a scan.
+"""
+
+import json
+from bisect import bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.models.venue import Venue
+from app.schemas.venue import TierLevel
+
+
+class ResolvedTier(NamedTuple):
+    tier: TierLevel
+    level: int  # Position in the ascending tier list (0 = entry tier)
+    progress: float  # 0.0 to 1.0 towards the next tier's points (1.0 at the top tier)
+
+
+class CompiledTiers:
+    """
+    Immutable tier table: levels in ascending order with their thresholds.
+
+    Tiers are cumulative: reaching a tier requires its points and at least
+    the visits of every tier below it, so both threshold arrays are sorted
+    and resolve_tier() needs two binary searches.
+    """
+
+    __slots__ = ("levels", "min_points", "min_visits")
+
+    def __init__(self, levels: Iterable[TierLevel], min_visits: Optional[Iterable[int]] = None):
+        levels = list(levels)
+        visits = list(min_visits) if min_visits is not None else [0] * len(levels)
+        ordered = sorted(zip(levels, visits), key=lambda pair: pair[0].min_points)
+        self.levels: Tuple[TierLevel, ...] = tuple(level for level, _ in ordered)
+        self.min_points: Tuple[int, ...] = tuple(level.min_points for level in self.levels)
+
+        cumulative = []
+        for _, required in ordered:
+            cumulative.append(max(required or 0, cumulative[-1] if cumulative else 0))
+        self.min_visits: Tuple[int, ...] = tuple(cumulative)
+
+    def resolve_tier(self, points, visits: Optional[int] = None) -> Optional[ResolvedTier]:
+        """
+        Tier reached with the given lifetime points (and visits).
+
+        Args:
+            points: Lifetime points at the venue
+            visits: Visits at the venue (None = ignore visit requirements)
+
+        Returns:
+            The highest tier both thresholds allow, or None if the points are
+            below the entry tier
+        """
+        level = bisect_right(self.min_points, points)
+        if visits is not None:
+            level = min(level, bisect_right(self.min_visits, visits))
+        level -= 1
+        if level < 0:
+            return None
+
+        if level + 1 < len(self.min_points):
+            floor, ceiling = self.min_points[level], self.min_points[level + 1]
+            progress = min(1.0, max(0.0, (points - floor) / (ceiling - floor))) if ceiling > floor else 0.0
+        else:
+            progress = 1.0
+        return ResolvedTier(self.levels[level], level, progress)
+
+
+def _default_tiers() -> List[TierLevel]:
+    """Default tier configuration (venues without their own)"""
+    return [
+        TierLevel(
+            name="bronze",
+            min_points=0,
+            max_points=999,
+            color="#CD7F32",
+            benefits=["Earn 1 point per €1 spent", "Birthday reward"],
+            discount_percentage=0.0,
+            bonus_multiplier=1.0,
+        ),
+        TierLevel(
+            name="silver",
+            min_points=1000,
+            max_points=4999,
+            color="#C0C0C0",
+            benefits=[
+                "Earn 1.25 points per €1 spent",
+                "5% discount on all purchases",
+                "Priority booking for events",
+                "Birthday reward",
+            ],
+            discount_percentage=5.0,
+            bonus_multiplier=1.25,
+        ),
+        TierLevel(
+            name="gold",
+            min_points=5000,
+            max_points=14999,
+            color="#FFD700",
+            benefits=[
+                "Earn 1.5 points per €1 spent",
+                "10% discount on all purchases",
+                "VIP event access",
+                "Free drink on birthday",
+                "Bring a friend bonus",
+            ],
+            discount_percentage=10.0,
+            bonus_multiplier=1.5,
+        ),
+        TierLevel(
+            name="platinum",
+            min_points=15000,
+            max_points=None,
+            color="#E5E4E2",
+            benefits=[
+                "Earn 2 points per €1 spent",
+                "15% discount on all purchases",
+                "Exclusive VIP lounge access",
+                "Complimentary bottle service (monthly)",
+                "Personal concierge",
+                "Free guest list entries",
+            ],
+            discount_percentage=15.0,
+            bonus_multiplier=2.0,
+        ),
+    ]
+
+
+class TierConfigCache:
+    """
+    Process-level cache of compiled tier tables, keyed by venue ID.
+
+    Like the margin ratio cache, each entry remembers the tier_config it was
+    compiled from and is recompiled as soon as the venue presents a different
+    one, so changes made by other workers are picked up the next time the
+    venue is loaded; updates flushed by this process drop the entry eagerly.
+    Venues without a (valid) configuration share the default table.
+    """
+
+    _tables: Dict[object, Tuple[Optional[str], CompiledTiers]] = {}
+    _default: Optional[CompiledTiers] = None
+
+    @staticmethod
+    def default() -> CompiledTiers:
+        """The compiled default tiers (built once)."""
+        if TierConfigCache._default is None:
+            TierConfigCache._default = CompiledTiers(_default_tiers())
+        return TierConfigCache._default
+
+    @staticmethod
+    def compile(tier_config: Optional[str]) -> CompiledTiers:
+        """
+        Compile a venue's tier_config JSON.
+
+        Each tier takes the TierLevel fields plus an optional min_visits.
+        Missing or unparseable configurations compile to the default tiers.
+        """
+        if not tier_config:
+            return TierConfigCache.default()
+        try:
+            tiers = json.loads(tier_config).get("tiers", [])
+            return CompiledTiers(
+                [TierLevel(**tier) for tier in tiers],
+                [tier.get("min_visits", 0) for tier in tiers],
+            )
+        except Exception:
+            return TierConfigCache.default()
+
+    @staticmethod
+    def compile_rows(rows) -> CompiledTiers:
+        """
+        Compile VenueTierConfig rows (one per tier level).
+
+        Args:
+            rows: VenueTierConfig objects of one venue
+        """
+        rows = sorted(rows, key=lambda row: row.tier_level)
+        levels = []
+        for index, row in enumerate(rows):
+            next_points = rows[index + 1].points_required if index + 1 < len(rows) else None
+            levels.append(TierLevel(
+                name=row.tier_name,
+                min_points=int(row.points_required),
+                max_points=int(next_points) - 1 if next_points is not None else None,
+                color=row.tier_color or "",
+                benefits=list(row.perks or []),
+                discount_percentage=float(row.discount_percent),
+                bonus_multiplier=float(row.points_multiplier),
+            ))
+        return CompiledTiers(levels, [row.visits_required for row in rows])
+
+    @staticmethod
+    def get(venue: Venue) -> CompiledTiers:
+        """
+        Compiled tiers of a venue, compiling them if needed.
+
+        Args:
+            venue: Venue object (its tier_config is the cache fingerprint)
+        """
+        entry = TierConfigCache._tables.get(venue.id)
+        if entry is None or entry[0] != venue.tier_config:
+            entry = (venue.tier_config, TierConfigCache.compile(venue.tier_config))
+            TierConfigCache._tables[venue.id] = entry
+        return entry[1]
+
+    @staticmethod
+    def resolve_tier(venue: Venue, points, visits: Optional[int] = None) -> Optional[ResolvedTier]:
+        """Tier a member of the venue has reached (see CompiledTiers.resolve_tier)."""
+        return TierConfigCache.get(venue).resolve_tier(points, visits)
+
+    @staticmethod
+    def invalidate(venue_id=None) -> None:
+        """
+        Drop the compiled tiers of one venue, or of all venues.
+
+        Args:
+            venue_id: Venue to drop (None = clear the whole cache)
+        """
+        if venue_id is None:
+            TierConfigCache._tables.clear()
+        else:
+            TierConfigCache._tables.pop(venue_id, None)
+
+
+@event.listens_for(Venue, "after_update")
+@event.listens_for(Venue, "after_delete")
+def _invalidate_tier_config(mapper, connection, target: Venue) -> None:
+    """Forget a venue's compiled tiers whenever the venue row changes."""
+    TierConfigCache.invalidate(target.id)
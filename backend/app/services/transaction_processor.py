@@ -7,19 +7,29 @@ referral rewards, streak tracking, and database updates.
 from decimal import Decimal
 from datetime import datetime
 from typing import Optional, List, Dict, Tuple
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_
 
+from app.db.pagination import after_key, decode_cursor, estimate_count, key_types, next_cursor, order_by_key
 from app.models.user import User
 from app.models.venue import Venue
 from app.models.transaction import Transaction, TransactionType, TransactionStatus
 from app.models.user_points import UserPoints
 from app.models.product import Product
-from app.schemas.transaction import TransactionCreate
+from app.models.referral import ReferralChain
+from app.schemas.transaction import TransactionCreate, BulkTransactionItem
 from app.services.points_calculator import PointsCalculator
+from app.services.daily_stats import DailyStatsRollup
+from app.services.points_balance import PointsBalance
+from app.services.venue_counters import VenueCounters
+
+
+# Sort key of the transaction history, newest first (column, descending)
+TRANSACTION_HISTORY_ORDER = ((Transaction.created_at, True), (Transaction.id, True))
+TRANSACTION_HISTORY_CURSOR = "transactions"
 
 
 class TransactionProcessor:
@@ -50,7 +60,7 @@ class TransactionProcessor:
         4. UserPoints updates (earn and spend)
         5. Referral reward distribution
         6. Visit streak tracking and milestone bonuses
-        7. Venue statistics updates
+        7. Venue statistics and daily rollup updates
 
         All operations are performed atomically within a database transaction.
 
@@ -109,34 +119,17 @@ class TransactionProcessor:
         db.add(transaction)
         await db.flush()  # Get transaction ID
 
-        # Step 6: Update or create UserPoints for earning
+        # Step 6: Credit earned points (atomic upsert, creates UserPoints on first earn)
         if points_earned > 0:
-            if not user_points:
-                # Get or create UserPoints
-                result = await db.execute(
-                    select(UserPoints).where(
-                        UserPoints.user_id == user.id,
-                        UserPoints.venue_id == venue.id
-                    )
-                )
-                user_points = result.scalar_one_or_none()
-
-                if not user_points:
-                    user_points = UserPoints(
-                        user_id=user.id,
-                        venue_id=venue.id,
-                        points_earned=Decimal("0"),
-                        points_spent=Decimal("0"),
-                        points_available=Decimal("0"),
-                    )
-                    db.add(user_points)
-                    await db.flush()
-
-            # Add earned points
-            user_points.add_points(points_earned)
+            user_points = await PointsBalance.earn(
+                db,
+                user.id,
+                venue.id,
+                points_earned
+            )
 
         # Step 7: Update visit streak and check for milestone bonuses
-        streak_bonus = await TransactionProcessor._update_streak_and_check_milestone(
+        streak_transaction = await TransactionProcessor._update_streak_and_check_milestone(
             db,
             user.id,
             venue.id,
@@ -144,7 +137,7 @@ class TransactionProcessor:
         )
 
         # Step 8: Process referral rewards (5 levels × 25% each)
-        await PointsCalculator.process_referral_rewards(
+        referral_transactions = await PointsCalculator.process_referral_rewards(
             db,
             user.id,
             venue.id,
@@ -160,12 +153,258 @@ class TransactionProcessor:
             points_earned
         )
 
-        # Step 10: Commit and refresh
+        # Step 10: Add every transaction row created above to the daily rollup
+        created_transactions = [transaction, *referral_transactions]
+        if streak_transaction:
+            created_transactions.append(streak_transaction)
+        await DailyStatsRollup.record_transactions(db, created_transactions)
+
+        # Step 11: Commit and refresh
         await db.commit()
         await db.refresh(transaction)
 
         return transaction
 
+    @staticmethod
+    async def create_transactions_bulk(
+        db: AsyncSession,
+        owner: User,
+        items: List[BulkTransactionItem]
+    ) -> List[Dict]:
+        """
+        Process a batch of POS purchases (e.g. an end-of-night tab sync).
+
+        Applies the same business rules as create_transaction, item by item and in
+        submission order, but with a fixed number of round trips:
+        1. Load customers, venues, referral chains, balances and products once for the
+           batch; the customers' balances stay locked until commit
+        2. Validate and compute points in memory (later items see earlier balances)
+        3. Apply every balance change in one multi-row upsert, flush all new rows with
+           multi-row INSERTs and commit once
+
+        Invalid items are reported and skipped; valid items are committed together.
+
+        Args:
+            db: Database session
+            owner: Authenticated venue owner submitting the batch
+            items: Purchases to record, each naming the customer
+
+        Returns:
+            One dict per item, in order, with keys index, client_reference,
+            success, status_code, and either transaction or error
+        """
+        # Step 1: Load everything the batch touches
+        user_ids = {item.user_id for item in items}
+        venue_ids = {item.venue_id for item in items}
+
+        result = await db.execute(select(User.id).where(User.id.in_(user_ids)))
+        known_users = set(result.scalars().all())
+
+        result = await db.execute(select(Venue).where(Venue.id.in_(venue_ids)))
+        venues = {venue.id: venue for venue in result.scalars().all()}
+
+        result = await db.execute(
+            select(ReferralChain).where(ReferralChain.user_id.in_(user_ids))
+        )
+        chains = {chain.user_id: chain for chain in result.scalars().all()}
+
+        # Customers' balances, locked until commit so spends checked against them in
+        # memory cannot be undercut by a concurrent purchase. Key order keeps
+        # concurrent batches from deadlocking.
+        pairs = [(user_id, venue_id) for user_id in user_ids for venue_id in venue_ids]
+        result = await db.execute(
+            select(UserPoints)
+            .where(tuple_(UserPoints.user_id, UserPoints.venue_id).in_(pairs))
+            .order_by(UserPoints.user_id, UserPoints.venue_id)
+            .with_for_update()
+        )
+        balances = {(up.user_id, up.venue_id): up for up in result.scalars().all()}
+
+        # Every product referenced anywhere in the batch, for per-item bonuses
+        products = await PointsCalculator.fetch_products(
+            db,
+            (
+                order_item.product_id
+                for item in items
+                for order_item in (item.order_items or [])
+            )
+        )
+
+        # Step 2: Apply business rules in memory
+        results: List[Dict] = []
+        created_transactions: List[Transaction] = []
+        venue_totals: Dict[UUID, Tuple[Decimal, Decimal]] = {}
+        # Net (points earned, points spent) per (user_id, venue_id), written in step 3
+        changes: Dict[Tuple[UUID, UUID], Tuple[Decimal, Decimal]] = {}
+        first_visits = set()
+
+        def change(key: Tuple[UUID, UUID], earned: Decimal = Decimal("0"), spent: Decimal = Decimal("0")) -> None:
+            earned_before, spent_before = changes.get(key, (Decimal("0"), Decimal("0")))
+            changes[key] = (earned_before + earned, spent_before + spent)
+
+        def available(key: Tuple[UUID, UUID]) -> Decimal:
+            user_points = balances.get(key)
+            earned, spent = changes.get(key, (Decimal("0"), Decimal("0")))
+            return (user_points.points_available if user_points else Decimal("0")) + earned - spent
+
+        for index, item in enumerate(items):
+            outcome = {
+                "index": index,
+                "client_reference": item.client_reference,
+                "success": False,
+                "status_code": status.HTTP_201_CREATED,
+                "transaction": None,
+                "error": None,
+            }
+            results.append(outcome)
+
+            try:
+                venue = TransactionProcessor._check_bulk_item(item, venues, known_users, owner)
+                TransactionProcessor._validate_amounts(item)
+            except HTTPException as e:
+                outcome["status_code"] = e.status_code
+                outcome["error"] = e.detail
+                continue
+
+            amount_cash = Decimal(str(item.amount_cash))
+            amount_points = Decimal(str(item.amount_points))
+
+            key = (item.user_id, venue.id)
+            if amount_points > 0:
+                # Locked balance plus this batch's earlier changes: the current balance
+                balance = available(key)
+                if balance < amount_points:
+                    outcome["status_code"] = status.HTTP_400_BAD_REQUEST
+                    outcome["error"] = (
+                        f"Insufficient points at this venue. Available: {balance:.2f}, "
+                        f"Required: {amount_points:.2f}"
+                    )
+                    continue
+                change(key, spent=amount_points)
+
+            points_earned = Decimal("0.00")
+            if amount_cash > 0:
+                points_earned = PointsCalculator.calculate_order_points(
+                    amount_cash,
+                    venue,
+                    TransactionProcessor._order_items_as_dicts(item.order_items),
+                    products
+                )
+
+            transaction = Transaction(
+                id=uuid4(),  # Assigned up front so referral rows can reference it
+                user_id=item.user_id,
+                venue_id=venue.id,
+                transaction_type=TransactionType.PURCHASE,
+                status=TransactionStatus.COMPLETED,
+                amount_total=item.amount_total,
+                amount_cash=amount_cash,
+                amount_points=amount_points,
+                points_earned=points_earned,
+                points_spent=amount_points,
+                payment_method=item.payment_method,
+                order_items=TransactionProcessor._serialize_order_items(item.order_items),
+                description="Purchase transaction",
+            )
+            created_transactions.append(transaction)
+
+            if points_earned > 0:
+                change(key, earned=points_earned)
+
+            user_points = balances.get(key)
+            if user_points:
+                bonus_points = user_points.update_streak(award_bonus=False)
+                if bonus_points > 0:
+                    change(key, earned=Decimal(bonus_points))
+                    created_transactions.append(Transaction(
+                        user_id=item.user_id,
+                        venue_id=venue.id,
+                        transaction_type=TransactionType.STREAK_BONUS,
+                        status=TransactionStatus.COMPLETED,
+                        amount_total=Decimal("0"),
+                        amount_cash=Decimal("0"),
+                        amount_points=Decimal("0"),
+                        points_earned=bonus_points,
+                        points_spent=Decimal("0"),
+                        description=f"Streak milestone bonus - {user_points.current_streak} day streak!",
+                    ))
+            elif points_earned > 0:
+                # The upsert below creates the row; its streak starts there
+                first_visits.add(key)
+
+            chain = chains.get(item.user_id)
+            if chain:
+                credits, rows = PointsCalculator.referral_rewards(chain, venue.id, points_earned, transaction.id)
+                for referrer_id, amount in credits.items():
+                    change((referrer_id, venue.id), earned=amount)
+                created_transactions.extend(Transaction(**row) for row in rows)
+
+            revenue, points_issued = venue_totals.get(venue.id, (Decimal("0"), Decimal("0")))
+            venue_totals[venue.id] = (revenue + amount_cash, points_issued + points_earned)
+
+            outcome["success"] = True
+            outcome["transaction"] = transaction
+
+        if not created_transactions:
+            await db.rollback()  # Release the balance locks
+            return results
+
+        # Step 3: Write everything in one database transaction. Streak fields and
+        # chain earnings go first: the balance upsert refreshes the loaded rows.
+        await db.flush()
+        written = await PointsBalance.apply_many(db, changes)
+        for key in first_visits:
+            # A first visit starts the streak and never reaches a milestone
+            written[key].update_streak(award_bonus=False)
+
+        await VenueCounters.record_many(db, venue_totals)
+
+        # Rows of one table share a column set, so the flush batches them into
+        # multi-row INSERT statements rather than one round trip per row
+        db.add_all(created_transactions)
+        await db.flush()
+
+        await DailyStatsRollup.record_transactions(db, created_transactions)
+        await db.commit()
+
+        return results
+
+    @staticmethod
+    def _check_bulk_item(
+        item: BulkTransactionItem,
+        venues: Dict[UUID, Venue],
+        known_users: set,
+        owner: User
+    ) -> Venue:
+        """Validate a bulk item against the preloaded venues and customers."""
+        venue = venues.get(item.venue_id)
+
+        if not venue:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Venue with ID {item.venue_id} not found"
+            )
+
+        if venue.owner_id != owner.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have permission to manage this venue"
+            )
+
+        if not venue.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This venue is not currently active"
+            )
+
+        if item.user_id not in known_users:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User with ID {item.user_id} not found"
+            )
+
+        return venue
+
     @staticmethod
     async def _get_venue(db: AsyncSession, venue_id: UUID) -> Venue:
         """Fetch and validate venue exists."""
@@ -218,28 +457,23 @@ class TransactionProcessor:
         Validate user has sufficient points and deduct them.
 
         Critical business rule: Points can ONLY be spent at the venue where they were earned.
+
+        The deduction is a single guarded UPDATE, so concurrent purchases cannot
+        overspend; the balance is only read back to explain a rejection.
         """
-        result = await db.execute(
-            select(UserPoints).where(
-                UserPoints.user_id == user_id,
-                UserPoints.venue_id == venue_id
-            )
-        )
-        user_points = result.scalar_one_or_none()
+        user_points = await PointsBalance.spend(db, user_id, venue_id, amount_points)
 
-        if not user_points or user_points.points_available < amount_points:
-            available = user_points.points_available if user_points else Decimal("0")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient points at this venue. Available: {available:.2f}, Required: {amount_points:.2f}"
+        if not user_points:
+            result = await db.execute(
+                select(UserPoints.points_available).where(
+                    UserPoints.user_id == user_id,
+                    UserPoints.venue_id == venue_id
+                )
             )
-
-        # Spend the points
-        success = user_points.spend_points(amount_points)
-        if not success:
+            available = result.scalar_one_or_none() or Decimal("0")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to deduct points"
+                detail=f"Insufficient points at this venue. Available: {available:.2f}, Required: {amount_points:.2f}"
             )
 
         return user_points
@@ -260,39 +494,52 @@ class TransactionProcessor:
         if amount_cash <= 0:
             return Decimal("0.00")
 
-        # Convert order items to dict format if needed
-        items_dict = None
-        if order_items:
-            items_dict = [
-                {
-                    "product_id": item.product_id if hasattr(item, 'product_id') else None,
-                    "price": item.price if hasattr(item, 'price') else 0,
-                    "quantity": item.quantity if hasattr(item, 'quantity') else 1,
-                    "category": item.category if hasattr(item, 'category') else None,
-                }
-                for item in order_items
-            ]
+        items_dict = TransactionProcessor._order_items_as_dicts(order_items)
+
+        # One query for every product in the order, so bonuses apply per line item
+        products = None
+        if items_dict:
+            products = await PointsCalculator.fetch_products(
+                db,
+                (item["product_id"] for item in items_dict)
+            )
 
         points_earned = PointsCalculator.calculate_order_points(
             amount_cash,
             venue,
             items_dict,
-            db
+            products
         )
 
         return points_earned
 
+    @staticmethod
+    def _order_items_as_dicts(order_items: Optional[List]) -> Optional[List[Dict]]:
+        """Convert order items to the dict format PointsCalculator expects."""
+        if not order_items:
+            return None
+
+        return [
+            {
+                "product_id": item.product_id if hasattr(item, 'product_id') else None,
+                "price": item.price if hasattr(item, 'price') else 0,
+                "quantity": item.quantity if hasattr(item, 'quantity') else 1,
+                "category": item.category if hasattr(item, 'category') else None,
+            }
+            for item in order_items
+        ]
+
     @staticmethod
     async def _update_streak_and_check_milestone(
         db: AsyncSession,
         user_id: UUID,
         venue_id: UUID,
         user_points: Optional[UserPoints]
-    ) -> Decimal:
+    ) -> Optional[Transaction]:
         """
         Update visit streak and create bonus transaction if milestone reached.
 
-        Returns the bonus points awarded (if any).
+        Returns the STREAK_BONUS transaction (if a milestone was reached).
         """
         if not user_points:
             # Get UserPoints
@@ -306,13 +553,17 @@ class TransactionProcessor:
 
         if not user_points:
             # No points record yet, will be created when points are earned
-            return Decimal("0.00")
+            return None
 
         # Update streak (returns bonus points if milestone reached)
-        bonus_points = user_points.update_streak()
+        bonus_points = user_points.update_streak(award_bonus=False)
 
-        # If milestone bonus was awarded, create transaction
+        # If milestone bonus was awarded, credit it atomically and create transaction
+        streak_transaction = None
         if bonus_points > 0:
+            # Write the streak fields first; the upsert refreshes the loaded row
+            await db.flush()
+            await PointsBalance.earn(db, user_id, venue_id, Decimal(bonus_points))
             streak_transaction = Transaction(
                 user_id=user_id,
                 venue_id=venue_id,
@@ -327,7 +578,7 @@ class TransactionProcessor:
             )
             db.add(streak_transaction)
 
-        return bonus_points
+        return streak_transaction
 
     @staticmethod
     async def _update_venue_stats(
@@ -336,9 +587,13 @@ class TransactionProcessor:
         amount_cash: Decimal,
         points_issued: Decimal
     ) -> None:
-        """Update venue statistics."""
-        venue.total_revenue = (venue.total_revenue or Decimal("0")) + amount_cash
-        venue.total_points_issued = (venue.total_points_issued or Decimal("0")) + points_issued
+        """
+        Update venue statistics.
+
+        Appends a delta rather than updating the venue row, so concurrent
+        purchases at one venue don't serialize on it (see VenueCounters).
+        """
+        await VenueCounters.record(db, venue.id, amount_cash, points_issued)
 
     @staticmethod
     def _serialize_order_items(order_items: Optional[List]) -> Optional[List[Dict]]:
@@ -365,21 +620,30 @@ class TransactionProcessor:
         venue_id: Optional[UUID] = None,
         transaction_type: Optional[TransactionType] = None,
         limit: int = 20,
-        offset: int = 0
-    ) -> Tuple[List[Transaction], int]:
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        estimate_total: bool = False
+    ) -> Tuple[List[Transaction], Optional[int]]:
         """
         Get user's transaction history with optional filters.
 
+        Offset pages come with an exact total (a count over every matching
+        row). Cursor pages skip the count; ask for estimate_total for a cheap
+        approximate one instead.
+
         Args:
             db: Database session
             user_id: User ID
             venue_id: Optional filter by venue
             transaction_type: Optional filter by type
             limit: Number of results per page
-            offset: Offset for pagination
+            offset: Offset for pagination (ignored with a cursor)
+            cursor: next_transactions_cursor() of the previous page
+            estimate_total: Return an estimated instead of an exact total
 
         Returns:
-            Tuple of (transactions list, total count)
+            Tuple of (transactions list, total count or None in cursor mode
+            without estimate_total)
         """
         # Build query
         query = select(Transaction).where(Transaction.user_id == user_id)
@@ -390,15 +654,30 @@ class TransactionProcessor:
         if transaction_type:
             query = query.where(Transaction.transaction_type == transaction_type)
 
-        # Get total count
-        from sqlalchemy import func
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        total = None
+        if estimate_total:
+            total = await estimate_count(db, query)
+        elif not cursor:
+            count_query = select(func.count()).select_from(query.subquery())
+            total_result = await db.execute(count_query)
+            total = total_result.scalar() or 0
 
         # Get paginated results
-        query = query.order_by(Transaction.created_at.desc()).limit(limit).offset(offset)
+        query = query.order_by(*order_by_key(TRANSACTION_HISTORY_ORDER)).limit(limit)
+        if cursor:
+            values = decode_cursor(cursor, TRANSACTION_HISTORY_CURSOR, key_types(TRANSACTION_HISTORY_ORDER))
+            query = query.where(after_key(TRANSACTION_HISTORY_ORDER, values))
+        else:
+            query = query.offset(offset)
         result = await db.execute(query)
         transactions = result.scalars().all()
 
-        return list(transactions), total or 0
+        return list(transactions), total
+
+    @staticmethod
+    def next_transactions_cursor(transactions: List[Transaction], limit: int) -> Optional[str]:
+        """Cursor for the get_user_transactions page after transactions, or None on the last page."""
+        return next_cursor(
+            TRANSACTION_HISTORY_CURSOR, transactions, limit,
+            lambda transaction: (transaction.created_at, transaction.id),
+        )
@@ -20,6 +20,7 @@ from app.schemas.user import (
     ExpiringPointsDetail,
 )
 from app.core.config import settings
+from app.services.tier_config_cache import TierConfigCache
 
 
 class UserService:
@@ -85,14 +86,17 @@ class UserService:
         total_points = 0
 
         for membership, venue in memberships_venues:
+            # Tier from the venue's compiled thresholds; the stored
+            # current_tier/tier_progress are not kept up to date
+            resolved = TierConfigCache.resolve_tier(venue, membership.total_points, membership.total_visits)
             venue_breakdowns.append(
                 VenuePointsBreakdown(
                     venue_id=venue.id,
                     venue_name=venue.name,
                     venue_logo_url=venue.logo_url,
                     total_points=membership.total_points,
-                    current_tier=membership.current_tier,
-                    tier_progress=membership.tier_progress,
+                    current_tier=resolved.tier.name if resolved else membership.current_tier,
+                    tier_progress=resolved.progress if resolved else membership.tier_progress,
                     last_visit_at=membership.last_visit_at,
                 )
             )
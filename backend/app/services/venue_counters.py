@@ -0,0 +1,214 @@
+"""
+Contention-free venue counters.
+Purchases append deltas instead of updating the venue row; a periodic
+compactor (started with the API, or compact_venue_counters.py) folds them
+into venues.total_revenue and venues.total_points_issued.
+"""
+
+import asyncio
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import bindparam, select, insert, update, delete, func
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.venue import Venue
+from app.models.venue_stat_delta import VenueStatDelta
+
+
+class VenueCounters:
+    """
+    Service for venue revenue and points-issued totals.
+
+    Handles:
+    - Recording purchase deltas (plain INSERTs, no row lock on the venue)
+    - Compacting deltas into the venue totals
+    - Reading totals as stored total + pending deltas
+    """
+
+    @staticmethod
+    async def record(
+        db: AsyncSession,
+        venue_id: UUID,
+        revenue: Decimal,
+        points_issued: Decimal
+    ) -> None:
+        """
+        Append one delta for a venue without committing.
+
+        Args:
+            db: Database session (the purchase's transaction)
+            venue_id: Venue the purchase was made at
+            revenue: Cash revenue to add
+            points_issued: Points issued to add
+        """
+        await VenueCounters.record_many(db, {venue_id: (revenue, points_issued)})
+
+    @staticmethod
+    async def record_many(
+        db: AsyncSession,
+        deltas: Dict[UUID, Tuple[Decimal, Decimal]]
+    ) -> None:
+        """
+        Append deltas for several venues in one multi-row INSERT, without committing.
+
+        Args:
+            db: Database session
+            deltas: Mapping of venue ID to (revenue, points_issued)
+        """
+        if not deltas:
+            return
+
+        await db.execute(
+            insert(VenueStatDelta),
+            [
+                {"venue_id": UUID(str(venue_id)), "revenue": revenue, "points_issued": points_issued}
+                for venue_id, (revenue, points_issued) in deltas.items()
+            ]
+        )
+
+    @staticmethod
+    async def compact(db: AsyncSession) -> int:
+        """
+        Fold all pending deltas into the venue totals and commit.
+
+        DELETE ... RETURNING hands back exactly the deltas it removed, and their
+        per-venue sums are added to the venue rows in the same transaction, so
+        a delta is never counted twice or lost. Purchases keep appending new
+        deltas while this runs; they are picked up next time. A concurrent
+        compactor blocks on the rows being deleted and then skips them.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of venues updated
+        """
+        result = await db.execute(
+            delete(VenueStatDelta)
+            .returning(VenueStatDelta.venue_id, VenueStatDelta.revenue, VenueStatDelta.points_issued)
+        )
+
+        sums: Dict[UUID, List[Decimal]] = {}
+        for venue_id, revenue, points_issued in result.all():
+            venue_sums = sums.setdefault(venue_id, [Decimal("0"), Decimal("0")])
+            venue_sums[0] += revenue
+            venue_sums[1] += points_issued
+
+        if sums:
+            venues = Venue.__table__
+            await db.execute(
+                update(venues)
+                .where(venues.c.id == bindparam("b_venue_id"))
+                .values(
+                    total_revenue=func.coalesce(venues.c.total_revenue, 0) + bindparam("b_revenue"),
+                    total_points_issued=func.coalesce(venues.c.total_points_issued, 0) + bindparam("b_points"),
+                ),
+                [
+                    {"b_venue_id": str(venue_id), "b_revenue": revenue, "b_points": points_issued}
+                    for venue_id, (revenue, points_issued) in sums.items()
+                ]
+            )
+        await db.commit()
+
+        return len(sums)
+
+    @staticmethod
+    async def run_compactor(
+        session_factory: async_sessionmaker,
+        interval_seconds: float = 60.0
+    ) -> None:
+        """
+        Compact forever, every interval_seconds. Errors are logged and retried next round.
+
+        Args:
+            session_factory: Factory for a fresh session per round
+            interval_seconds: Delay between rounds
+        """
+        while True:
+            try:
+                async with session_factory() as db:
+                    venues = await VenueCounters.compact(db)
+                if venues:
+                    print(f"Compacted venue counters for {venues} venue(s)")
+            except Exception as e:
+                print(f"Venue counter compaction error: {e}")
+
+            await asyncio.sleep(interval_seconds)
+
+    @staticmethod
+    async def get_totals(
+        db: AsyncSession,
+        venue_ids: Iterable[UUID]
+    ) -> Dict[UUID, Dict[str, Decimal]]:
+        """
+        Current totals per venue: compacted total plus deltas not yet compacted.
+
+        Args:
+            db: Database session
+            venue_ids: Venues to read
+
+        Returns:
+            Mapping of venue ID to {"total_revenue", "total_points_issued"}
+        """
+        venue_ids = [UUID(str(venue_id)) for venue_id in venue_ids]
+        pending_result = await db.execute(
+            select(
+                VenueStatDelta.venue_id,
+                func.sum(VenueStatDelta.revenue).label("revenue"),
+                func.sum(VenueStatDelta.points_issued).label("points_issued"),
+            )
+            .where(VenueStatDelta.venue_id.in_(venue_ids))
+            .group_by(VenueStatDelta.venue_id)
+        )
+        pending = {row.venue_id: row for row in pending_result.all()}
+
+        stored = await db.execute(
+            select(Venue.id, Venue.total_revenue, Venue.total_points_issued)
+            .where(Venue.id.in_([str(venue_id) for venue_id in venue_ids]))
+        )
+
+        totals = {}
+        for row in stored.all():
+            venue_id = UUID(str(row.id))
+            venue_pending = pending.get(venue_id)
+            totals[venue_id] = {
+                "total_revenue": Decimal(str(row.total_revenue or 0))
+                + Decimal(str(venue_pending.revenue if venue_pending else 0)),
+                "total_points_issued": Decimal(str(row.total_points_issued or 0))
+                + Decimal(str(venue_pending.points_issued if venue_pending else 0)),
+            }
+        return totals
+
+
+class VenueCounterCompactor:
+    """Background compaction in an API process (see VenueCounters.run_compactor)."""
+
+    def __init__(self, session_factory: async_sessionmaker, interval_seconds: float):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Run the compactor in the background on the current event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                VenueCounters.run_compactor(self.session_factory, self.interval_seconds)
+            )
+
+    async def stop(self) -> None:
+        """Stop the background compactor."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Started by the API on startup (VENUE_COUNTER_COMPACTOR)
+venue_counter_compactor = VenueCounterCompactor(AsyncSessionLocal, settings.VENUE_COUNTER_COMPACT_SECONDS)
@@ -0,0 +1,463 @@
+"""
+In-memory spatial index over active venue coordinates.
+Answers "venues within r km" and "k nearest venues" for the venue list
+without loading and measuring every venue on each request, and gives the
+list a global distance order so pagination stays correct across pages.
+"""
+
+import asyncio
+import heapq
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.venue import Venue
+
+
+EARTH_RADIUS_KM = 6371  # Same radius as calculate_distance
+
+# Largest difference between haversine_km_batch and calculate_distance
+# (float64 rounding; the worst seen over 200k random points is ~3e-10 km)
+DISTANCE_TOLERANCE_KM = 1e-9
+
+# nearest() scans every venue in one batch instead of walking the tree
+# once k exceeds 1/FULL_SCAN_FRACTION of the index (deep pages, tiny catalogs)
+FULL_SCAN_FRACTION = 4
+
+# (venue_id, latitude, longitude, type, has_events)
+IndexedVenue = Tuple[str, float, float, str, bool]
+VenueFilter = Callable[[IndexedVenue], bool]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine distance in km (same formula as calculate_distance in the venue routes)."""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+
+    a = (
+        math.sin(delta_lat / 2) ** 2
+        + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2
+    )
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_km_batch(latitude: float, longitude: float, latitudes, longitudes, cos_latitudes=None):
+    """
+    Haversine distances in km from one point to many, in one array operation.
+
+    Same formula and radius as haversine_km / calculate_distance, evaluated in
+    float64: results agree with the scalar version to within
+    DISTANCE_TOLERANCE_KM.
+
+    Args:
+        latitude: Origin latitude (degrees)
+        longitude: Origin longitude (degrees)
+        latitudes: Array of target latitudes (radians)
+        longitudes: Array of target longitudes (radians)
+        cos_latitudes: cos(latitudes), if already cached
+
+    Returns:
+        numpy array of distances in km
+    """
+    import numpy as np  # Imported on first use (keeps numpy out of startup)
+
+    origin_lat = math.radians(latitude)
+    origin_lng = math.radians(longitude)
+    if cos_latitudes is None:
+        cos_latitudes = np.cos(latitudes)
+
+    a = (
+        np.sin((latitudes - origin_lat) / 2) ** 2
+        + math.cos(origin_lat) * cos_latitudes * np.sin((longitudes - origin_lng) / 2) ** 2
+    )
+    a = np.clip(a, 0.0, 1.0)
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def coordinate_arrays(coordinates: Iterable[Tuple[float, float]]):
+    """(latitudes, longitudes, cos_latitudes) arrays in radians for haversine_km_batch."""
+    import numpy as np
+
+    degrees = np.array(list(coordinates), dtype=np.float64).reshape(-1, 2)
+    latitudes = np.radians(degrees[:, 0])
+    longitudes = np.radians(degrees[:, 1])
+    return latitudes, longitudes, np.cos(latitudes)
+
+
+def _unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    lat = math.radians(latitude)
+    lng = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lng), cos_lat * math.sin(lng), math.sin(lat))
+
+
+def km_to_chord_squared(distance_km: float) -> float:
+    """Squared unit-sphere chord length spanning a great-circle distance in km."""
+    angle = min(math.pi, distance_km / EARTH_RADIUS_KM)
+    return (2 * math.sin(angle / 2)) ** 2
+
+
+class _IndexSnapshot:
+    """
+    One built index: venues, their unit vectors and coordinate arrays, and the
+    tree over them. Never modified after construction, so a query that holds a
+    snapshot sees positions, nodes and coordinates that belong together.
+    """
+
+    __slots__ = ("venues", "points", "coordinates", "nodes", "built_at")
+
+    def __init__(self, venues, points, coordinates, nodes, built_at):
+        self.venues: List[IndexedVenue] = venues
+        self.points: List[Tuple[float, float, float]] = points
+        self.coordinates = coordinates  # (latitudes, longitudes, cos_latitudes) arrays
+        # Internal node: (axis, split, left, right); leaf: (-1, venue positions)
+        self.nodes: List[tuple] = nodes
+        self.built_at: Optional[float] = built_at
+
+    def distances_km(self, latitude: float, longitude: float, positions: Optional[List[int]] = None):
+        """Haversine distances from a point to venues of this snapshot (see VenueSpatialIndex.distances_km)."""
+        latitudes, longitudes, cos_latitudes = self.coordinates
+        if positions is not None:
+            latitudes = latitudes[positions]
+            longitudes = longitudes[positions]
+            cos_latitudes = cos_latitudes[positions]
+        return haversine_km_batch(latitude, longitude, latitudes, longitudes, cos_latitudes)
+
+
+_EMPTY_SNAPSHOT = _IndexSnapshot([], [], None, [], None)
+
+
+class VenueSpatialIndex:
+    """
+    KD-tree over venues as 3D points on the unit sphere.
+
+    Straight-line (chord) distance between unit vectors grows monotonically
+    with great-circle distance, so nearest-by-chord is nearest-by-Haversine
+    with no special cases at the poles or the antimeridian. Reported
+    distances come from haversine_km_batch over coordinate arrays cached at
+    build time.
+
+    Each build produces an immutable _IndexSnapshot that replaces the previous
+    one in a single assignment. Queries read the snapshot reference once, so a
+    rebuild finishing on another thread never mixes old and new venues within
+    one query. The index is marked stale when this process inserts, updates
+    or deletes a venue (at flush and again at commit), and rebuilt from the database after
+    VENUE_INDEX_TTL_SECONDS regardless, which bounds how long changes made by
+    other workers take to show up.
+    """
+
+    def __init__(self, leaf_size: int = 16, ttl_seconds: float = settings.VENUE_INDEX_TTL_SECONDS):
+        self.leaf_size = leaf_size
+        self.ttl_seconds = ttl_seconds
+        self._snapshot = _EMPTY_SNAPSHOT
+        self._stale = True
+        self._generation = 0  # Bumped on every invalidation
+        self._lock = asyncio.Lock()
+        self.rebuilds = 0
+
+    def __len__(self) -> int:
+        return len(self._snapshot.venues)
+
+    def build(self, venues: Iterable[IndexedVenue]) -> None:
+        """
+        Replace the index contents.
+
+        Args:
+            venues: (venue_id, latitude, longitude, type, has_events) tuples
+        """
+        venue_list = [venue for venue in venues if venue[1] is not None and venue[2] is not None]
+        points = [_unit_vector(venue[1], venue[2]) for venue in venue_list]
+        coordinates = coordinate_arrays((venue[1], venue[2]) for venue in venue_list)
+        nodes: List[tuple] = []
+        if venue_list:
+            axes = [[point[axis] for point in points] for axis in range(3)]
+            self._build_node(list(range(len(venue_list))), axes, nodes)
+
+        # One reference swap publishes the whole index
+        self._snapshot = _IndexSnapshot(venue_list, points, coordinates, nodes, time.monotonic())
+        self._stale = False
+        self.rebuilds += 1
+
+    def _build_node(self, positions: List[int], axes: List[List[float]], nodes: List[tuple]) -> int:
+        node_id = len(nodes)
+        if len(positions) <= self.leaf_size:
+            nodes.append((-1, positions))
+            return node_id
+
+        # Split on the axis with the widest spread, at the median
+        spreads = []
+        for coordinates in axes:
+            values = list(map(coordinates.__getitem__, positions))
+            spreads.append(max(values) - min(values))
+        axis = spreads.index(max(spreads))
+        coordinates = axes[axis]
+        positions.sort(key=coordinates.__getitem__)
+        middle = len(positions) // 2
+
+        nodes.append(None)  # Placeholder until the children have ids
+        left = self._build_node(positions[:middle], axes, nodes)
+        right = self._build_node(positions[middle:], axes, nodes)
+        nodes[node_id] = (axis, coordinates[positions[middle]], left, right)
+        return node_id
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        max_distance_km: Optional[float] = None,
+        venue_filter: Optional[VenueFilter] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        The k venues closest to a point, nearest first.
+
+        Args:
+            latitude: Query latitude
+            longitude: Query longitude
+            k: Number of venues to return
+            max_distance_km: Ignore venues farther than this
+            venue_filter: Only consider venues for which this returns True
+
+        Returns:
+            (venue_id, distance_km) pairs ordered by distance, then venue ID
+        """
+        snapshot = self._snapshot
+        if k <= 0 or not snapshot.nodes:
+            return []
+        if k * FULL_SCAN_FRACTION >= len(snapshot.venues):
+            return self._nearest_by_scan(snapshot, latitude, longitude, k, max_distance_km, venue_filter)
+
+        query = _unit_vector(latitude, longitude)
+        limit = km_to_chord_squared(max_distance_km) if max_distance_km is not None else math.inf
+        best: List[Tuple[float, str, int]] = []  # Max-heap of (-chord², -id order, position)
+        venues, points, nodes = snapshot.venues, snapshot.points, snapshot.nodes
+
+        def bound() -> float:
+            return -best[0][0] if len(best) >= k else limit
+
+        def visit(node_id: int) -> None:
+            node = nodes[node_id]
+            if node[0] == -1:
+                for position in node[1]:
+                    point = points[position]
+                    d2 = (
+                        (point[0] - query[0]) ** 2
+                        + (point[1] - query[1]) ** 2
+                        + (point[2] - query[2]) ** 2
+                    )
+                    if d2 > bound():
+                        continue
+                    venue = venues[position]
+                    if venue_filter is not None and not venue_filter(venue):
+                        continue
+                    entry = (-d2, _Descending(venue[0]), position)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+                return
+
+            axis, split, left, right = node
+            offset = query[axis] - split
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if offset * offset <= bound():
+                visit(far)
+
+        visit(0)
+        positions = [position for _, _, position in sorted(best, reverse=True)]
+        distances = snapshot.distances_km(latitude, longitude, positions).tolist()
+        return [(venues[position][0], distance) for position, distance in zip(positions, distances)]
+
+    @staticmethod
+    def _nearest_by_scan(snapshot, latitude, longitude, k, max_distance_km, venue_filter) -> List[Tuple[str, float]]:
+        """nearest() for a k close to the index size: one batch over every venue."""
+        import numpy as np
+
+        venues = snapshot.venues
+        distances = snapshot.distances_km(latitude, longitude)
+        candidates = np.arange(len(distances))
+        if max_distance_km is not None:
+            candidates = candidates[distances <= max_distance_km]
+        if venue_filter is not None:
+            candidates = np.array(
+                [position for position in candidates.tolist() if venue_filter(venues[position])],
+                dtype=np.intp,
+            )
+        if len(candidates) > k:
+            # Keep everything up to the k-th distance (ties included), then sort those
+            kth = np.partition(distances[candidates], k - 1)[k - 1]
+            candidates = candidates[distances[candidates] <= kth]
+
+        found = sorted(
+            (distance, venues[position][0])
+            for position, distance in zip(candidates.tolist(), distances[candidates].tolist())
+        )
+        return [(venue_id, distance) for distance, venue_id in found[:k]]
+
+    def within(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        venue_filter: Optional[VenueFilter] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        All venues within radius_km of a point, nearest first.
+
+        The tree narrows the search to the leaves the radius can reach; the
+        distances of all their venues are then computed in one batch.
+
+        Returns:
+            (venue_id, distance_km) pairs ordered by distance, then venue ID
+        """
+        snapshot = self._snapshot
+        if not snapshot.nodes:
+            return []
+
+        query = _unit_vector(latitude, longitude)
+        limit = km_to_chord_squared(radius_km)
+        candidates: List[int] = []
+        nodes = snapshot.nodes
+        stack = [0]
+        while stack:
+            node = nodes[stack.pop()]
+            if node[0] == -1:
+                candidates.extend(node[1])
+                continue
+
+            axis, split, left, right = node
+            offset = query[axis] - split
+            near, far = (left, right) if offset < 0 else (right, left)
+            stack.append(near)
+            if offset * offset <= limit:
+                stack.append(far)
+
+        distances = snapshot.distances_km(latitude, longitude, candidates)
+        venues = snapshot.venues
+        found = [
+            (distance, venues[position][0])
+            for position, distance in zip(candidates, distances.tolist())
+            if distance <= radius_km and (venue_filter is None or venue_filter(venues[position]))
+        ]
+        found.sort()
+        return [(venue_id, distance) for distance, venue_id in found]
+
+    def distances_km(self, latitude: float, longitude: float, positions: Optional[List[int]] = None):
+        """
+        Haversine distances from a point to indexed venues, from the cached arrays.
+
+        Args:
+            latitude: Origin latitude
+            longitude: Origin longitude
+            positions: Venue positions in the index (None = all venues)
+
+        Returns:
+            numpy array of distances in km, in positions order
+        """
+        return self._snapshot.distances_km(latitude, longitude, positions)
+
+    def invalidate(self) -> None:
+        """Rebuild from the database on the next ensure()."""
+        self._stale = True
+        self._generation += 1
+
+    def is_fresh(self) -> bool:
+        built_at = self._snapshot.built_at
+        return (
+            not self._stale
+            and built_at is not None
+            and time.monotonic() - built_at < self.ttl_seconds
+        )
+
+    async def ensure(self, db: AsyncSession) -> "VenueSpatialIndex":
+        """
+        Rebuild the index from the active venues if it is stale or expired.
+
+        Concurrent callers wait for a single rebuild.
+        """
+        if self.is_fresh():
+            return self
+        async with self._lock:
+            if not self.is_fresh():
+                await self.refresh(db)
+        return self
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Load the active venues' coordinates and rebuild the tree."""
+        generation = self._generation
+        result = await db.execute(
+            select(Venue.id, Venue.latitude, Venue.longitude, Venue.type, Venue.has_events)
+            .where(Venue.is_active == True)
+        )
+        rows = [tuple(row) for row in result.all()]
+        # ~1 s at 100k venues: build off the event loop
+        await asyncio.to_thread(self.build, rows)
+        if self._generation != generation:
+            self._stale = True  # A venue changed while loading
+
+    def stats(self) -> Dict[str, object]:
+        snapshot = self._snapshot
+        return {
+            "venues": len(snapshot.venues),
+            "nodes": len(snapshot.nodes),
+            "rebuilds": self.rebuilds,
+            "fresh": self.is_fresh(),
+        }
+
+
+class _Descending:
+    """Reverses string order, so the max-heap evicts the larger ID on distance ties."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return self.value > other.value
+
+    def __gt__(self, other: "_Descending") -> bool:
+        return self.value < other.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+
+# Shared by all requests in the process
+venue_index = VenueSpatialIndex()
+
+# Session.info flag: venues changed in the current transaction
+_VENUES_CHANGED = "venue_index_venues_changed"
+
+
+@event.listens_for(Venue, "after_insert")
+@event.listens_for(Venue, "after_update")
+@event.listens_for(Venue, "after_delete")
+def _invalidate_venue_index(mapper, connection, target: Venue) -> None:
+    """Rebuild the index after this process changes any venue."""
+    venue_index.invalidate()
+    # Flush runs before commit: a rebuild meanwhile still loads the old venues
+    session = inspect(target).session
+    if session is not None:
+        session.info[_VENUES_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_venue_index_on_commit(session: Session) -> None:
+    """Rebuild again once the venue changes are visible to other sessions."""
+    if session.info.pop(_VENUES_CHANGED, False):
+        venue_index.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_venues(session: Session) -> None:
+    """Rolled back venue changes never become visible; nothing to rebuild."""
+    session.info.pop(_VENUES_CHANGED, None)
@@ -5,11 +5,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 from typing import Optional, List, Tuple
 from fastapi import HTTPException
-import json
 
 from app.models.venue import Venue
 from app.models.product import Product
-from app.schemas.venue import TierConfig, TierLevel
+from app.schemas.venue import TierConfig
+from app.services.tier_config_cache import TierConfigCache
+from app.services.venue_index import venue_index
 
 
 class VenueService:
@@ -47,11 +48,57 @@ class VenueService:
         result = await self.db.execute(query)
         venues = result.scalars().all()
 
-        # Note: Distance calculation is done in the endpoint using geopy
-        # because it requires user location
-
         return list(venues)
 
+    async def list_nearby_venues(
+        self,
+        latitude: float,
+        longitude: float,
+        venue_type: Optional[str] = None,
+        has_events: Optional[bool] = None,
+        max_distance_km: Optional[float] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Tuple[Venue, float]]:
+        """
+        List venues nearest first, with their distance in km
+        Endpoint #11: GET /venues?lat=..&lng=..
+
+        Ordering comes from the spatial index over all active venues, so
+        page two continues exactly where page one stopped; only the page's
+        venues are loaded.
+        """
+        index = await venue_index.ensure(self.db)
+
+        venue_filter = None
+        if venue_type or has_events is not None:
+            def venue_filter(venue):
+                return (not venue_type or venue[3] == venue_type) and (
+                    has_events is None or venue[4] == has_events
+                )
+
+        nearest = index.nearest(
+            latitude,
+            longitude,
+            offset + limit,
+            max_distance_km=max_distance_km,
+            venue_filter=venue_filter,
+        )[offset:]
+        if not nearest:
+            return []
+
+        result = await self.db.execute(
+            select(Venue).where(Venue.id.in_([venue_id for venue_id, _ in nearest]))
+        )
+        venues = {venue.id: venue for venue in result.scalars().all()}
+
+        # Skip venues deleted since the index was built
+        return [
+            (venues[venue_id], distance_km)
+            for venue_id, distance_km in nearest
+            if venue_id in venues
+        ]
+
     async def get_venue_by_id(self, venue_id: str) -> Optional[Venue]:
         """
         Get venue details by ID
@@ -122,78 +169,12 @@ class VenueService:
         if not venue:
             raise HTTPException(status_code=404, detail="Venue not found")
 
-        # Parse tier config or use default
-        if venue.tier_config:
-            try:
-                tier_data = json.loads(venue.tier_config)
-                tiers = [TierLevel(**tier) for tier in tier_data.get("tiers", [])]
-            except (json.JSONDecodeError, Exception):
-                tiers = self._get_default_tiers()
-        else:
-            tiers = self._get_default_tiers()
+        # Compiled once per tier_config (default tiers if missing or invalid)
+        tiers = TierConfigCache.get(venue).levels
 
         return TierConfig(
             venue_id=venue.id,
             venue_name=venue.name,
-            tiers=tiers,
+            tiers=list(tiers),
             points_expiration_days=180,
         )
-
-    def _get_default_tiers(self) -> List[TierLevel]:
-        """Get default tier configuration"""
-        return [
-            TierLevel(
-                name="bronze",
-                min_points=0,
-                max_points=999,
-                color="#CD7F32",
-                benefits=["Earn 1 point per €1 spent", "Birthday reward"],
-                discount_percentage=0.0,
-                bonus_multiplier=1.0,
-            ),
-            TierLevel(
-                name="silver",
-                min_points=1000,
-                max_points=4999,
-                color="#C0C0C0",
-                benefits=[
-                    "Earn 1.25 points per €1 spent",
-                    "5% discount on all purchases",
-                    "Priority booking for events",
-                    "Birthday reward",
-                ],
-                discount_percentage=5.0,
-                bonus_multiplier=1.25,
-            ),
-            TierLevel(
-                name="gold",
-                min_points=5000,
-                max_points=14999,
-                color="#FFD700",
-                benefits=[
-                    "Earn 1.5 points per €1 spent",
-                    "10% discount on all purchases",
-                    "VIP event access",
-                    "Free drink on birthday",
-                    "Bring a friend bonus",
-                ],
-                discount_percentage=10.0,
-                bonus_multiplier=1.5,
-            ),
-            TierLevel(
-                name="platinum",
-                min_points=15000,
-                max_points=None,
-                color="#E5E4E2",
-                benefits=[
-                    "Earn 2 points per €1 spent",
-                    "15% discount on all purchases",
-                    "Exclusive VIP lounge access",
-                    "Complimentary bottle service (monthly)",
-                    "Personal concierge",
-                    "Free guest list entries",
-                ],
-                discount_percentage=15.0,
-                bonus_multiplier=2.0,
-            ),
-        ]
@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for WiesbadenAfterDark API
+Run individual benchmarks with: python -m benchmarks.<name> --help
+"""
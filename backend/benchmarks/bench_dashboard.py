@@ -0,0 +1,81 @@
+"""
+Benchmark the venue owner dashboard aggregation.
+
+Compares the previous layout (one aggregate query per period, sections
+queried one after another) against the single-pass aggregation with the
+sections queried concurrently.
+
+Usage:
+    DATABASE_URL="postgresql+asyncpg://..." python -m benchmarks.bench_dashboard <venue_id> [--iterations 20]
+
+Point it at a staging copy of the database with a busy venue; the numbers
+only mean something against realistic transaction volumes.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from app.db.session import AsyncSessionLocal, engine, run_concurrently
+from app.api.routes.admin import (
+    _get_top_products,
+    _get_recent_transactions,
+    _get_low_stock_alerts,
+)
+from app.services.dashboard_stats import DashboardStatsService
+from benchmarks.common import QueryCounter, time_async, report
+
+
+def _periods(now: datetime) -> dict:
+    return {
+        "today": now.replace(hour=0, minute=0, second=0, microsecond=0),
+        "week": now - timedelta(days=7),
+        "month": now - timedelta(days=30),
+        "all_time": None,
+    }
+
+
+async def dashboard_per_period(venue_id: UUID) -> None:
+    """Previous behaviour: a scan per period, sections one after another."""
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        for name, start in _periods(now).items():
+            await DashboardStatsService.get_stats_for_periods(db, venue_id, {name: start}, now)
+        await _get_top_products(db, venue_id)
+        await _get_recent_transactions(db, venue_id)
+        await _get_low_stock_alerts(db, venue_id)
+
+
+async def dashboard_single_pass(venue_id: UUID) -> None:
+    """Current behaviour: one scan for all periods, sections concurrently."""
+    now = datetime.utcnow()
+    periods = _periods(now)
+    async with AsyncSessionLocal() as db:
+        await run_concurrently(
+            db,
+            lambda session: DashboardStatsService.get_stats_for_periods(session, venue_id, periods, now),
+            lambda session: _get_top_products(session, venue_id),
+            lambda session: _get_recent_transactions(session, venue_id),
+            lambda session: _get_low_stock_alerts(session, venue_id),
+        )
+
+
+async def main(venue_id: UUID, iterations: int) -> None:
+    for label, variant in (
+        ("per-period, sequential", dashboard_per_period),
+        ("single-pass, concurrent", dashboard_single_pass),
+    ):
+        with QueryCounter(engine) as counter:
+            await variant(venue_id)
+        durations = await time_async(lambda: variant(venue_id), iterations)
+        report(label, durations, counter.count)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("venue_id", type=UUID)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.venue_id, args.iterations))
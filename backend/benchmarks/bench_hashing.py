@@ -0,0 +1,79 @@
+"""
+Benchmark event-loop lag during a burst of clock-ins.
+
+Each simulated clock-in verifies a bcrypt PIN hash, either inline on the
+event loop (previous behaviour) or in the hashing pool (current behaviour).
+A probe coroutine sleeps --probe-ms at a time and records how late it wakes
+up: that lateness is the delay every other request on the worker sees.
+No database is needed.
+
+Usage:
+    DATABASE_URL="postgresql+asyncpg://..." python -m benchmarks.bench_hashing [--clock-ins 40] [--workers 4] [--rounds 12]
+"""
+import argparse
+import asyncio
+import time
+
+import bcrypt
+
+from app.core.hashing import HashingExecutor
+from benchmarks.common import report
+
+
+PIN = b"1234"
+
+
+async def probe_lag(stop: asyncio.Event, interval: float, lags: list) -> None:
+    """Record how late the loop wakes a sleeper, in ms."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def burst(clock_in, clock_ins: int, interval: float):
+    """Run the clock-ins concurrently while probing; return (lags, burst ms)."""
+    stop = asyncio.Event()
+    lags: list = []
+    probe = asyncio.create_task(probe_lag(stop, interval, lags))
+    await asyncio.sleep(interval)  # Let the probe start
+
+    start = time.perf_counter()
+    await asyncio.gather(*(clock_in() for _ in range(clock_ins)))
+    elapsed = (time.perf_counter() - start) * 1000
+
+    stop.set()
+    await probe
+    return lags, elapsed
+
+
+async def main(clock_ins: int, workers: int, rounds: int, probe_ms: float) -> None:
+    pin_hash = bcrypt.hashpw(PIN, bcrypt.gensalt(rounds))
+    executor = HashingExecutor(max_workers=workers)
+    interval = probe_ms / 1000
+    print(f"{clock_ins} simultaneous clock-ins, bcrypt cost {rounds}, {workers} hashing threads\n")
+
+    async def inline_clock_in():
+        await asyncio.sleep(0)
+        bcrypt.checkpw(PIN, pin_hash)
+
+    async def pooled_clock_in():
+        await executor.run(bcrypt.checkpw, PIN, pin_hash)
+
+    for label, clock_in in (("inline bcrypt", inline_clock_in), ("hashing pool", pooled_clock_in)):
+        lags, elapsed = await burst(clock_in, clock_ins, interval)
+        report(f"{label} loop lag", lags)
+        print(f"{'':<32} burst finished in {elapsed:.0f} ms")
+
+    print(f"\nhashing pool: {executor.stats()}")
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clock-ins", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--probe-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.clock_ins, args.workers, args.rounds, args.probe_ms))
@@ -0,0 +1,100 @@
+"""
+Benchmark referral reward distribution.
+
+Compares the per-level loop (a UserPoints lookup, possibly an insert and a
+flush per level) against the set-based path (one upsert for all referrer
+balances, one multi-row insert for the bonus transactions).
+
+Every run is rolled back, so the database is left untouched. Before timing,
+both paths are run once and their effects compared: referrer balances,
+REFERRAL_BONUS rows and chain earnings must be identical.
+
+Usage:
+    DATABASE_URL="postgresql+asyncpg://..." python -m benchmarks.bench_referrals <user_id> <venue_id> [--points 40] [--iterations 50]
+
+user_id should be a customer with a full (5-level) referral chain.
+"""
+import argparse
+import asyncio
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.referral import ReferralChain
+from app.models.user_points import UserPoints
+from app.services.points_calculator import PointsCalculator
+from benchmarks.common import QueryCounter, time_async, report
+
+
+VARIANTS = (
+    ("per-level loop", PointsCalculator._process_referral_rewards_per_level),
+    ("set-based upsert", PointsCalculator.process_referral_rewards),
+)
+
+
+async def run_and_rollback(process, user_id: UUID, venue_id: UUID, points: Decimal) -> dict:
+    """Run one variant inside a transaction, capture its effects, roll back."""
+    async with AsyncSessionLocal() as db:
+        transactions = await process(db, user_id, venue_id, points)
+
+        referrer_ids = [t.user_id for t in transactions]
+        result = await db.execute(
+            select(UserPoints).where(
+                UserPoints.user_id.in_(referrer_ids),
+                UserPoints.venue_id == venue_id
+            )
+        )
+        balances = {
+            up.user_id: (up.points_earned, up.points_spent, up.points_available)
+            for up in result.scalars().all()
+        }
+
+        result = await db.execute(
+            select(ReferralChain).where(ReferralChain.user_id == user_id)
+        )
+        chain = result.scalar_one_or_none()
+        earnings = [
+            getattr(chain, f"level_{level}_earnings") for level in range(1, 6)
+        ] if chain else []
+
+        effects = {
+            "balances": balances,
+            "transactions": sorted(
+                (t.referral_level, t.user_id, t.points_earned, t.description)
+                for t in transactions
+            ),
+            "earnings": earnings,
+        }
+        await db.rollback()
+        return effects
+
+
+async def main(user_id: UUID, venue_id: UUID, points: Decimal, iterations: int) -> None:
+    loop_effects = await run_and_rollback(VARIANTS[0][1], user_id, venue_id, points)
+    set_effects = await run_and_rollback(VARIANTS[1][1], user_id, venue_id, points)
+    if loop_effects != set_effects:
+        raise SystemExit(f"❌ Results differ:\n  loop: {loop_effects}\n  set:  {set_effects}")
+    print(f"✅ Identical results ({len(set_effects['transactions'])} referral levels)\n")
+
+    for label, process in VARIANTS:
+        with QueryCounter(engine) as counter:
+            await run_and_rollback(process, user_id, venue_id, points)
+        durations = await time_async(
+            lambda: run_and_rollback(process, user_id, venue_id, points),
+            iterations
+        )
+        report(label, durations, counter.count)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("user_id", type=UUID)
+    parser.add_argument("venue_id", type=UUID)
+    parser.add_argument("--points", type=Decimal, default=Decimal("40"))
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id, args.venue_id, args.points, args.iterations))
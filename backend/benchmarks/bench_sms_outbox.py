@@ -0,0 +1,74 @@
+"""
+Benchmark SMS outbox delivery throughput offline, with the fake transport.
+
+Queues --messages verification SMS (one per number), then times the worker
+draining them at each send concurrency. --latency-ms stands in for the Twilio
+round trip and --failure-rate for provider errors (failed messages are
+retried with backoff, so not all of them finish within one drain).
+
+Runs against a throwaway SQLite file by default; pass --database-url to use
+a real database (the sms_outbox table must exist; rows are deleted after).
+
+Usage:
+    DATABASE_URL="postgresql+asyncpg://..." python -m benchmarks.bench_sms_outbox [--messages 200] [--latency-ms 150] [--concurrency 1 4 16]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.sms import FakeSMSTransport
+from app.models.sms_outbox import SmsOutboxMessage
+from app.services.sms_outbox import SmsOutboxService, SmsOutboxWorker
+
+
+async def run(database_url: str, messages: int, latency_ms: float, failure_rate: float, levels) -> None:
+    engine = create_async_engine(database_url)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    if database_url.startswith("sqlite"):
+        async with engine.begin() as conn:
+            await conn.run_sync(SmsOutboxMessage.__table__.create, checkfirst=True)
+
+    print(f"{messages} messages, {latency_ms:g} ms provider latency, {failure_rate:.0%} failures\n")
+
+    for concurrency in levels:
+        async with factory() as db:
+            await db.execute(delete(SmsOutboxMessage).where(SmsOutboxMessage.kind == "benchmark"))
+            for i in range(messages):
+                await SmsOutboxService.enqueue(db, f"+49170{i:07d}", "benchmark", "Your code is 123456")
+            await db.commit()
+
+        transport = FakeSMSTransport(latency_seconds=latency_ms / 1000, failure_rate=failure_rate, seed=1)
+        worker = SmsOutboxWorker(factory, transport, concurrency=concurrency, batch_size=max(concurrency * 4, 20))
+
+        start = time.perf_counter()
+        await worker.drain()
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"concurrency {concurrency:>3}: {len(transport.sent):>5} sent, {transport.failures:>4} failed attempts"
+            f" in {elapsed:7.2f} s  ({len(transport.sent) / elapsed:8.1f} msg/s)"
+        )
+
+    async with factory() as db:
+        await db.execute(delete(SmsOutboxMessage).where(SmsOutboxMessage.kind == "benchmark"))
+        await db.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--database-url", help="Database to use instead of a temporary SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(directory, 'outbox.db')}"
+        asyncio.run(run(url, args.messages, args.latency_ms, args.failure_rate, args.concurrency))
@@ -0,0 +1,68 @@
+"""
+Benchmark annotating venue members with their tier.
+
+"parse per member" is what resolving a tier cost before: json.loads of the
+venue's tier_config, TierLevel models built, then a scan for the highest
+tier reached. "compiled" resolves against the venue's cached tier table
+with a binary search. No database is needed.
+
+Usage:
+    DATABASE_URL="postgresql+asyncpg://..." python -m benchmarks.bench_tiers [--members 10000] [--tiers 5] [--iterations 10]
+"""
+import argparse
+import json
+import random
+import time
+
+from app.schemas.venue import TierLevel
+from app.services.tier_config_cache import TierConfigCache
+from benchmarks.common import report
+
+
+class Venue:
+    def __init__(self, tier_config):
+        self.id = "bench-venue"
+        self.tier_config = tier_config
+
+
+def parse_and_scan(tier_config: str, points: int):
+    tiers = [TierLevel(**tier) for tier in json.loads(tier_config).get("tiers", [])]
+    reached = None
+    for tier in sorted(tiers, key=lambda tier: tier.min_points):
+        if tier.min_points <= points:
+            reached = tier
+    return reached
+
+
+def timed(operation, iterations: int):
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main(members: int, tier_count: int, iterations: int) -> None:
+    rng = random.Random(42)
+    tier_config = json.dumps({"tiers": [
+        {"name": f"tier-{i}", "min_points": i * 1000, "color": "#000", "benefits": ["perk"] * 3}
+        for i in range(tier_count)
+    ]})
+    venue = Venue(tier_config)
+    balances = [(rng.randint(0, tier_count * 1200), rng.randint(0, 50)) for _ in range(members)]
+    print(f"{members} members, {tier_count} tiers, {iterations} iterations\n")
+
+    report("parse per member", timed(lambda: [parse_and_scan(tier_config, points) for points, _ in balances], iterations))
+    report("compiled, resolve_tier", timed(
+        lambda: [TierConfigCache.resolve_tier(venue, points, visits) for points, visits in balances], iterations
+    ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--tiers", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    main(args.members, args.tiers, args.iterations)
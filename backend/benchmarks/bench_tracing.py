@@ -0,0 +1,126 @@
+"""
+Benchmark the per-request overhead of LangFuse request tracing.
+
+Calls a small Starlette app directly over ASGI (no network, no database) and
+compares:
+- no middleware
+- LangfuseMiddleware with LangFuse disabled (pass-through)
+- LangfuseMiddleware at the default sample rate and at 100%
+- a BaseHTTPMiddleware tracer creating events inline, as the middleware did before
+
+Events go to a no-op sink, so only the request-path cost is measured.
+
+Usage:
+    DATABASE_URL="postgresql+asyncpg://..." python -m benchmarks.bench_tracing [--requests 2000] [--iterations 10]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.observability import LangfuseClient, LangfuseMiddleware, TraceExporter
+from benchmarks.common import percentile, time_async
+
+PAYLOAD = {"venues": [{"id": i, "name": f"Venue {i}", "distance_km": i * 0.1} for i in range(20)]}
+
+
+async def venues(request):
+    return JSONResponse(PAYLOAD)
+
+
+class InlineTracingMiddleware(BaseHTTPMiddleware):
+    """The previous design: BaseHTTPMiddleware, every request, event created in the request."""
+
+    def __init__(self, app, sink):
+        super().__init__(app)
+        self.sink = sink
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        self.sink({
+            "name": f"{request.method} {request.url.path}",
+            "metadata": {
+                "method": request.method,
+                "path": request.url.path,
+                "query_params": dict(request.query_params),
+                "status_code": response.status_code,
+            },
+        })
+        return response
+
+
+def make_request(app, count: int):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/venues",
+        "raw_path": b"/api/v1/venues",
+        "query_string": b"lat=50.08&lon=8.24",
+        "headers": [(b"host", b"test"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+    received = []
+
+    async def receive():
+        # Like a server: the body once, then wait until the client goes away
+        if not received:
+            received.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        pass
+
+    async def run():
+        for _ in range(count):
+            received.clear()
+            await app(dict(scope), receive, send)
+
+    return run
+
+
+async def run(requests: int, iterations: int) -> None:
+    inner = Starlette(routes=[Route("/api/v1/venues", venues)])
+    sink = lambda batch: None  # noqa: E731
+
+    traced_default = LangfuseMiddleware(inner, exporter=TraceExporter(sink=sink), route_sample_rates={})
+    traced_all = LangfuseMiddleware(inner, sample_rate=1.0, exporter=TraceExporter(sink=sink), route_sample_rates={})
+    variants = [
+        ("no middleware", inner, False),
+        ("ASGI, LangFuse disabled", LangfuseMiddleware(inner), False),
+        (f"ASGI, sampled {settings.LANGFUSE_SAMPLE_RATE:.0%}", traced_default, True),
+        ("ASGI, sampled 100%", traced_all, True),
+        ("BaseHTTPMiddleware, inline", InlineTracingMiddleware(inner, sink), True),
+    ]
+
+    print(f"{requests} GET requests per run, {len(json.dumps(PAYLOAD))} byte JSON response\n")
+    for label, app, enabled in variants:
+        LangfuseClient._enabled = enabled
+        durations = await time_async(make_request(app, requests), iterations)
+        per_request = [d * 1000 / requests for d in durations]
+        print(
+            f"{label:<32} mean {statistics.mean(per_request):7.1f} µs/request"
+            f"  p95 {percentile(per_request, 95):7.1f} µs/request"
+        )
+
+    await traced_default.exporter.stop()
+    await traced_all.exporter.stop()
+    LangfuseClient._enabled = False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.iterations))
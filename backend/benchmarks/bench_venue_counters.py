@@ -0,0 +1,77 @@
+"""
+Benchmark venue counter updates under concurrent purchases at one venue.
+
+Compares incrementing the venue row in place (every purchase takes the same
+row lock and holds it until commit) against appending to venue_stat_deltas
+(no shared row). Each simulated purchase opens its own transaction, writes
+its counter update, waits --hold-ms to stand in for the rest of the purchase
+work, then rolls back, so the database is left untouched.
+
+Usage:
+    DATABASE_URL="postgresql+asyncpg://..." python -m benchmarks.bench_venue_counters <venue_id> [--concurrency 50] [--hold-ms 5] [--iterations 10]
+"""
+import argparse
+import asyncio
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import update
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.venue import Venue
+from app.services.venue_counters import VenueCounters
+from benchmarks.common import time_async, report
+
+
+REVENUE = Decimal("12.50")
+POINTS = Decimal("1.25")
+
+
+async def purchase_row_update(venue_id: UUID, hold: float) -> None:
+    """Previous behaviour: increment the venue row inside the purchase."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Venue)
+            .where(Venue.id == venue_id)
+            .values(
+                total_revenue=Venue.total_revenue + REVENUE,
+                total_points_issued=Venue.total_points_issued + POINTS,
+            )
+        )
+        await asyncio.sleep(hold)
+        await db.rollback()
+
+
+async def purchase_delta_append(venue_id: UUID, hold: float) -> None:
+    """Current behaviour: append a delta inside the purchase."""
+    async with AsyncSessionLocal() as db:
+        await VenueCounters.record(db, venue_id, REVENUE, POINTS)
+        await asyncio.sleep(hold)
+        await db.rollback()
+
+
+async def main(venue_id: UUID, concurrency: int, hold_ms: float, iterations: int) -> None:
+    hold = hold_ms / 1000
+    print(f"{concurrency} simultaneous purchases per run, {hold_ms:g} ms of work each\n")
+
+    for label, purchase in (
+        ("venue row update", purchase_row_update),
+        ("delta append", purchase_delta_append),
+    ):
+        async def burst():
+            await asyncio.gather(*(purchase(venue_id, hold) for _ in range(concurrency)))
+
+        durations = await time_async(burst, iterations)
+        report(label, durations)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("venue_id", type=UUID)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--hold-ms", type=float, default=5.0)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.venue_id, args.concurrency, args.hold_ms, args.iterations))
@@ -0,0 +1,95 @@
+"""
+Benchmark nearby-venue queries: brute-force Haversine scan vs the spatial index.
+
+The brute-force variant is what the venue list did before: measure every
+active venue with the scalar Haversine, filter by radius, sort. The batch
+kernel variant measures every venue in one numpy operation over the index's
+cached coordinate arrays. The index variants query the KD-tree for a page
+of the nearest venues (first page and page five) and for every venue
+within a radius. Venues are scattered around a handful of German city
+centres, so density looks like a growing multi-city catalog. No database is
+needed.
+
+Usage:
+    DATABASE_URL="postgresql+asyncpg://..." python -m benchmarks.bench_venue_index [--sizes 100 10000 100000] [--queries 200]
+"""
+import argparse
+import random
+import time
+
+from app.services.venue_index import VenueSpatialIndex, haversine_km
+from benchmarks.common import report
+
+
+CITIES = [
+    (50.0826, 8.2400),   # Wiesbaden
+    (50.1109, 8.6821),   # Frankfurt
+    (49.9929, 8.2473),   # Mainz
+    (50.9375, 6.9603),   # Cologne
+    (52.5200, 13.4050),  # Berlin
+    (48.1351, 11.5820),  # Munich
+    (53.5511, 9.9937),   # Hamburg
+]
+
+
+def make_venues(count: int, rng: random.Random):
+    venues = []
+    for i in range(count):
+        lat, lng = rng.choice(CITIES)
+        venues.append((
+            f"venue-{i}",
+            rng.gauss(lat, 0.08),
+            rng.gauss(lng, 0.12),
+            rng.choice(["bar", "club", "restaurant"]),
+            rng.random() < 0.3,
+        ))
+    return venues
+
+
+def brute_force(venues, lat, lng, radius_km, limit, offset):
+    """The previous approach: distance to every venue, filter, sort, slice."""
+    found = []
+    for venue_id, v_lat, v_lng, *_ in venues:
+        distance = haversine_km(lat, lng, v_lat, v_lng)
+        if radius_km is None or distance <= radius_km:
+            found.append((distance, venue_id))
+    found.sort()
+    return found[offset:offset + limit]
+
+
+def timed(operation, points):
+    durations = []
+    for lat, lng in points:
+        start = time.perf_counter()
+        operation(lat, lng)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main(sizes, queries: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for size in sizes:
+        venues = make_venues(size, rng)
+        points = [(rng.gauss(lat, 0.05), rng.gauss(lng, 0.05)) for lat, lng in (rng.choice(CITIES) for _ in range(queries))]
+
+        index = VenueSpatialIndex()
+        start = time.perf_counter()
+        index.build(venues)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"\n{size} venues (index build {build_ms:.1f} ms), {queries} queries")
+
+        report("brute force, page 1", timed(lambda lat, lng: brute_force(venues, lat, lng, None, 20, 0), points))
+        report("index nearest, page 1", timed(lambda lat, lng: index.nearest(lat, lng, 20), points))
+        report("index nearest, page 5", timed(lambda lat, lng: index.nearest(lat, lng, 100)[80:], points))
+        report("batch kernel, page 1", timed(lambda lat, lng: index._nearest_by_scan(lat, lng, 20, None, None), points))
+        report("brute force, 2 km radius", timed(lambda lat, lng: brute_force(venues, lat, lng, 2.0, size, 0), points))
+        report("index within 2 km", timed(lambda lat, lng: index.within(lat, lng, 2.0), points))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.sizes, args.queries, args.seed)
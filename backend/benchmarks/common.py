@@ -0,0 +1,72 @@
+"""
+Shared helpers for benchmarks: query counting, timing and reporting.
+"""
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """
+    Count SQL statements executed on an engine while the context is active.
+
+    Usage:
+        with QueryCounter(engine) as counter:
+            await do_work()
+        print(counter.count)
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine.sync_engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+async def time_async(
+    operation: Callable[[], Awaitable[object]],
+    iterations: int,
+    warmup: int = 1,
+) -> List[float]:
+    """
+    Run an async operation repeatedly and return per-iteration durations in ms.
+    """
+    for _ in range(warmup):
+        await operation()
+
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await operation()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def percentile(durations: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of durations."""
+    ordered = sorted(durations)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(label: str, durations: List[float], queries: int = None) -> None:
+    """Print a one-line summary for a benchmark variant."""
+    line = (
+        f"{label:<32} mean {statistics.mean(durations):8.2f} ms"
+        f"  p50 {percentile(durations, 50):8.2f} ms"
+        f"  p95 {percentile(durations, 95):8.2f} ms"
+    )
+    if queries is not None:
+        line += f"  queries/run {queries}"
+    print(line)
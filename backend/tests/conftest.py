@@ -14,6 +14,9 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import NullPool
 
+# query_budget marker and fixture
+pytest_plugins = ["tests.query_budget"]
+
 # Note: These imports would come from your actual app
 # from app.main import app
 # from app.core.config import settings
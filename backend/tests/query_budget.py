@@ -0,0 +1,102 @@
+"""
+Pytest plugin enforcing SQL query budgets (loaded from conftest.py).
+
+Marker - every request the test makes through the app must stay in budget:
+
+    @pytest.mark.query_budget(4, max_repeats=2)
+    async def test_event_detail(client):
+        await client.get("/api/v1/events/...")
+
+max_repeats caps how often one statement shape may run per request (an
+N+1 loop shows up as a shape repeated once per row). Tests that make no
+HTTP request are checked as a whole.
+
+The marker watches the app's engines. A test that runs on its own engine
+requests a query_budget_engines fixture (defined next to the test) that
+yields the engines to watch instead.
+
+Fixture - budget one block, on any engine:
+
+    async def test_history(query_budget):
+        with query_budget(2, engine=engine):
+            await ShiftService.history(...)
+"""
+from contextlib import contextmanager
+
+import pytest
+
+
+def _check(profile, max_queries, max_repeats):
+    """Failure message for a profile over budget, else None."""
+    problems = []
+    if max_queries is not None and profile.count > max_queries:
+        problems.append(f"{profile.count} queries (budget {max_queries})")
+    if max_repeats is not None:
+        repeated = profile.repeated(max_repeats + 1)
+        if repeated:
+            problems.append(f"statement shapes repeated more than {max_repeats}x")
+    if problems:
+        return f"Query budget exceeded: {', '.join(problems)}\n{profile.report()}"
+    return None
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries, max_repeats=None): fail if a request (or the test) runs more SQL",
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        yield
+        return
+
+    # Imported here: app modules need DATABASE_URL, unmarked tests do not
+    from app.core.query_profiler import query_profiler
+
+    engines = item.funcargs.get("query_budget_engines")
+    if engines is None:
+        from app.db.session import engine, read_engine
+        engines = (engine, read_engine)
+
+    max_queries = marker.args[0] if marker.args else marker.kwargs.get("max_queries")
+    max_repeats = marker.kwargs.get("max_repeats")
+
+    requests = []
+    was_enabled = query_profiler.enabled
+    query_profiler.enable(*engines)
+    query_profiler.request_hooks.append(requests.append)
+    try:
+        with query_profiler.profile(item.nodeid) as whole_test:
+            outcome = yield
+    finally:
+        query_profiler.request_hooks.remove(requests.append)
+        query_profiler.enabled = was_enabled
+
+    if outcome.excinfo is not None:
+        return
+    for profile in requests or [whole_test]:
+        message = _check(profile, max_queries, max_repeats)
+        if message:
+            pytest.fail(message, pytrace=False)
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager failing the test if its block exceeds a query budget."""
+    from app.core.query_profiler import query_profiler
+
+    @contextmanager
+    def budget(max_queries=None, max_repeats=None, engine=None):
+        if engine is not None:
+            query_profiler.instrument(engine)
+        with query_profiler.profile("query_budget block") as profile:
+            yield profile
+        message = _check(profile, max_queries, max_repeats)
+        if message:
+            pytest.fail(message, pytrace=False)
+
+    return budget
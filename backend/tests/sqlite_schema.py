@@ -0,0 +1,27 @@
+"""
+Create PostgreSQL-shaped model tables on SQLite test databases.
+
+The models on app.db.session.Base use PostgreSQL UUID columns and foreign
+keys to tables of the other declarative base (venues, users), which SQLite
+can neither render nor resolve. create_tables() creates the given tables
+without foreign key constraints, and UUID columns are stored as CHAR(32):
+
+    async with engine.begin() as conn:
+        await conn.run_sync(create_tables, UserPoints.__table__, Venue.__table__)
+"""
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+def create_tables(connection, *tables) -> None:
+    """Create tables (and their indexes) without foreign key constraints."""
+    for table in tables:
+        connection.execute(CreateTable(table, include_foreign_key_constraints=[]))
+        for index in table.indexes:
+            connection.execute(CreateIndex(index))
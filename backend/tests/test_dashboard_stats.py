@@ -0,0 +1,167 @@
+"""
+Tests for the dashboard's single-pass period statistics, checked against one
+query per period, and for running dashboard sections concurrently.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.session import run_concurrently
+from app.models.venue_daily_stats import VenueDailyCustomer, VenueDailyStats
+from app.services.dashboard_stats import DashboardStatsService
+from tests.sqlite_schema import create_tables
+
+
+NOW = datetime(2026, 6, 15, 21, 30)
+VENUE = uuid.uuid4()
+OTHER_VENUE = uuid.uuid4()
+USERS = [uuid.uuid4() for _ in range(12)]
+
+PERIODS = {
+    "today": NOW.replace(hour=0, minute=0, second=0, microsecond=0),
+    "week": NOW - timedelta(days=7),
+    "month": NOW - timedelta(days=30),
+    "all_time": None,
+}
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dashboard.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(create_tables, VenueDailyStats.__table__, VenueDailyCustomer.__table__)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    stats_rows, customer_rows = [], []
+    # Every third day over ~3 months, today, and one day past the end date
+    for days_ago in [*range(0, 90, 3), 1, -1]:
+        day = (NOW - timedelta(days=days_ago)).date()
+        for venue_id in (VENUE, OTHER_VENUE):
+            stats_rows.append(dict(
+                venue_id=venue_id, date=day,
+                # Quarters add up exactly, also as SQLite floats
+                revenue=Decimal("40.25") + days_ago, transaction_count=3 + days_ago % 4,
+                points_issued=Decimal("4.25") + days_ago, points_redeemed=Decimal(days_ago % 5),
+            ))
+            # Overlapping customers, so distinct counts differ from sums
+            for user_id in USERS[days_ago % 9:days_ago % 9 + 3]:
+                customer_rows.append(dict(venue_id=venue_id, date=day, user_id=user_id))
+
+    # Core inserts, like DailyStatsRollup.rebuild (the rows reference tables of the other base)
+    async with factory() as db:
+        await db.execute(insert(VenueDailyStats.__table__), stats_rows)
+        await db.execute(insert(VenueDailyCustomer.__table__), customer_rows)
+        await db.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+async def _stats_for_period(db, venue_id, start, end):
+    """The dashboard's previous layout: one aggregate query per period."""
+    stats_conditions = [VenueDailyStats.venue_id == venue_id, VenueDailyStats.date <= end.date()]
+    customer_conditions = [VenueDailyCustomer.venue_id == venue_id, VenueDailyCustomer.date <= end.date()]
+    if start is not None:
+        stats_conditions.append(VenueDailyStats.date >= start.date())
+        customer_conditions.append(VenueDailyCustomer.date >= start.date())
+
+    totals = (await db.execute(
+        select(
+            func.coalesce(func.sum(VenueDailyStats.revenue), 0),
+            func.coalesce(func.sum(VenueDailyStats.transaction_count), 0),
+            func.coalesce(func.sum(VenueDailyStats.points_issued), 0),
+            func.coalesce(func.sum(VenueDailyStats.points_redeemed), 0),
+        ).where(and_(*stats_conditions))
+    )).one()
+    customers = (await db.execute(
+        select(func.count(func.distinct(VenueDailyCustomer.user_id))).where(and_(*customer_conditions))
+    )).scalar()
+
+    revenue, transactions, points_issued, points_redeemed = totals
+    return {
+        "revenue": Decimal(str(revenue)),
+        "transactions": int(transactions),
+        "unique_customers": customers,
+        "points_issued": Decimal(str(points_issued)),
+        "points_redeemed": Decimal(str(points_redeemed)),
+    }
+
+
+@pytest.mark.asyncio
+async def test_single_pass_matches_one_query_per_period(factory):
+    async with factory() as db:
+        stats = await DashboardStatsService.get_stats_for_periods(db, VENUE, PERIODS, NOW)
+        expected = {name: await _stats_for_period(db, VENUE, start, NOW) for name, start in PERIODS.items()}
+
+    assert set(stats) == set(PERIODS)
+    for name, period_stats in stats.items():
+        assert period_stats.model_dump(exclude={"avg_transaction_value"}) == expected[name], name
+        average = expected[name]["revenue"] / expected[name]["transactions"]
+        assert period_stats.avg_transaction_value == average.quantize(Decimal("0.01"))
+
+    # The windows really differ, and nest
+    assert stats["today"].transactions < stats["week"].transactions < stats["month"].transactions
+    assert stats["month"].transactions < stats["all_time"].transactions
+    assert stats["today"].revenue == Decimal("40.25")
+
+
+@pytest.mark.asyncio
+async def test_each_period_alone_matches_all_together(factory):
+    async with factory() as db:
+        together = await DashboardStatsService.get_stats_for_periods(db, VENUE, PERIODS, NOW)
+        for name, start in PERIODS.items():
+            alone = await DashboardStatsService.get_stats_for_periods(db, VENUE, {name: start}, NOW)
+            assert alone == {name: together[name]}
+
+
+@pytest.mark.asyncio
+async def test_venue_without_rollup_rows_gets_zeros(factory):
+    async with factory() as db:
+        stats = await DashboardStatsService.get_stats_for_periods(db, uuid.uuid4(), PERIODS, NOW)
+
+    for period_stats in stats.values():
+        assert period_stats.transactions == 0
+        assert period_stats.unique_customers == 0
+        assert period_stats.avg_transaction_value == Decimal("0.00")
+
+
+@pytest.mark.asyncio
+async def test_run_concurrently_returns_results_in_order(factory):
+    async with factory() as db:
+        stats, week, sessions = await run_concurrently(
+            db,
+            lambda session: DashboardStatsService.get_stats_for_periods(session, VENUE, PERIODS, NOW),
+            lambda session: _stats_for_period(session, VENUE, PERIODS["week"], NOW),
+            lambda session: asyncio.sleep(0, result=session),
+        )
+
+    assert stats["week"].transactions == week["transactions"]
+    assert sessions is not db
+    assert sessions.bind is db.bind
+
+
+@pytest.mark.asyncio
+async def test_run_concurrently_overlaps_operations(factory):
+    # Each operation waits for the other: run one after another, this times out
+    first_started, second_started = asyncio.Event(), asyncio.Event()
+
+    async def first(session):
+        first_started.set()
+        await second_started.wait()
+        return (await session.execute(select(func.count()).select_from(VenueDailyStats))).scalar()
+
+    async def second(session):
+        second_started.set()
+        await first_started.wait()
+        return (await session.execute(select(func.count()).select_from(VenueDailyCustomer))).scalar()
+
+    async with factory() as db:
+        stats_rows, customer_rows = await asyncio.wait_for(run_concurrently(db, first, second), timeout=10)
+
+    assert stats_rows == 64
+    assert customer_rows == 64 * 3
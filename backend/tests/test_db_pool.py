@@ -0,0 +1,70 @@
+"""
+Tests for the shared engine's pool configuration and metrics.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import database
+from app.core import deps
+from app.db import session
+from app.db.session import InstrumentedQueuePool, build_engine_options, get_pool_status
+
+
+def test_single_engine_shared_by_both_modules():
+    assert database.engine is session.engine
+    assert database.AsyncSessionLocal is session.AsyncSessionLocal
+    assert deps.get_db is session.get_db
+
+
+def test_asyncpg_options_include_statement_caches():
+    options = build_engine_options("postgresql+asyncpg://user:pw@localhost:6543/postgres")
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["connect_args"]["statement_cache_size"] >= 0
+    assert options["connect_args"]["prepared_statement_cache_size"] >= 0
+
+
+def test_in_memory_sqlite_keeps_default_pool():
+    options = build_engine_options("sqlite+aiosqlite:///:memory:")
+
+    assert "poolclass" not in options
+    assert "pool_size" not in options
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_track_checkouts_and_timeouts(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    engine = create_async_engine(
+        url, **build_engine_options(url, pool_size=1, max_overflow=0, pool_timeout=0.05, echo=False)
+    )
+
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            status = get_pool_status(engine)
+            assert status["checked_out"] == 1
+            assert status["max_connections"] == 1
+
+            # The only connection is taken: the next checkout waits, then times out
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect() as blocked:
+                    await blocked.execute(text("SELECT 1"))
+
+        status = get_pool_status(engine)
+        assert status["checked_out"] == 0
+        assert status["checkouts"] == 2
+        assert status["checkout_timeouts"] == 1
+        assert status["max_checkout_ms"] >= 50
+
+        await asyncio.gather(*(_select_one(engine) for _ in range(5)))
+        assert get_pool_status(engine)["checkouts"] == 7
+    finally:
+        await engine.dispose()
+
+
+async def _select_one(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
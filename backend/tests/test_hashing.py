@@ -0,0 +1,63 @@
+"""
+Tests for the password/PIN hashing pool.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.hashing import HashingExecutor
+
+
+def _slow_double(value):
+    time.sleep(0.05)
+    return value * 2
+
+
+@pytest.mark.asyncio
+async def test_results_and_queue_depth():
+    executor = HashingExecutor(max_workers=2)
+    try:
+        results = await asyncio.gather(*(executor.run(_slow_double, i) for i in range(8)))
+        stats = executor.stats()
+    finally:
+        executor.shutdown()
+
+    assert results == [i * 2 for i in range(8)]
+    assert stats["completed"] == 8
+    assert stats["max_queue_depth"] == 6
+    assert stats["queue_depth"] == 0
+    # The last pair waited for three pairs ahead of it
+    assert stats["max_wait_ms"] >= 100
+
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_running_while_hashing():
+    executor = HashingExecutor(max_workers=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        await executor.run(time.sleep, 0.1)
+    finally:
+        task.cancel()
+        executor.shutdown()
+
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_exceptions_propagate():
+    executor = HashingExecutor(max_workers=1)
+    try:
+        with pytest.raises(ValueError):
+            await executor.run(int, "not a number")
+        assert executor.stats()["running"] == 0
+    finally:
+        executor.shutdown()
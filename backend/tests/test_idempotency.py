@@ -0,0 +1,185 @@
+"""
+Tests for Idempotency-Key handling on transaction creation.
+
+The route-level tests mirror how app/api/routes/transactions.py wires the
+store: the handler runs inside IdempotencyStore.run with the request session,
+and commits its purchase like TransactionProcessor.create_transaction. Every
+request gets its own session, as requests on different workers would.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+from fastapi import FastAPI, Header, HTTPException, Response
+from httpx import AsyncClient, ASGITransport
+from pydantic import BaseModel
+from sqlalchemy import Column, Float, Integer, MetaData, Table, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.idempotency_key import IdempotencyKey
+from app.services.idempotency import IdempotencyStore
+from tests.sqlite_schema import create_tables
+
+
+USER = uuid.uuid4()
+
+purchases = Table(
+    "purchases", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("amount_total", Float, nullable=False),
+)
+
+
+class Purchase(BaseModel):
+    amount_total: float
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}",
+        connect_args={"timeout": 30},  # Writers queue on SQLite's database lock
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(create_tables, IdempotencyKey.__table__, purchases)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def build_app(store: IdempotencyStore, factory, calls: list) -> FastAPI:
+    """Minimal app whose handler records a purchase once per call (like create_transaction)."""
+    app = FastAPI()
+
+    @app.post("/transactions", status_code=201)
+    async def create_transaction(
+        purchase: Purchase,
+        response: Response,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    ):
+        async with factory() as db:
+            async def process():
+                calls.append(purchase.amount_total)
+                if purchase.amount_total <= 0:
+                    raise HTTPException(status_code=400, detail="Transaction amount must be greater than 0")
+                purchase_id = (await db.execute(
+                    insert(purchases).values(amount_total=purchase.amount_total).returning(purchases.c.id)
+                )).scalar_one()
+                await asyncio.sleep(0.05)  # Slow enough for duplicates to overlap
+                await db.commit()
+                return {"transaction": purchase_id, "points_earned": purchase.amount_total / 10}
+
+            if not idempotency_key:
+                return await process()
+
+            result, replayed = await store.run(
+                db,
+                USER,
+                idempotency_key,
+                IdempotencyStore.fingerprint("create_transaction", purchase.model_dump_json()),
+                process,
+            )
+            if replayed:
+                response.headers["Idempotent-Replayed"] = "true"
+            return result
+
+    return app
+
+
+async def _purchase_count(factory) -> int:
+    async with factory() as db:
+        return (await db.execute(select(func.count()).select_from(purchases))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_requests_process_once(factory):
+    calls = []
+    transport = ASGITransport(app=build_app(IdempotencyStore(), factory, calls))
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.post("/transactions", json={"amount_total": 100}, headers={"Idempotency-Key": "tab-17"})
+            for _ in range(10)
+        ))
+        retry = await client.post("/transactions", json={"amount_total": 100}, headers={"Idempotency-Key": "tab-17"})
+
+    assert len(calls) == 1
+    assert await _purchase_count(factory) == 1
+    assert {r.status_code for r in responses} <= {201, 409}
+    assert {r.text for r in responses if r.status_code == 201} == {retry.text}
+    assert all(r.headers["Retry-After"] for r in responses if r.status_code == 409)
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_retry_after_completion_replays_stored_result(factory):
+    calls = []
+    transport = ASGITransport(app=build_app(IdempotencyStore(), factory, calls))
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.post("/transactions", json={"amount_total": 50}, headers={"Idempotency-Key": "k"})
+        retry = await client.post("/transactions", json={"amount_total": 50}, headers={"Idempotency-Key": "k"})
+        other = await client.post("/transactions", json={"amount_total": 50}, headers={"Idempotency-Key": "k2"})
+
+    assert len(calls) == 2
+    assert retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert other.json() != first.json()
+
+
+@pytest.mark.asyncio
+async def test_key_reuse_with_different_body_is_rejected(factory):
+    calls = []
+    transport = ASGITransport(app=build_app(IdempotencyStore(), factory, calls))
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post("/transactions", json={"amount_total": 50}, headers={"Idempotency-Key": "k"})
+        reused = await client.post("/transactions", json={"amount_total": 60}, headers={"Idempotency-Key": "k"})
+
+    assert reused.status_code == 422
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_release_the_key(factory):
+    calls = []
+    transport = ASGITransport(app=build_app(IdempotencyStore(), factory, calls))
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        failed = await client.post("/transactions", json={"amount_total": 0}, headers={"Idempotency-Key": "bad"})
+        retry = await client.post("/transactions", json={"amount_total": 0}, headers={"Idempotency-Key": "bad"})
+
+    assert failed.status_code == retry.status_code == 400
+    assert len(calls) == 2
+    async with factory() as db:
+        assert (await db.execute(select(IdempotencyKey))).first() is None
+
+
+@pytest.mark.asyncio
+async def test_expired_keys_are_reclaimed_and_purged(factory):
+    store, calls = IdempotencyStore(), []
+
+    async def operation(db):
+        calls.append(1)
+        await db.commit()
+        return len(calls)
+
+    async def run():
+        async with factory() as db:
+            return await store.run(db, USER, "k", "f", lambda: operation(db))
+
+    assert await run() == (1, False)
+    assert await run() == (1, True)
+
+    async with factory() as db:
+        await db.execute(update(IdempotencyKey).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        await db.commit()
+    assert await run() == (2, False)
+
+    async with factory() as db:
+        assert await IdempotencyStore.purge_expired(db) == 0
+        await db.execute(update(IdempotencyKey).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        await db.commit()
+        assert await IdempotencyStore.purge_expired(db) == 1
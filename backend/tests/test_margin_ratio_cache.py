@@ -0,0 +1,77 @@
+"""
+Tests for the per-venue margin ratio cache.
+"""
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from app.services.margin_ratio_cache import MarginRatioCache
+
+
+class FakeVenue:
+    """Venue stand-in with the margin configuration the cache reads."""
+
+    def __init__(self, food, beverages, default):
+        self.id = uuid.uuid4()
+        self.food_margin_percent = Decimal(food)
+        self.beverage_margin_percent = Decimal(beverages)
+        self.default_margin_percent = Decimal(default)
+        self.margin_lookups = 0
+
+    def get_margin_for_category(self, category):
+        self.margin_lookups += 1
+        return {
+            "food": self.food_margin_percent,
+            "beverages": self.beverage_margin_percent,
+        }.get(category, self.default_margin_percent)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    MarginRatioCache.invalidate()
+    yield
+    MarginRatioCache.invalidate()
+
+
+def test_ratios_match_direct_division():
+    venue = FakeVenue("30.00", "80.00", "50.00")
+
+    assert MarginRatioCache.get_ratio(venue, "food") == Decimal("30.00") / Decimal("80.00")
+    assert MarginRatioCache.get_ratio(venue, "beverages") == Decimal("1")
+    assert MarginRatioCache.get_ratio(venue, None) == Decimal("50.00") / Decimal("80.00")
+
+
+def test_table_is_compiled_once_per_venue():
+    venue = FakeVenue("30.00", "80.00", "50.00")
+
+    for _ in range(100):
+        MarginRatioCache.get_ratio(venue, "food")
+        MarginRatioCache.get_ratio(venue, "beverages")
+
+    assert venue.margin_lookups == 3  # food, beverages, other
+
+
+def test_margin_change_recompiles():
+    venue = FakeVenue("30.00", "80.00", "50.00")
+    assert MarginRatioCache.get_ratio(venue, "food") == Decimal("0.375")
+
+    venue.beverage_margin_percent = Decimal("60.00")
+
+    assert MarginRatioCache.get_ratio(venue, "food") == Decimal("0.5")
+
+
+def test_uncommon_category_uses_other_ratio():
+    venue = FakeVenue("30.00", "80.00", "40.00")
+
+    assert MarginRatioCache.get_ratio(venue, "merch") == Decimal("0.5")
+    for i in range(100):
+        assert MarginRatioCache.get_ratio(venue, f"category-{i}") == MarginRatioCache.get_ratio(venue, "other")
+
+    assert venue.margin_lookups == 3
+    assert set(MarginRatioCache._tables[venue.id][1]) == {"food", "beverages", "other"}
+
+
+def test_zero_margins_use_safe_denominator():
+    venue = FakeVenue("0", "0", "0")
+    assert MarginRatioCache.get_ratio(venue, "food") == Decimal("0")
@@ -0,0 +1,112 @@
+"""
+Tests for the in-process metrics registry, its middleware and the
+multi-worker /metrics aggregation.
+"""
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.metrics import (
+    MetricsMiddleware,
+    MetricsRegistry,
+    QUERY_COUNT_BUCKETS,
+    instrument_engine,
+    labels,
+)
+
+
+def _registry(directory=None, pid=None):
+    registry = MetricsRegistry(directory, snapshot_seconds=5, pid=pid)
+    registry.counter("http_requests_total", "Requests")
+    registry.histogram("http_request_duration_seconds", "Latency", (0.1, 1.0))
+    registry.histogram("http_request_db_queries", "Queries", QUERY_COUNT_BUCKETS)
+    registry.histogram("http_request_db_seconds", "Query time", (0.1, 1.0))
+    registry.histogram("db_query_duration_seconds", "Statement latency", (0.1, 1.0))
+    registry.gauge("db_pool_checked_out", "Checked out")
+    return registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = _registry()
+    for value in (0.05, 0.1, 0.5, 3.0):
+        registry.observe("http_request_duration_seconds", value, labels(route="/venues"))
+
+    text_format = registry.render()
+
+    assert 'http_request_duration_seconds_bucket{route="/venues",le="0.1"} 2' in text_format
+    assert 'http_request_duration_seconds_bucket{route="/venues",le="1"} 3' in text_format
+    assert 'http_request_duration_seconds_bucket{route="/venues",le="+Inf"} 4' in text_format
+    assert 'http_request_duration_seconds_count{route="/venues"} 4' in text_format
+    assert "# TYPE http_request_duration_seconds histogram" in text_format
+
+
+def test_label_values_are_escaped():
+    assert labels(route='/a"b\\c') == 'route="/a\\"b\\\\c"'
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_route_templates_and_counts_queries(tmp_path):
+    registry = _registry()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine, "primary", registry)
+
+    api = FastAPI()
+
+    @api.get("/venues/{venue_id}")
+    async def venue(venue_id: int):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+        return {"id": venue_id}
+
+    app = MetricsMiddleware(api, registry)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        assert (await client.get("/venues/1")).status_code == 200
+        assert (await client.get("/venues/2")).status_code == 200
+        assert (await client.get("/nowhere")).status_code == 404
+    await engine.dispose()
+
+    merged = registry.collect()
+    route = labels(method="GET", route="/venues/{venue_id}")
+    assert merged["http_requests_total"] == {
+        labels(method="GET", route="/venues/{venue_id}", status=200): 2,
+        labels(method="GET", route="unmatched", status=404): 1,
+    }
+    counts, total = merged["http_request_db_queries"][route]
+    assert total == 4
+    assert counts[QUERY_COUNT_BUCKETS.index(2)] == 2
+    assert sum(merged["db_query_duration_seconds"][labels(engine="primary")][0]) >= 4
+
+
+def test_workers_are_summed_through_snapshot_files(tmp_path):
+    first = _registry(str(tmp_path), pid=101)
+    second = _registry(str(tmp_path), pid=102)
+    first.add_collector(lambda: {"db_pool_checked_out": {labels(engine="primary"): 3}})
+    second.add_collector(lambda: {"db_pool_checked_out": {labels(engine="primary"): 4}})
+
+    first.inc("http_requests_total", labels(route="/a"))
+    second.inc("http_requests_total", labels(route="/a"), 2)
+    second.observe("http_request_duration_seconds", 0.5, labels(route="/a"))
+    second.write_snapshot()
+
+    merged = first.collect()
+    assert merged["http_requests_total"][labels(route="/a")] == 3
+    assert merged["http_request_duration_seconds"][labels(route="/a")] == [[0, 1, 0], 0.5]
+    assert merged["db_pool_checked_out"][labels(engine="primary")] == 7
+
+
+def test_stale_worker_gauges_are_dropped_but_counters_kept(tmp_path):
+    first = _registry(str(tmp_path), pid=101)
+    exited = _registry(str(tmp_path), pid=102)
+    exited.add_collector(lambda: {"db_pool_checked_out": {labels(engine="primary"): 4}})
+    exited.inc("http_requests_total", labels(route="/a"), 5)
+
+    snapshot = exited.snapshot()
+    snapshot["time"] -= 60
+    exited.write_snapshot(snapshot)
+
+    merged = first.collect()
+    assert merged["http_requests_total"][labels(route="/a")] == 5
+    assert merged["db_pool_checked_out"] == {}
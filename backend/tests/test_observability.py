@@ -0,0 +1,126 @@
+"""
+Tests for the sampled LangFuse request tracing middleware and its batch exporter.
+"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.observability import LangfuseClient, LangfuseMiddleware, TraceExporter
+
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+
+async def slow(request):
+    await asyncio.sleep(0.05)
+    return PlainTextResponse("slow")
+
+
+async def unavailable(request):
+    return PlainTextResponse("down", status_code=503)
+
+
+async def boom(request):
+    raise RuntimeError("boom")
+
+
+def _build(monkeypatch, **options):
+    monkeypatch.setattr(LangfuseClient, "_enabled", True)
+    batches = []
+    exporter = TraceExporter(sink=batches.append, batch_size=2, flush_interval=60)
+    routes = [
+        Route("/ok", ok),
+        Route("/slow", slow),
+        Route("/unavailable", unavailable),
+        Route("/boom", boom),
+        Route("/api/checkout", ok),
+    ]
+    app = LangfuseMiddleware(Starlette(routes=routes), exporter=exporter, **options)
+    return app, exporter, batches
+
+
+@pytest.mark.asyncio
+async def test_unsampled_requests_only_keep_errors_and_slow(monkeypatch):
+    app, exporter, batches = _build(monkeypatch, sample_rate=0.0, route_sample_rates={}, slow_request_ms=40)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for _ in range(5):
+            assert (await client.get("/ok")).text == "ok"
+        await client.get("/slow")
+        await client.get("/unavailable")
+        with pytest.raises(RuntimeError):
+            await client.get("/boom")
+
+    await exporter.stop()
+    events = [event for batch in batches for event in batch]
+    kept = {event["name"]: (event["metadata"]["kept"], event["level"]) for event in events}
+    assert kept == {
+        "GET /slow": ("slow", "DEFAULT"),
+        "GET /unavailable": ("error", "ERROR"),
+        "GET /boom": ("error", "ERROR"),
+    }
+    assert app.sampled_out == 5
+    assert events[-1]["metadata"]["error"] == "boom"
+
+
+@pytest.mark.asyncio
+async def test_route_sample_rates_use_longest_prefix(monkeypatch):
+    app, exporter, batches = _build(
+        monkeypatch, sample_rate=0.0, route_sample_rates={"/": 0.0, "/api/": 1.0}
+    )
+    assert app.sample_rate_for("/api/checkout") == 1.0
+    assert app.sample_rate_for("/ok") == 0.0
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.get("/ok")
+        await client.get("/api/checkout?venue=1", headers={"Authorization": "Bearer x"})
+
+    await exporter.stop()
+    [event] = [event for batch in batches for event in batch]
+    assert event["name"] == "GET /api/checkout"
+    assert event["metadata"]["query_string"] == "venue=1"
+    assert event["metadata"]["user_id"] == "authenticated_user"
+
+
+@pytest.mark.asyncio
+async def test_exporter_sends_in_batches_off_the_request_path(monkeypatch):
+    app, exporter, batches = _build(monkeypatch, sample_rate=1.0, route_sample_rates={})
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for _ in range(5):
+            await client.get("/ok")
+        # A full batch wakes the flush task; the rest waits for the interval
+        await asyncio.sleep(0.05)
+        assert [len(batch) for batch in batches] == [2, 2]
+
+    await exporter.stop()
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert exporter.stats()["exported"] == 5
+
+
+@pytest.mark.asyncio
+async def test_exporter_drops_oldest_when_full():
+    exporter = TraceExporter(sink=lambda batch: None, batch_size=100, max_buffer=3)
+    for i in range(5):
+        exporter.add({"name": str(i)})
+
+    assert [event["name"] for event in exporter._buffer] == ["2", "3", "4"]
+    assert exporter.stats()["dropped"] == 2
+    await exporter.stop()
+
+
+@pytest.mark.asyncio
+async def test_disabled_middleware_passes_through(monkeypatch):
+    app, exporter, batches = _build(monkeypatch, sample_rate=1.0)
+    monkeypatch.setattr(LangfuseClient, "_enabled", False)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        assert (await client.get("/ok")).text == "ok"
+
+    await exporter.stop()
+    assert batches == []
@@ -0,0 +1,177 @@
+"""
+Tests for the keyset (cursor) pagination helpers.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.v1.endpoints.shifts import SHIFT_HISTORY_CURSOR_TYPES
+from app.db.pagination import (
+    after_key,
+    decode_cursor,
+    encode_cursor,
+    estimate_count,
+    key_types,
+    next_cursor,
+    order_by_key,
+)
+from app.models.transaction import Transaction
+
+
+START = datetime(2026, 6, 1, 20, 0)
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pages.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Transaction.__table__.create)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _walk(fetch, limit):
+    """Follow cursors from the first page to the last, returning every row."""
+    rows, cursor = [], None
+    while True:
+        page, cursor = await fetch(cursor, limit)
+        assert len(page) <= limit
+        rows.extend(page)
+        if cursor is None:
+            return rows
+
+
+def test_cursor_round_trip():
+    values = [datetime(2026, 6, 1, 20, 0, 5), uuid.uuid4(), Decimal("12.50"), True, "abc", 3]
+
+    cursor = encode_cursor("events", values)
+
+    assert decode_cursor(cursor, "events") == values
+    assert "=" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("transactions", [1, 2]), ""])
+def test_invalid_or_foreign_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "events", (int, int))
+
+    assert error.value.status_code == 400
+
+
+TRANSACTION_ORDER = ((Transaction.created_at, True), (Transaction.id, True))
+
+
+def _raw_cursor(kind, values):
+    """A cursor as a client could forge it: any JSON values."""
+    return base64.urlsafe_b64encode(json.dumps({"k": kind, "v": values}).encode()).decode()
+
+
+@pytest.mark.parametrize("values", [
+    ["x", "y"],  # Strings where a timestamp belongs
+    [{"dt": START.isoformat()}, 7],
+    [True, "id-1"],
+    [{"dt": START.isoformat()}, ["id-1"]],
+    [{"dt": START.isoformat()}],
+    [{"dt": START.isoformat()}, "id-1", "extra"],
+])
+def test_tampered_cursor_values_are_rejected(values):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(_raw_cursor("transactions", values), "transactions", key_types(TRANSACTION_ORDER))
+
+    assert error.value.status_code == 400
+
+
+def test_tampered_shift_cursor_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(_raw_cursor("shifts", ["x", "y"]), "shifts", SHIFT_HISTORY_CURSOR_TYPES)
+
+    assert error.value.status_code == 400
+
+
+def test_cursor_values_matching_the_sort_key_are_accepted():
+    values = [START, "id-1"]
+
+    assert decode_cursor(encode_cursor("transactions", values), "transactions", key_types(TRANSACTION_ORDER)) == values
+    assert decode_cursor(encode_cursor("shifts", [START, uuid.UUID(int=1)]), "shifts", SHIFT_HISTORY_CURSOR_TYPES)
+    assert decode_cursor(encode_cursor("customers", [3, None]), "customers", (Decimal, int))
+
+
+@pytest.mark.asyncio
+async def test_mixed_direction_keyset_matches_full_sort():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    rows = Table("rows", MetaData(), Column("id", Integer, primary_key=True), Column("a", Integer), Column("b", String))
+    async with engine.begin() as conn:
+        await conn.run_sync(rows.metadata.create_all)
+        await conn.execute(insert(rows), [{"id": i, "a": i % 3, "b": "xyz"[i % 4 % 3]} for i in range(40)])
+
+    sort_key = ((rows.c.a, True), (rows.c.b, False), (rows.c.id, True))
+    async with engine.connect() as conn:
+        expected = (await conn.execute(select(rows.c.id).order_by(*order_by_key(sort_key)))).scalars().all()
+
+        seen = []
+        last = None
+        while True:
+            query = select(rows).order_by(*order_by_key(sort_key)).limit(6)
+            if last is not None:
+                query = query.where(after_key(sort_key, (last.a, last.b, last.id)))
+            page = (await conn.execute(query)).all()
+            if not page:
+                break
+            seen.extend(row.id for row in page)
+            last = page[-1]
+    await engine.dispose()
+
+    assert seen == list(expected)
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_match_offset_order(factory):
+    async with factory() as db:
+        for i in range(23):
+            db.add(Transaction(
+                user_id="user-1", venue_id="venue-1", membership_id="membership-1", type="purchase",
+                points_earned=i, points_balance_after=i,
+                created_at=START + timedelta(minutes=i // 3),  # Three share each timestamp
+            ))
+        await db.commit()
+
+    sort_key = ((Transaction.created_at, True), (Transaction.id, True))
+    query = select(Transaction).where(Transaction.user_id == "user-1").order_by(*order_by_key(sort_key))
+
+    async with factory() as db:
+        everything = (await db.execute(query)).scalars().all()
+
+        async def fetch(cursor, limit):
+            page_query = query.limit(limit)
+            if cursor:
+                page_query = page_query.where(after_key(sort_key, decode_cursor(cursor, "transactions")))
+            page = (await db.execute(page_query)).scalars().all()
+            return page, next_cursor("transactions", page, limit, lambda t: (t.created_at, t.id))
+
+        walked = await _walk(fetch, 4)
+        estimated = await estimate_count(db, query)
+
+    assert [t.id for t in walked] == [t.id for t in everything]
+    assert len({t.id for t in walked}) == 23
+    assert estimated == 23
+
+
+@pytest.mark.asyncio
+async def test_estimate_count_of_textual_query(factory):
+    async with factory() as db:
+        db.add(Transaction(
+            user_id="user-1", venue_id="venue-1", membership_id="membership-1", type="purchase",
+            points_earned=1, points_balance_after=1,
+        ))
+        await db.commit()
+
+        count = await estimate_count(db, text("SELECT id FROM transactions WHERE user_id = :user_id"), {"user_id": "user-1"})
+
+    assert count == 1
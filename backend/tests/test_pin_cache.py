@@ -0,0 +1,85 @@
+"""
+Tests for the employee PIN verification cache.
+"""
+import uuid
+
+from app.core.pin_cache import PinVerificationCache
+
+
+EMPLOYEE = {"employee_name": "Mia", "employee_role": "bartender"}
+PIN_HASH = "$2b$12$storedhashstoredhashstoredhashstoredhashstoredhashst"
+
+
+def _cache(**kwargs):
+    return PinVerificationCache(ttl_seconds=kwargs.get("ttl_seconds", 60), max_entries=kwargs.get("max_entries", 10))
+
+
+def test_hit_after_successful_verification():
+    cache = _cache()
+    venue_id = uuid.uuid4()
+    cache.put(venue_id, "emp-1", "1234", PIN_HASH, EMPLOYEE)
+
+    assert cache.get(venue_id, "emp-1", "1234", PIN_HASH) == EMPLOYEE
+    assert cache.stats()["hits"] == 1
+
+
+def test_pin_is_not_stored_in_plaintext():
+    cache = _cache()
+    cache.put("venue", "emp-1", "1234", PIN_HASH, EMPLOYEE)
+
+    entry = next(iter(cache._entries.values()))
+    assert b"1234" not in entry["digest"]
+    assert "1234" not in repr(entry)
+    # Keyed per process: another cache computes a different digest
+    assert _cache()._digest("venue", "emp-1", "1234", PIN_HASH) != entry["digest"]
+
+
+def test_wrong_pin_misses_and_drops_entry():
+    cache = _cache()
+    cache.put("venue", "emp-1", "1234", PIN_HASH, EMPLOYEE)
+
+    assert cache.get("venue", "emp-1", "9999", PIN_HASH) is None
+    # The wrong guess also ended the shortcut for the right PIN
+    assert cache.get("venue", "emp-1", "1234", PIN_HASH) is None
+
+
+def test_changed_stored_pin_misses():
+    cache = _cache()
+    cache.put("venue", "emp-1", "1234", PIN_HASH, EMPLOYEE)
+
+    # Another worker set a new PIN: the row now holds a different hash
+    assert cache.get("venue", "emp-1", "1234", "$2b$12$newhash") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_scoped_by_venue_and_employee():
+    cache = _cache()
+    cache.put("venue-a", "emp-1", "1234", PIN_HASH, EMPLOYEE)
+
+    assert cache.get("venue-b", "emp-1", "1234", PIN_HASH) is None
+    assert cache.get("venue-a", "emp-2", "1234", PIN_HASH) is None
+
+
+def test_invalidation_and_race_guard():
+    cache = _cache()
+    cache.put("venue", "emp-1", "1234", PIN_HASH, EMPLOYEE)
+    cache.invalidate("venue", "emp-1")
+    assert cache.get("venue", "emp-1", "1234", PIN_HASH) is None
+
+    # A check that started before a PIN change must not cache the old PIN
+    generation = cache.generation()
+    cache.invalidate("venue", "emp-1")
+    cache.put("venue", "emp-1", "1234", PIN_HASH, EMPLOYEE, generation)
+    assert cache.stats()["entries"] == 0
+
+
+def test_expiry_and_bound():
+    cache = _cache(ttl_seconds=0)
+    cache.put("venue", "emp-1", "1234", PIN_HASH, EMPLOYEE)
+    assert cache.get("venue", "emp-1", "1234", PIN_HASH) is None
+
+    cache = _cache(max_entries=2)
+    for employee_id in ("emp-1", "emp-2", "emp-3"):
+        cache.put("venue", employee_id, "1234", PIN_HASH, EMPLOYEE)
+    assert cache.stats()["entries"] == 2
+    assert cache.get("venue", "emp-1", "1234", PIN_HASH) is None
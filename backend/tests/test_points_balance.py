@@ -0,0 +1,129 @@
+"""
+Tests for the atomic point balance updates under concurrent purchases.
+"""
+import asyncio
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.user_points import UserPoints
+from app.services.points_balance import PointsBalance
+from tests.sqlite_schema import create_tables
+
+
+USER = uuid.uuid4()
+VENUE = uuid.uuid4()
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'balances.db'}",
+        connect_args={"timeout": 30},  # Writers queue on SQLite's database lock
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(create_tables, UserPoints.__table__)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _balance(factory):
+    async with factory() as db:
+        return (await db.execute(
+            select(UserPoints).where(UserPoints.user_id == USER, UserPoints.venue_id == VENUE)
+        )).scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_earns_are_all_counted(factory):
+    async def earn():
+        async with factory() as db:
+            await PointsBalance.earn(db, USER, VENUE, Decimal("2.50"))
+            await db.commit()
+
+    await asyncio.gather(*(earn() for _ in range(20)))
+
+    [points] = await _balance(factory)
+    assert points.points_earned == Decimal("50.00")
+    assert points.points_available == Decimal("50.00")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_spends_never_overdraw(factory):
+    async with factory() as db:
+        await PointsBalance.earn(db, USER, VENUE, Decimal("30.00"))
+        await db.commit()
+
+    async def spend():
+        async with factory() as db:
+            spent = await PointsBalance.spend(db, USER, VENUE, Decimal("4.00"))
+            await db.commit()
+            return spent is not None
+
+    outcomes = await asyncio.gather(*(spend() for _ in range(20)))
+
+    [points] = await _balance(factory)
+    assert outcomes.count(True) == 7
+    assert points.points_spent == Decimal("28.00")
+    assert points.points_available == Decimal("2.00")
+
+
+@pytest.mark.asyncio
+async def test_spend_refreshes_loaded_balance(factory):
+    async with factory() as db:
+        loaded = await PointsBalance.earn(db, USER, VENUE, Decimal("10.00"))
+
+        assert await PointsBalance.spend(db, USER, VENUE, Decimal("25.00")) is None
+        spent = await PointsBalance.spend(db, USER, VENUE, Decimal("6.00"))
+
+        assert spent is loaded
+        assert loaded.points_available == Decimal("4.00")
+
+
+@pytest.mark.asyncio
+async def test_apply_many_adds_net_changes_in_one_statement(factory):
+    other_user, other_venue = uuid.uuid4(), uuid.uuid4()
+
+    async with factory() as db:
+        loaded = await PointsBalance.earn(db, USER, VENUE, Decimal("10.00"))
+        written = await PointsBalance.apply_many(db, {
+            (USER, VENUE): (Decimal("3.00"), Decimal("8.00")),
+            (other_user, VENUE): (Decimal("1.25"), Decimal("0")),
+            (USER, other_venue): (Decimal("0.50"), Decimal("0")),
+        })
+        await db.commit()
+
+        assert written[(USER, VENUE)] is loaded
+        assert loaded.points_earned == Decimal("13.00")
+        assert loaded.points_spent == Decimal("8.00")
+        assert loaded.points_available == Decimal("5.00")
+        assert written[(other_user, VENUE)].points_available == Decimal("1.25")
+        assert written[(USER, other_venue)].points_available == Decimal("0.50")
+        assert await PointsBalance.apply_many(db, {}) == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_apply_many_batches_are_all_counted(factory):
+    referrer = uuid.uuid4()
+
+    async def batch():
+        async with factory() as db:
+            await PointsBalance.apply_many(db, {
+                (USER, VENUE): (Decimal("2.00"), Decimal("0.50")),
+                (referrer, VENUE): (Decimal("0.25"), Decimal("0")),
+            })
+            await db.commit()
+
+    await asyncio.gather(*(batch() for _ in range(10)))
+
+    [points] = await _balance(factory)
+    assert points.points_earned == Decimal("20.00")
+    assert points.points_available == Decimal("15.00")
+    async with factory() as db:
+        credited = (await db.execute(
+            select(UserPoints.points_available).where(UserPoints.user_id == referrer)
+        )).scalar_one()
+    assert credited == Decimal("2.50")
@@ -0,0 +1,88 @@
+"""
+Tests for product-aware order points (prefetched products and their bonuses).
+"""
+import uuid
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+from app.services.margin_ratio_cache import MarginRatioCache
+from app.services.points_calculator import PointsCalculator
+
+
+class FakeVenue:
+    """Venue stand-in with the margin configuration points calculation reads."""
+
+    def __init__(self, multiplier="1.0"):
+        self.id = uuid.uuid4()
+        self.food_margin_percent = Decimal("30.00")
+        self.beverage_margin_percent = Decimal("80.00")
+        self.default_margin_percent = Decimal("50.00")
+        self.points_multiplier = Decimal(multiplier)
+
+    def get_margin_for_category(self, category):
+        return {
+            "food": self.food_margin_percent,
+            "beverages": self.beverage_margin_percent,
+        }.get(category, self.default_margin_percent)
+
+
+class FakeProduct:
+    def __init__(self, venue, category, multiplier=None):
+        self.id = uuid.uuid4()
+        self.venue_id = venue.id
+        self.category = category
+        self.is_bonus_active = multiplier is not None
+        self.effective_points_multiplier = multiplier
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    MarginRatioCache.invalidate()
+    yield
+    MarginRatioCache.invalidate()
+
+
+def _base(amount, venue, category):
+    return PointsCalculator.calculate_base_points(Decimal(amount), venue, category)
+
+
+def test_active_product_bonus_applies_per_line_item():
+    venue = FakeVenue()
+    double_drink = FakeProduct(venue, "beverages", multiplier=2.0)
+    plain_food = FakeProduct(venue, "food")
+    items = [
+        {"product_id": double_drink.id, "price": "4.50", "quantity": 2, "category": "other"},
+        {"product_id": plain_food.id, "price": "12.00", "quantity": 1, "category": "other"},
+    ]
+    products = {product.id: product for product in (double_drink, plain_food)}
+
+    points = PointsCalculator.calculate_order_points(Decimal("21.00"), venue, items, products)
+
+    # Product categories win over the item's category, and the bonus doubles its line
+    expected = _base("9.00", venue, "beverages") * 2 + _base("12.00", venue, "food")
+    assert points == expected.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def test_unknown_or_foreign_products_fall_back_to_item_category():
+    venue = FakeVenue(multiplier="1.5")
+    foreign = FakeProduct(FakeVenue(), "beverages", multiplier=3.0)
+    items = [
+        {"product_id": foreign.id, "price": "10.00", "quantity": 1, "category": "food"},
+        {"product_id": uuid.uuid4(), "price": "5.00", "quantity": 2, "category": "beverages"},
+        {"price": "2.00", "quantity": 1},
+    ]
+
+    points = PointsCalculator.calculate_order_points(Decimal("22.00"), venue, items, {foreign.id: foreign})
+    without_products = PointsCalculator.calculate_order_points(Decimal("22.00"), venue, items)
+
+    expected = _base("10.00", venue, "food") + _base("10.00", venue, "beverages") + _base("2.00", venue, "other")
+    assert points == (expected * Decimal("1.5")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    assert points == without_products
+
+
+def test_orders_without_items_use_the_default_margin():
+    venue = FakeVenue()
+
+    assert PointsCalculator.calculate_order_points(Decimal("20.00"), venue) == _base("20.00", venue, None)
+    assert PointsCalculator.calculate_order_points(Decimal("0"), venue, [{"price": "5.00"}]) == Decimal("0.00")
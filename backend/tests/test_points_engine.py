@@ -0,0 +1,84 @@
+"""
+Tests for the vectorized points engine.
+
+Each result must equal the Decimal formula used by
+PointsCalculator.calculate_base_points / calculate_order_points, to the cent.
+"""
+import random
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+
+import numpy as np
+
+from app.services.points_engine import PointsEngine
+
+BASE_RATE = Decimal("0.10")
+
+
+def reference_base_points(amount: Decimal, category_margin: Decimal, highest_margin: Decimal) -> Decimal:
+    """calculate_base_points arithmetic with the margins already resolved."""
+    if amount <= 0:
+        return Decimal("0.00")
+    margin_ratio = Decimal(category_margin) / Decimal(highest_margin)
+    return (amount * BASE_RATE * margin_ratio).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def run_engine(amounts, margins, highs):
+    ratios = [Fraction(m) / Fraction(h) for m, h in zip(margins, highs)]
+    return PointsEngine.base_points_cents(
+        np.array(amounts, dtype=np.int64),
+        np.array([r.numerator for r in ratios], dtype=np.int64),
+        np.array([r.denominator for r in ratios], dtype=np.int64),
+        BASE_RATE,
+    )
+
+
+def test_base_points_match_decimal_formula():
+    """Random amounts and Numeric(5,2) margins agree with the Decimal path."""
+    rng = random.Random(42)
+    amounts = [rng.randint(-500, 500_000) for _ in range(20_000)]
+    margins = [Decimal(rng.randint(0, 10_000)).scaleb(-2) for _ in amounts]
+    highs = [max(m, Decimal(rng.randint(1, 10_000)).scaleb(-2)) for m in margins]
+
+    points = run_engine(amounts, margins, highs)
+
+    for amount, margin, high, result in zip(amounts, margins, highs, points):
+        expected = reference_base_points(Decimal(amount).scaleb(-2), margin, high)
+        assert int(result) == int(expected.scaleb(2)), (amount, margin, high)
+
+
+def test_exact_half_cent_ties_follow_decimal_rounding():
+    """Odd multiples of €0.15 at a 1/3 margin ratio land exactly on half a cent."""
+    amounts = [15 * k for k in range(1, 200)]
+    margins = [Decimal("10.00")] * len(amounts)
+    highs = [Decimal("30.00")] * len(amounts)
+
+    points = run_engine(amounts, margins, highs)
+
+    for amount, result in zip(amounts, points):
+        expected = reference_base_points(Decimal(amount).scaleb(-2), Decimal("10.00"), Decimal("30.00"))
+        assert int(result) == int(expected.scaleb(2))
+
+
+def test_non_positive_amounts_earn_nothing():
+    points = run_engine([0, -100], [Decimal("50.00")] * 2, [Decimal("80.00")] * 2)
+    assert points.tolist() == [0, 0]
+
+
+def test_multiplier_matches_decimal_quantize():
+    rng = random.Random(7)
+    points = np.array([rng.randint(-1_000, 1_000_000) for _ in range(5_000)], dtype=np.int64)
+
+    for multiplier in (Decimal("1.00"), Decimal("1.25"), Decimal("0.33"), Decimal("2.5"), 1.1):
+        result = PointsEngine.apply_multiplier_cents(points, multiplier)
+        for value, got in zip(points, result):
+            expected = (Decimal(int(value)).scaleb(-2) * Decimal(multiplier)).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            )
+            assert int(got) == int(expected.scaleb(2)), (value, multiplier)
+
+
+def test_to_cents_flags_sub_cent_amounts():
+    assert PointsEngine.to_cents(Decimal("12.34")) == (1234, True)
+    assert PointsEngine.to_cents(4.5) == (450, True)
+    assert PointsEngine.to_cents(Decimal("1.005"))[1] is False
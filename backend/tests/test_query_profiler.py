@@ -0,0 +1,135 @@
+"""
+Tests for the per-request SQL profiler, its N+1 detection and the query
+budget plugin.
+"""
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.query_profiler import QueryProfiler, QueryProfilerMiddleware, statement_shape
+
+pytest_plugins = ["pytester"]
+
+
+def test_statement_shape_ignores_values():
+    assert statement_shape("SELECT * FROM breaks WHERE shift_id = $1") == statement_shape(
+        "SELECT * FROM breaks  WHERE shift_id = $2"
+    )
+    assert statement_shape("SELECT a FROM t WHERE id IN (?, ?, ?) LIMIT 10") == (
+        "SELECT a FROM t WHERE id IN (?) LIMIT ?"
+    )
+    assert statement_shape("SELECT level_1_referrer_id::uuid FROM c WHERE x = 'it''s'") == (
+        "SELECT level_1_referrer_id::uuid FROM c WHERE x = ?"
+    )
+
+
+@pytest.fixture
+async def profiled_app(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}")
+    profiler = QueryProfiler()
+    profiler.enable(engine)
+
+    api = FastAPI()
+
+    @api.get("/referrals/{user_id}")
+    async def referral_chain(user_id: int):
+        # One query per level: the N+1 pattern the profiler should flag
+        async with engine.connect() as conn:
+            for level in range(1, 6):
+                await conn.execute(text("SELECT :level AS level"), {"level": level})
+        return {"levels": 5}
+
+    @api.get("/single")
+    async def single():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return {}
+
+    yield QueryProfilerMiddleware(api, profiler), profiler
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_middleware_reports_repeated_statements(profiled_app, monkeypatch):
+    app, profiler = profiled_app
+    monkeypatch.setattr(settings, "DEBUG", True)
+    profiles = []
+    profiler.request_hooks.append(profiles.append)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/referrals/7")
+        single = await client.get("/single")
+
+    assert response.headers["x-query-count"] == "5"
+    assert response.headers["x-query-repeated"] == "5x SELECT ? AS level"
+    assert "x-query-repeated" not in single.headers
+    assert [profile.label for profile in profiles] == ["GET /referrals/{user_id}", "GET /single"]
+
+
+@pytest.mark.asyncio
+async def test_no_headers_without_debug(profiled_app, monkeypatch):
+    app, _ = profiled_app
+    monkeypatch.setattr(settings, "DEBUG", False)
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/referrals/7")
+
+    assert "x-query-count" not in response.headers
+
+
+def test_query_budget_plugin(pytester, monkeypatch):
+    # A separate process, so the inner run cannot close this session's event loop
+    monkeypatch.setenv("PYTHONPATH", str(Path(__file__).resolve().parents[1]))
+    pytester.makeconftest('pytest_plugins = ["tests.query_budget"]')
+    pytester.makepyfile(
+        """
+        import pytest
+        from sqlalchemy import text
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        async def run(engine, count):
+            async with engine.connect() as conn:
+                for _ in range(count):
+                    await conn.execute(text("SELECT 1"))
+
+        @pytest.mark.asyncio
+        async def test_within_budget(query_budget, tmp_path):
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'a.db'}")
+            with query_budget(3, engine=engine) as profile:
+                await run(engine, 3)
+            assert profile.count == 3
+            await engine.dispose()
+
+        @pytest.mark.asyncio
+        async def test_over_budget(query_budget, tmp_path):
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'b.db'}")
+            try:
+                with query_budget(max_repeats=2, engine=engine):
+                    await run(engine, 4)
+            finally:
+                await engine.dispose()
+
+        @pytest.fixture
+        async def query_budget_engines(tmp_path):
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'c.db'}")
+            yield (engine,)
+            await engine.dispose()
+
+        @pytest.mark.query_budget(1)
+        @pytest.mark.asyncio
+        async def test_marker_over_budget(query_budget_engines):
+            await run(query_budget_engines[0], 2)
+        """
+    )
+    result = pytester.runpytest_subprocess("-p", "no:cacheprovider", "--asyncio-mode=auto", "-o", "addopts=")
+
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines([
+        "*statement shapes repeated more than 2x*",
+        "*2 queries (budget 1)*",
+    ])
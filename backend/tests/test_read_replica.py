@@ -0,0 +1,113 @@
+"""
+Tests for read-replica routing, with two SQLite files standing in for the
+primary and the replica.
+"""
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db import session as db_session
+from app.db.session import ReadReplicaRouter, get_db, get_read_db
+
+
+async def _make_database(path, name):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE source (name TEXT)"))
+        await conn.execute(text("INSERT INTO source VALUES (:name)"), {"name": name})
+    return engine
+
+
+@pytest.fixture
+async def databases(tmp_path):
+    primary = await _make_database(tmp_path / "primary.db", "primary")
+    replica = await _make_database(tmp_path / "replica.db", "replica")
+    yield primary, replica
+    await primary.dispose()
+    await replica.dispose()
+
+
+def _factory(engine):
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def router(databases, monkeypatch):
+    primary, replica = databases
+    router = ReadReplicaRouter(_factory(primary), _factory(replica), read_your_writes_seconds=60)
+    monkeypatch.setattr(db_session, "read_router", router)
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", _factory(primary))
+    return router
+
+
+@pytest.fixture
+def client(router):
+    app = FastAPI()
+
+    @app.get("/source")
+    async def read_source(db: AsyncSession = Depends(get_read_db)):
+        return {"source": (await db.execute(text("SELECT name FROM source"))).scalar_one()}
+
+    @app.post("/write")
+    async def write(db: AsyncSession = Depends(get_db)):
+        return {"source": (await db.execute(text("SELECT name FROM source"))).scalar_one()}
+
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(client, router):
+    async with client:
+        response = await client.get("/source", headers={"Authorization": "Bearer a"})
+
+    assert response.json() == {"source": "replica"}
+    assert router.stats()["replica_reads"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_reads_its_own_writes_from_primary(client):
+    alice = {"Authorization": "Bearer alice"}
+    bob = {"Authorization": "Bearer bob"}
+
+    async with client:
+        assert (await client.post("/write", headers=alice)).json() == {"source": "primary"}
+        assert (await client.get("/source", headers=alice)).json() == {"source": "primary"}
+        # Other clients keep reading from the replica
+        assert (await client.get("/source", headers=bob)).json() == {"source": "replica"}
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_window_expires(router):
+    router.read_your_writes_seconds = 0
+    router.record_write("client")
+
+    assert not router.wrote_recently("client")
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_to_primary(databases, tmp_path):
+    primary, _ = databases
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReadReplicaRouter(_factory(primary), _factory(broken), retry_seconds=60)
+
+    for _ in range(2):
+        async with await router.open_session() as session:
+            assert (await session.execute(text("SELECT name FROM source"))).scalar_one() == "primary"
+
+    # One failed attempt, then the replica is skipped until the retry period ends
+    assert router.stats()["fallbacks"] == 1
+    assert router.stats()["replica_available"] is False
+    await broken.dispose()
+
+
+@pytest.mark.asyncio
+async def test_without_replica_everything_reads_primary(databases):
+    primary, _ = databases
+    router = ReadReplicaRouter(_factory(primary))
+    router.record_write("client")
+
+    async with await router.open_session("client") as session:
+        assert (await session.execute(text("SELECT name FROM source"))).scalar_one() == "primary"
+    assert router.stats()["primary_reads"] == 1
@@ -0,0 +1,114 @@
+"""
+Tests for the SMS outbox and its delivery worker, using the fake transport.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.sms import FakeSMSTransport
+from app.models.sms_outbox import SmsOutboxMessage, SmsOutboxStatus
+from app.services.sms_outbox import SmsOutboxService, SmsOutboxWorker
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SmsOutboxMessage.__table__.create)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _enqueue(factory, phone_number, kind="verification", body="code", expires_at=None):
+    async with factory() as db:
+        await SmsOutboxService.enqueue(db, phone_number, kind, body, expires_at)
+        await db.commit()
+
+
+async def _statuses(factory):
+    async with factory() as db:
+        result = await db.execute(select(SmsOutboxMessage).order_by(SmsOutboxMessage.id))
+        return [(m.phone_number, m.body, m.status, m.attempts) for m in result.scalars().all()]
+
+
+@pytest.mark.asyncio
+async def test_worker_delivers_queued_messages(factory):
+    transport = FakeSMSTransport()
+    worker = SmsOutboxWorker(factory, transport, concurrency=2, batch_size=3)
+    for i in range(5):
+        await _enqueue(factory, f"+49170000000{i}")
+
+    assert await worker.drain() == 5
+    assert len(transport.sent) == 5
+    assert {status for _, _, status, _ in await _statuses(factory)} == {SmsOutboxStatus.SENT}
+
+
+@pytest.mark.asyncio
+async def test_newer_message_supersedes_pending_one_for_same_number(factory):
+    transport = FakeSMSTransport()
+    await _enqueue(factory, "+4917000000001", body="old code")
+    await _enqueue(factory, "+4917000000001", body="new code")
+    await _enqueue(factory, "+4917000000001", kind="welcome", body="welcome")
+
+    await SmsOutboxWorker(factory, transport).drain()
+
+    assert sorted(body for _, body in transport.sent) == ["new code", "welcome"]
+    assert (await _statuses(factory))[0][2] == SmsOutboxStatus.SUPERSEDED
+
+
+@pytest.mark.asyncio
+async def test_failures_retry_with_backoff_then_give_up(factory, monkeypatch):
+    monkeypatch.setattr(settings, "SMS_MAX_ATTEMPTS", 3)
+    transport = FakeSMSTransport(failure_rate=1.0)
+    worker = SmsOutboxWorker(factory, transport)
+    await _enqueue(factory, "+4917000000001")
+
+    for attempt in range(1, 4):
+        assert await worker.drain() == 1
+        # Not due again until the backoff has passed
+        assert await worker.drain() == 0
+        async with factory() as db:
+            message = (await db.execute(select(SmsOutboxMessage))).scalar_one()
+            if attempt < 3:
+                assert message.status == SmsOutboxStatus.PENDING
+                assert message.next_attempt_at > datetime.utcnow()
+            await db.execute(update(SmsOutboxMessage).values(next_attempt_at=datetime.utcnow()))
+            await db.commit()
+
+    assert (await _statuses(factory))[0][2:] == (SmsOutboxStatus.FAILED, 3)
+    assert transport.failures == 3
+
+
+@pytest.mark.asyncio
+async def test_expired_messages_are_not_sent(factory):
+    transport = FakeSMSTransport()
+    await _enqueue(factory, "+4917000000001", expires_at=datetime.utcnow() - timedelta(seconds=1))
+
+    assert await SmsOutboxWorker(factory, transport).drain() == 0
+    assert transport.sent == []
+    assert (await _statuses(factory))[0][2] == SmsOutboxStatus.EXPIRED
+
+
+@pytest.mark.asyncio
+async def test_send_concurrency_is_bounded(factory):
+    in_flight = 0
+    peak = 0
+
+    class CountingTransport(FakeSMSTransport):
+        async def send(self, phone_number, body):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await super().send(phone_number, body)
+
+    for i in range(12):
+        await _enqueue(factory, f"+4917000000{i:02d}")
+
+    await SmsOutboxWorker(factory, CountingTransport(), concurrency=3, batch_size=12).drain()
+    assert peak == 3
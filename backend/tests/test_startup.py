@@ -0,0 +1,95 @@
+"""
+Startup budget: importing the app and serving the first request stays fast,
+and optional integrations (Twilio, LangFuse, geopy) load on first use only.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Generous by default (CI machines vary); tighten locally with the env var
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "5"))
+
+LAZY_MODULES = ("langfuse", "geopy", "twilio.rest")
+
+STARTUP_SCRIPT = """
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+from httpx import AsyncClient
+
+async def first_request():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        return (await client.get("/health")).status_code
+
+status = asyncio.run(first_request())
+print(json.dumps({
+    "import": imported - started,
+    "first_request": time.perf_counter() - started,
+    "status": status,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def _measure_startup(tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'startup.db'}",
+        "PYTHONPATH": str(BACKEND_DIR),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT % (LAZY_MODULES,)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_and_first_request_within_budget(tmp_path):
+    timings = _measure_startup(tmp_path)
+
+    assert timings["status"] == 200
+    assert timings["first_request"] < STARTUP_BUDGET_SECONDS, timings
+
+
+def test_optional_integrations_are_not_imported_at_startup(tmp_path):
+    assert _measure_startup(tmp_path)["loaded"] == []
+
+
+def test_precomputed_openapi_schema_is_served(tmp_path):
+    schema = {"openapi": "3.1.0", "info": {"title": "precomputed", "version": "1"}, "paths": {}}
+    schema_path = tmp_path / "openapi.json"
+    schema_path.write_text(json.dumps(schema))
+
+    script = (
+        "import asyncio, json\n"
+        "from httpx import AsyncClient\n"
+        "from app.main import app\n"
+        "async def main():\n"
+        "    async with AsyncClient(app=app, base_url='http://test') as client:\n"
+        "        print(json.dumps((await client.get('/openapi.json')).json()))\n"
+        "asyncio.run(main())\n"
+    )
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'startup.db'}",
+        "PYTHONPATH": str(BACKEND_DIR),
+        "OPENAPI_SCHEMA_PATH": str(schema_path),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == schema
@@ -0,0 +1,123 @@
+"""
+Tests for compiled per-venue tier configurations and tier resolution.
+"""
+import json
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.tier_config_cache import CompiledTiers, TierConfigCache
+
+
+def _config(*tiers):
+    return json.dumps({"tiers": [
+        {"name": name, "min_points": points, "color": "#000", "benefits": [], "min_visits": visits}
+        for name, points, visits in tiers
+    ]})
+
+
+class FakeVenue:
+    def __init__(self, tier_config=None):
+        self.id = str(uuid.uuid4())
+        self.tier_config = tier_config
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    TierConfigCache.invalidate()
+    yield
+    TierConfigCache.invalidate()
+
+
+def _linear_scan(raw_tiers, points, visits):
+    """Reference: highest tier whose points and visits (and every lower tier's visits) are met."""
+    reached = None
+    required_visits = 0
+    for name, min_points, min_visits in sorted(raw_tiers, key=lambda tier: tier[1]):
+        required_visits = max(required_visits, min_visits)
+        if min_points <= points and required_visits <= visits:
+            reached = name
+    return reached
+
+
+def test_default_tiers_resolve_by_points():
+    tiers = TierConfigCache.compile(None)
+
+    assert [level.name for level in tiers.levels] == ["bronze", "silver", "gold", "platinum"]
+    assert tiers.resolve_tier(0).tier.name == "bronze"
+    assert tiers.resolve_tier(999).tier.name == "bronze"
+    assert tiers.resolve_tier(1000).tier.name == "silver"
+    assert tiers.resolve_tier(20000).tier.name == "platinum"
+
+
+def test_resolution_matches_linear_scan():
+    raw_tiers = [("gold", 500, 10), ("entry", 0, 0), ("silver", 100, 3), ("vip", 2000, 5)]
+    tiers = TierConfigCache.compile(_config(*raw_tiers))
+
+    for points in range(0, 2500, 7):
+        for visits in range(0, 15):
+            resolved = tiers.resolve_tier(points, visits)
+            assert (resolved.tier.name if resolved else None) == _linear_scan(raw_tiers, points, visits)
+
+
+def test_visit_requirements_are_cumulative():
+    tiers = TierConfigCache.compile(_config(("entry", 0, 0), ("silver", 100, 5), ("gold", 500, 2)))
+
+    assert tiers.min_visits == (0, 5, 5)
+    assert tiers.resolve_tier(600, 3).tier.name == "entry"
+    assert tiers.resolve_tier(600, 5).tier.name == "gold"
+    assert tiers.resolve_tier(600).tier.name == "gold"  # Visits ignored
+
+
+def test_progress_towards_next_tier():
+    tiers = TierConfigCache.compile(_config(("entry", 0, 0), ("silver", 100, 0)))
+
+    assert tiers.resolve_tier(25).progress == pytest.approx(0.25)
+    assert tiers.resolve_tier(150).progress == 1.0
+    assert tiers.resolve_tier(150).level == 1
+
+
+def test_points_below_entry_tier_resolve_to_none():
+    tiers = TierConfigCache.compile(_config(("silver", 100, 0)))
+
+    assert tiers.resolve_tier(99) is None
+
+
+def test_invalid_config_falls_back_to_default():
+    assert TierConfigCache.compile("{not json") is TierConfigCache.default()
+    assert TierConfigCache.compile(json.dumps({"tiers": [{"name": "x"}]})) is TierConfigCache.default()
+
+
+def test_compiled_once_per_configuration():
+    venue = FakeVenue(_config(("entry", 0, 0), ("silver", 100, 0)))
+
+    first = TierConfigCache.get(venue)
+    assert TierConfigCache.get(venue) is first
+
+    venue.tier_config = _config(("entry", 0, 0), ("silver", 50, 0))
+    assert TierConfigCache.resolve_tier(venue, 60).tier.name == "silver"
+
+
+def test_compile_rows_from_venue_tier_configs():
+    def row(level, name, points, visits):
+        return SimpleNamespace(
+            tier_level=level, tier_name=name, points_required=Decimal(points), visits_required=visits,
+            tier_color="#fff", perks=["perk"], discount_percent=Decimal("5.00"), points_multiplier=Decimal("1.50"),
+        )
+
+    tiers = TierConfigCache.compile_rows([row(2, "Silver", "1000", 5), row(1, "Bronze", "0", 0)])
+
+    assert [level.name for level in tiers.levels] == ["Bronze", "Silver"]
+    assert tiers.levels[0].max_points == 999
+    assert tiers.resolve_tier(Decimal("1500"), 4).tier.name == "Bronze"
+    assert tiers.resolve_tier(Decimal("1500"), 5).tier.name == "Silver"
+
+
+def test_compiled_tiers_are_read_only():
+    tiers = CompiledTiers([])
+
+    assert tiers.resolve_tier(100) is None
+    with pytest.raises(AttributeError):
+        tiers.extra = 1
@@ -0,0 +1,149 @@
+"""
+Tests for the authenticated-user cache.
+"""
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import event_rsvp, transaction, venue, venue_membership  # noqa: F401  (User relationships)
+from app.models.user import User
+from app.core.user_cache import UserCache, user_cache
+
+
+@pytest.fixture
+async def sessions():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        db.add(User(id="u1", email="a@example.com", username="anna", hashed_password="x"))
+        await db.commit()
+
+    user_cache.invalidate()
+    yield factory, statements
+    user_cache.invalidate()
+    await engine.dispose()
+
+
+async def _load(factory, cache, user_id="u1", issued_at=1):
+    """What get_current_user does: cache first, then the database."""
+    async with factory() as db:
+        user = await cache.get(db, user_id, issued_at)
+        if user is None:
+            generation = cache.generation()
+            user = (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+            cache.put(user, issued_at, generation)
+        return user
+
+
+@pytest.mark.asyncio
+async def test_hit_skips_database_read(sessions):
+    factory, statements = sessions
+    cache = UserCache(ttl_seconds=60, max_entries=10)
+
+    await _load(factory, cache)
+    statements.clear()
+    user = await _load(factory, cache)
+
+    assert statements == []
+    assert user.username == "anna"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_cached_user_can_be_modified_and_saved(sessions):
+    factory, _ = sessions
+
+    await _load(factory, user_cache)
+    async with factory() as db:
+        user = await user_cache.get(db, "u1", 1)
+        assert user in db
+        user.full_name = "Anna Example"
+        await db.commit()
+
+    async with factory() as db:
+        assert (await db.get(User, "u1")).full_name == "Anna Example"
+
+    # The update invalidated the entry, so the next lookup sees the new name
+    assert (await _load(factory, user_cache)).full_name == "Anna Example"
+
+
+@pytest.mark.asyncio
+async def test_deactivation_and_deletion_invalidate(sessions):
+    factory, _ = sessions
+    await _load(factory, user_cache, issued_at=1)
+    await _load(factory, user_cache, issued_at=2)
+    assert user_cache.stats()["entries"] == 2
+
+    async with factory() as db:
+        (await db.get(User, "u1")).is_active = False
+        await db.commit()
+    assert user_cache.stats()["entries"] == 0
+    assert (await _load(factory, user_cache)).is_active is False
+
+    async with factory() as db:
+        user = await db.get(User, "u1")
+        # No related rows (their tables need PostgreSQL types), so skip cascade loads
+        for relationship in User.__mapper__.relationships:
+            set_committed_value(user, relationship.key, [])
+        await db.delete(user)
+        await db.commit()
+    async with factory() as db:
+        assert await user_cache.get(db, "u1", 1) is None
+
+
+@pytest.mark.asyncio
+async def test_lookup_between_flush_and_commit_is_dropped_on_commit(sessions):
+    factory, _ = sessions
+
+    async with factory() as reader:
+        committed = await reader.get(User, "u1")
+
+    async with factory() as db:
+        (await db.get(User, "u1")).is_active = False
+        await db.flush()
+        # Another request misses the cache now and reads the committed, still active row
+        user_cache.put(committed, 1, user_cache.generation())
+        assert user_cache.stats()["entries"] == 1
+        await db.commit()
+
+    assert user_cache.stats()["entries"] == 0
+    assert (await _load(factory, user_cache)).is_active is False
+
+
+@pytest.mark.asyncio
+async def test_lookup_racing_an_invalidation_is_not_stored(sessions):
+    factory, _ = sessions
+    cache = UserCache(ttl_seconds=60, max_entries=10)
+
+    async with factory() as db:
+        generation = cache.generation()
+        user = await db.get(User, "u1")
+        cache.invalidate("u1")  # e.g. a profile update committed meanwhile
+        cache.put(user, 1, generation)
+
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_are_bounded(sessions):
+    factory, _ = sessions
+    cache = UserCache(ttl_seconds=0, max_entries=10)
+    await _load(factory, cache)
+    async with factory() as db:
+        assert await cache.get(db, "u1", 1) is None
+
+    cache = UserCache(ttl_seconds=60, max_entries=2)
+    for issued_at in range(3):
+        await _load(factory, cache, issued_at=issued_at)
+    assert cache.stats()["entries"] == 2
+    async with factory() as db:
+        assert await cache.get(db, "u1", 0) is None
+        assert await cache.get(db, "u1", 2) is not None
@@ -0,0 +1,178 @@
+"""
+Tests for the venue catalog snapshot cache and the ETag/304 handling of the
+venue endpoints.
+"""
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.v1.endpoints import venues
+from app.core.deps import get_current_user, get_read_db
+from app.core.query_profiler import QueryProfilerMiddleware
+from app.core.venue_catalog import ALL_VENUES, VenueCatalogCache, venue_catalog
+from app.models.product import Product
+from app.models.venue import Venue
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'catalog.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Venue.__table__.create)
+        await conn.run_sync(Product.__table__.create)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as db:
+        db.add(Venue(
+            id="venue-1", name="Schlachthof", type="club", owner_id="owner-1", address="Murnaustr. 1",
+            postal_code="65189", latitude=50.07, longitude=8.25,
+        ))
+        db.add(Product(id="product-1", venue_id="venue-1", name="Apfelschorle", category="drink", price=3.5))
+        await db.commit()
+
+    venue_catalog.invalidate()
+    yield factory
+    venue_catalog.invalidate()
+    await engine.dispose()
+
+
+@pytest.fixture
+def app(factory):
+    app = FastAPI()
+    app.add_middleware(QueryProfilerMiddleware)  # Per-request budgets (query_budget marker)
+    app.include_router(venues.router, prefix="/venues")
+    app.state.user = FakeUser("owner-1")
+
+    async def read_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_read_db] = read_db
+    app.dependency_overrides[get_current_user] = lambda: app.state.user
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return AsyncClient(app=app, base_url="http://test")
+
+
+@pytest.fixture
+def query_budget_engines(factory):
+    return (factory.kw["bind"],)
+
+
+def test_etag_is_strong_and_content_based():
+    cache = VenueCatalogCache(ttl_seconds=60, max_entries=10)
+
+    etag = cache.put(("detail", "a"), b'{"id":"a"}').etag
+
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert etag == VenueCatalogCache(ttl_seconds=60, max_entries=10).etag(b'{"id":"a"}')
+    assert etag != cache.etag(b'{"id":"b"}')
+
+
+def test_invalidation_drops_the_venue_and_list_pages_only():
+    cache = VenueCatalogCache(ttl_seconds=60, max_entries=10)
+    cache.put(("detail", "a"), b"a")
+    cache.put(("products", "a", None, None), b"a products")
+    cache.put(("detail", "b"), b"b")
+    cache.put(("list", ALL_VENUES, None, None, 20, 0), b"list")
+
+    cache.invalidate("a")
+
+    assert cache.get(("detail", "a")) is None
+    assert cache.get(("products", "a", None, None)) is None
+    assert cache.get(("list", ALL_VENUES, None, None, 20, 0)) is None
+    assert cache.get(("detail", "b")).body == b"b"
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = VenueCatalogCache(ttl_seconds=60, max_entries=10)
+    version = cache.version()
+    cache.invalidate("a")
+
+    cache.put(("detail", "a"), b"old", version)
+
+    assert cache.get(("detail", "a")) is None
+
+
+@pytest.mark.asyncio
+async def test_matching_if_none_match_gets_304_without_queries(client, factory, query_budget):
+    async with client:
+        first = await client.get("/venues/venue-1")
+        assert first.status_code == 200
+        assert first.json()["name"] == "Schlachthof"
+        etag = first.headers["etag"]
+
+        with query_budget(0, engine=factory.kw["bind"]):
+            cached = await client.get("/venues/venue-1")
+            revalidated = await client.get("/venues/venue-1", headers={"If-None-Match": etag})
+
+    assert cached.content == first.content
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_product_write_changes_etag(client, factory):
+    async with client:
+        first = await client.get("/venues/venue-1/products")
+        assert first.json()["total"] == 1
+
+        async with factory() as db:
+            product = (await db.execute(select(Product).where(Product.id == "product-1"))).scalar_one()
+            product.has_bonus = True
+            await db.commit()
+
+        second = await client.get("/venues/venue-1/products", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 200
+    assert second.json()["products"][0]["has_bonus"] is True
+    assert second.headers["etag"] != first.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_cached_tier_config_still_requires_the_owner(app, client):
+    async with client:
+        assert (await client.get("/venues/venue-1/tier-config")).status_code == 200
+
+        app.state.user = FakeUser("someone-else")
+        assert (await client.get("/venues/venue-1/tier-config")).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_missing_venue_is_not_cached(client):
+    async with client:
+        assert (await client.get("/venues/nope")).status_code == 404
+
+    assert venue_catalog.get(("detail", "nope")) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(2, max_repeats=1)
+async def test_venue_list_queries_do_not_grow_with_the_page(client, factory, query_budget_engines):
+    async with factory() as db:
+        db.add_all([
+            Venue(
+                id=f"venue-{n}", name=f"Bar {n}", type="bar", owner_id="owner-1", address="Langgasse 1",
+                postal_code="65183", latitude=50.08 + n / 1000, longitude=8.24,
+            )
+            for n in range(2, 12)
+        ])
+        await db.commit()
+
+    async with client:
+        listed = await client.get("/venues", params={"limit": 20})
+        nearby = await client.get("/venues", params={"lat": 50.08, "lng": 8.24, "limit": 20})
+
+    assert len(listed.json()["venues"]) == 11
+    assert [venue["id"] for venue in nearby.json()["venues"]][:3] == ["venue-2", "venue-3", "venue-4"]
@@ -0,0 +1,104 @@
+"""
+Tests for the append-only venue counters: record, compact, read totals.
+"""
+import asyncio
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.venue import Venue
+from app.models.venue_stat_delta import VenueStatDelta
+from app.services.venue_counters import VenueCounterCompactor, VenueCounters
+from tests.sqlite_schema import create_tables
+
+
+VENUE_A = uuid.uuid4()
+VENUE_B = uuid.uuid4()
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'counters.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(create_tables, Venue.__table__, VenueStatDelta.__table__)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as db:
+        for venue_id in (VENUE_A, VENUE_B):
+            db.add(Venue(
+                id=str(venue_id), name="Kulturpalast", type="club", owner_id="owner-1", address="Saalgasse 36",
+                postal_code="65183", latitude=50.08, longitude=8.24,
+            ))
+        await db.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+async def _pending(factory):
+    async with factory() as db:
+        return (await db.execute(select(func.count()).select_from(VenueStatDelta))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_record_compact_and_read_totals(factory):
+    async with factory() as db:
+        await VenueCounters.record(db, str(VENUE_A), Decimal("10.50"), Decimal("21.00"))
+        await VenueCounters.record(db, VENUE_A, Decimal("4.50"), Decimal("9.00"))
+        await VenueCounters.record_many(db, {VENUE_B: (Decimal("7.00"), Decimal("14.00"))})
+        await db.commit()
+
+    async with factory() as db:
+        before = await VenueCounters.get_totals(db, [VENUE_A, VENUE_B])
+    assert before[VENUE_A] == {"total_revenue": Decimal("15.00"), "total_points_issued": Decimal("30.00")}
+    assert before[VENUE_B]["total_revenue"] == Decimal("7.00")
+
+    async with factory() as db:
+        assert await VenueCounters.compact(db) == 2
+    assert await _pending(factory) == 0
+
+    async with factory() as db:
+        await VenueCounters.record(db, VENUE_A, Decimal("1.00"), Decimal("2.00"))
+        await db.commit()
+        after = await VenueCounters.get_totals(db, [VENUE_A, VENUE_B])
+        venue = (await db.execute(select(Venue).where(Venue.id == str(VENUE_A)))).scalar_one()
+
+    # Compacted into the venue row, plus the delta recorded since
+    assert venue.total_revenue == Decimal("15.00")
+    assert venue.total_points_issued == Decimal("30.00")
+    assert after[VENUE_A] == {"total_revenue": Decimal("16.00"), "total_points_issued": Decimal("32.00")}
+    assert after[VENUE_B] == before[VENUE_B]
+
+
+@pytest.mark.asyncio
+async def test_compacting_nothing_changes_nothing(factory):
+    async with factory() as db:
+        assert await VenueCounters.compact(db) == 0
+        totals = await VenueCounters.get_totals(db, [VENUE_A])
+
+    assert totals[VENUE_A] == {"total_revenue": Decimal("0"), "total_points_issued": Decimal("0")}
+
+
+@pytest.mark.asyncio
+async def test_background_compactor_folds_deltas(factory):
+    async with factory() as db:
+        await VenueCounters.record(db, VENUE_B, Decimal("3.00"), Decimal("6.00"))
+        await db.commit()
+
+    compactor = VenueCounterCompactor(factory, interval_seconds=0.01)
+    compactor.start()
+    try:
+        for _ in range(100):
+            if not await _pending(factory):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await compactor.stop()
+
+    async with factory() as db:
+        venue = (await db.execute(select(Venue).where(Venue.id == str(VENUE_B)))).scalar_one()
+    assert await _pending(factory) == 0
+    assert venue.total_revenue == Decimal("3.00")
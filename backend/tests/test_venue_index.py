@@ -0,0 +1,209 @@
+"""
+Tests for the nearby-venue spatial index, checked against a brute-force
+Haversine scan.
+"""
+import random
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.venue import Venue
+from app.services.venue_index import (
+    DISTANCE_TOLERANCE_KM,
+    VenueSpatialIndex,
+    coordinate_arrays,
+    haversine_km,
+    haversine_km_batch,
+)
+
+
+def _venues(count, seed=7, spread=0.5):
+    rng = random.Random(seed)
+    return [
+        (
+            f"venue-{i:05d}",
+            50.08 + rng.uniform(-spread, spread),
+            8.24 + rng.uniform(-spread, spread),
+            rng.choice(["bar", "club", "restaurant"]),
+            rng.random() < 0.3,
+        )
+        for i in range(count)
+    ]
+
+
+def _brute_force(venues, lat, lng, venue_filter=None):
+    return sorted(
+        (haversine_km(lat, lng, v_lat, v_lng), venue_id)
+        for venue_id, v_lat, v_lng, *_ in venues
+        if venue_filter is None or venue_filter((venue_id, v_lat, v_lng, *_))
+    )
+
+
+def _index(venues, leaf_size=8):
+    index = VenueSpatialIndex(leaf_size=leaf_size)
+    index.build(venues)
+    return index
+
+
+def test_nearest_matches_brute_force():
+    venues = _venues(2000)
+    index = _index(venues)
+
+    for lat, lng in [(50.08, 8.24), (49.7, 7.9), (52.52, 13.40)]:
+        expected = _brute_force(venues, lat, lng)[:25]
+        found = index.nearest(lat, lng, 25)
+
+        assert [venue_id for venue_id, _ in found] == [venue_id for _, venue_id in expected]
+        for (_, distance), (expected_distance, _) in zip(found, expected):
+            assert abs(distance - expected_distance) <= DISTANCE_TOLERANCE_KM
+
+
+def test_batch_kernel_matches_scalar_haversine():
+    rng = random.Random(3)
+    targets = [(rng.uniform(-89, 89), rng.uniform(-180, 180)) for _ in range(5000)]
+    targets += [(50.08, 8.24), (-50.08, -171.76)]  # Same point and antipode
+
+    batch = haversine_km_batch(50.08, 8.24, *coordinate_arrays(targets)).tolist()
+
+    for (lat, lng), distance in zip(targets, batch):
+        assert abs(distance - haversine_km(50.08, 8.24, lat, lng)) <= DISTANCE_TOLERANCE_KM
+
+
+def test_large_k_scan_matches_tree_search():
+    venues = _venues(400)
+    index = _index(venues)
+
+    scanned = index.nearest(50.1, 8.2, 150)  # k over a quarter of the index: full batch scan
+    walked = index.nearest(50.1, 8.2, 90)  # Tree search
+
+    assert scanned[:90] == walked
+    assert [venue_id for venue_id, _ in scanned] == [venue_id for _, venue_id in _brute_force(venues, 50.1, 8.2)[:150]]
+
+
+def test_within_matches_brute_force():
+    venues = _venues(2000)
+    index = _index(venues)
+
+    found = index.within(50.08, 8.24, 5.0)
+    expected = [venue_id for distance, venue_id in _brute_force(venues, 50.08, 8.24) if distance <= 5.0]
+
+    assert [venue_id for venue_id, _ in found] == expected
+    assert 0 < len(found) < len(venues)
+
+
+def test_pages_follow_global_distance_order():
+    venues = _venues(500)
+    index = _index(venues)
+    everything = [venue_id for venue_id, _ in index.nearest(50.1, 8.2, len(venues))]
+
+    pages = []
+    for offset in range(0, 100, 20):
+        pages.extend(venue_id for venue_id, _ in index.nearest(50.1, 8.2, offset + 20)[offset:])
+
+    assert pages == everything[:100]
+
+
+def test_filters_and_radius_limit_nearest():
+    venues = _venues(1000)
+    index = _index(venues)
+
+    def clubs_with_events(venue):
+        return venue[3] == "club" and venue[4]
+
+    found = index.nearest(50.08, 8.24, 10, max_distance_km=20, venue_filter=clubs_with_events)
+    expected = [
+        venue_id
+        for distance, venue_id in _brute_force(venues, 50.08, 8.24, clubs_with_events)
+        if distance <= 20
+    ][:10]
+
+    assert [venue_id for venue_id, _ in found] == expected
+
+
+def test_queries_across_the_antimeridian():
+    venues = [("east", 0.0, 179.9, "bar", False), ("west", 0.0, -179.9, "bar", False), ("far", 0.0, 0.0, "bar", False)]
+    index = _index(venues)
+
+    assert [venue_id for venue_id, _ in index.nearest(0.0, 180.0, 2)] == ["east", "west"]
+    assert index.within(0.0, -179.95, 20)[0][0] == "west"
+
+
+def test_empty_index():
+    index = _index([])
+
+    assert index.nearest(50.0, 8.0, 5) == []
+    assert index.within(50.0, 8.0, 5) == []
+
+
+@pytest.mark.parametrize("k", [3, 100])  # Tree walk and full scan
+def test_rebuild_during_query_keeps_its_snapshot(k):
+    venues = _venues(200)
+    moved = [(venue_id, lat + 10, lng + 10, *rest) for venue_id, lat, lng, *rest in _venues(50, seed=8)]
+    index = _index(venues)
+    pending = []
+
+    def rebuild_midway(venue):
+        if pending:
+            index.build(pending.pop())  # What a refresh finishing on its worker thread does
+        return True
+
+    expected = _brute_force(venues, 50.08, 8.24)[:k]
+    pending.append(moved)
+    found = index.nearest(50.08, 8.24, k, venue_filter=rebuild_midway)
+    index.build(venues)
+    pending.append(moved)
+    within = index.within(50.08, 8.24, 5, venue_filter=rebuild_midway)
+
+    assert [venue_id for venue_id, _ in found] == [venue_id for _, venue_id in expected]
+    for (_, distance), (expected_distance, _) in zip(found, expected):
+        assert abs(distance - expected_distance) <= DISTANCE_TOLERANCE_KM
+    assert [venue_id for venue_id, _ in within] == [
+        venue_id for distance, venue_id in _brute_force(venues, 50.08, 8.24) if distance <= 5
+    ]
+    assert len(index) == 50
+
+
+@pytest.mark.asyncio
+async def test_index_rebuilds_after_venue_changes(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'venues.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Venue.__table__.create)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    def venue(venue_id, latitude, longitude, **kwargs):
+        return Venue(
+            id=venue_id, name=venue_id, type="bar", owner_id="owner", address="Street 1",
+            postal_code="65183", latitude=latitude, longitude=longitude, **kwargs
+        )
+
+    from app.services.venue_index import venue_index
+
+    try:
+        async with factory() as db:
+            db.add_all([venue("near", 50.08, 8.24), venue("closed", 50.081, 8.241, is_active=False)])
+            await db.commit()
+            await venue_index.ensure(db)
+            assert [venue_id for venue_id, _ in venue_index.nearest(50.08, 8.24, 5)] == ["near"]
+
+            db.add(venue("nearer", 50.0801, 8.2401))
+            await db.commit()
+            assert not venue_index.is_fresh()
+
+            await venue_index.ensure(db)
+            assert [venue_id for venue_id, _ in venue_index.nearest(50.0801, 8.2401, 5)] == ["nearer", "near"]
+
+            # A rebuild between the flush and the commit loads the old venues
+            (await db.get(Venue, "near")).is_active = False
+            await db.flush()
+            async with factory() as reader:
+                await venue_index.ensure(reader)
+            assert venue_index.is_fresh()
+            await db.commit()
+            assert not venue_index.is_fresh()
+
+            await venue_index.ensure(db)
+            assert [venue_id for venue_id, _ in venue_index.nearest(50.08, 8.24, 5)] == ["nearer"]
+    finally:
+        venue_index.build([])
+        venue_index.invalidate()
+        await engine.dispose()